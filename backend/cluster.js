@@ -0,0 +1,108 @@
+#!/usr/bin/env node
+
+/**
+ * Modo multi-processo (Node cluster)
+ *
+ * - Processo primário sobe WEB_CONCURRENCY workers rodando server.js (mesma porta)
+ * - Workers que caem são recriados com backoff
+ * - SIGHUP: reinício gracioso, um worker por vez (novo worker escutando antes do antigo sair)
+ * - SIGTERM/SIGINT: encerramento gracioso de todos os workers
+ * - Sem Redis, o primário guarda os contadores compartilhados (rate limit e orçamento de LLM)
+ * - GET /metrics em qualquer worker devolve as métricas de todos (reunidas pelo primário)
+ *
+ * Uso: node cluster.js   (WEB_CONCURRENCY=4 node cluster.js)
+ */
+
+const path = require('path');
+require('dotenv').config({ path: path.join(__dirname, '.env') });
+
+const cluster = require('cluster');
+const os = require('os');
+const { servePrimary } = require('./utils/sharedStore');
+const metrics = require('./utils/metrics');
+
+const WORKERS = parseInt(process.env.WEB_CONCURRENCY) || os.availableParallelism();
+const SHUTDOWN_TIMEOUT_MS = (parseInt(process.env.SHUTDOWN_TIMEOUT_MS) || 30000) + 5000;
+const MAX_RESTART_DELAY_MS = 30000;
+const STABLE_AFTER_MS = 60000;
+
+cluster.setupPrimary({ exec: path.join(__dirname, 'server.js') });
+
+let shuttingDown = false;
+let restartDelay = 1000;
+const retiring = new Set();
+
+function fork() {
+    const worker = cluster.fork();
+    worker.startedAt = Date.now();
+    return worker;
+}
+
+function waitFor(worker, event, timeoutMs) {
+    return new Promise(resolve => {
+        const timer = setTimeout(() => resolve(false), timeoutMs);
+        worker.once(event, () => {
+            clearTimeout(timer);
+            resolve(true);
+        });
+    });
+}
+
+// Pede encerramento gracioso e mata o worker se passar do tempo limite
+async function retire(worker) {
+    retiring.add(worker.id);
+    if (worker.isConnected()) worker.send({ type: 'shutdown' });
+    if (!(await waitFor(worker, 'exit', SHUTDOWN_TIMEOUT_MS))) {
+        console.warn(`[Cluster] ⚠️ Worker ${worker.process.pid} não encerrou a tempo, finalizando`);
+        worker.process.kill('SIGKILL');
+    }
+}
+
+async function rollingRestart() {
+    console.log('[Cluster] 🔄 Reinício gracioso dos workers...');
+    for (const worker of Object.values(cluster.workers)) {
+        if (shuttingDown) return;
+        if (retiring.has(worker.id)) continue;
+
+        const replacement = fork();
+        if (!(await waitFor(replacement, 'listening', SHUTDOWN_TIMEOUT_MS))) {
+            console.error('[Cluster] ❌ Novo worker não subiu; reinício interrompido');
+            return;
+        }
+        await retire(worker);
+    }
+    console.log('[Cluster] ✅ Reinício concluído');
+}
+
+async function shutdown(signal) {
+    if (shuttingDown) return;
+    shuttingDown = true;
+    console.log(`[Cluster] Encerrando workers (${signal})...`);
+
+    await Promise.all(Object.values(cluster.workers).map(retire));
+    process.exit(0);
+}
+
+cluster.on('exit', (worker, code, signal) => {
+    if (retiring.delete(worker.id) || shuttingDown) return;
+
+    // Backoff para não entrar em loop de quedas; volta ao normal se o worker ficou estável
+    restartDelay = Date.now() - worker.startedAt > STABLE_AFTER_MS
+        ? 1000
+        : Math.min(restartDelay * 2, MAX_RESTART_DELAY_MS);
+
+    console.error(`[Cluster] ❌ Worker ${worker.process.pid} saiu (${signal || code}); recriando em ${restartDelay}ms`);
+    setTimeout(() => !shuttingDown && fork(), restartDelay);
+});
+
+servePrimary(cluster);
+metrics.servePrimary(cluster);
+
+console.log(`[Cluster] Primário ${process.pid} iniciando ${WORKERS} workers`);
+for (let i = 0; i < WORKERS; i++) {
+    fork();
+}
+
+process.on('SIGHUP', rollingRestart);
+process.on('SIGTERM', () => shutdown('SIGTERM'));
+process.on('SIGINT', () => shutdown('SIGINT'));
@@ -105,6 +105,34 @@ module.exports = {
         }
     },
 
+    // Cache de resultados de scraping (chave = URL normalizada)
+    // Vagas populares (Gupy/LinkedIn) são reenviadas várias vezes ao dia
+    cache: {
+        enabled: process.env.SCRAPE_CACHE_ENABLED !== 'false',
+        backend: process.env.SCRAPE_CACHE_BACKEND || (process.env.REDIS_URL ? 'redis' : 'memory'),
+        redisUrl: process.env.REDIS_URL,
+        keyPrefix: 'cvsf:scrape:',
+        ttlMs: parseInt(process.env.SCRAPE_CACHE_TTL_MS) || 6 * 60 * 60 * 1000,   // 6 horas "fresco"
+        staleTtlMs: 24 * 60 * 60 * 1000,  // mantido mais 24h para revalidação com ETag/Last-Modified
+        negativeTtlMs: 10 * 60 * 1000,    // links mortos (404/410/DNS) por 10 minutos
+        maxBytes: parseInt(process.env.SCRAPE_CACHE_MAX_BYTES) || 32 * 1024 * 1024
+    },
+
+    // Agendador de downloads (pool com limites por host e deadline global)
+    scheduler: {
+        concurrency: parseInt(process.env.SCRAPE_CONCURRENCY) || 5,         // downloads simultâneos no total
+        perHostConcurrency: parseInt(process.env.SCRAPE_HOST_CONCURRENCY) || 2,
+        perHostIntervalMs: parseInt(process.env.SCRAPE_HOST_INTERVAL_MS) || 250, // cortesia entre inícios no mesmo host
+        urlTimeoutMs: parseInt(process.env.SCRAPE_URL_TIMEOUT_MS) || 15000,
+        deadlineMs: parseInt(process.env.SCRAPE_DEADLINE_MS) || 45000,     // retorna resultados parciais após isso
+        keepAlive: {
+            maxSockets: 50,
+            maxFreeSockets: 10,
+            timeout: 60000,
+            freeSocketTimeout: 30000
+        }
+    },
+
     // Configuração da estratégia Firecrawl First
     strategy: {
         mode: 'firecrawl_first', // sempre tentar Firecrawl primeiro
@@ -1,55 +1,19 @@
 const GiftCode = require('../models/giftCode');
 const GiftCodeUsage = require('../models/giftCodeUsage');
 const User = require('../models/user');
-const { Op } = require('sequelize');
+const { Op, UniqueConstraintError, fn, col } = require('sequelize');
 const sequelize = require('../db');
+const giftCodeCounters = require('../services/giftCodeCounters');
+const exportStream = require('../utils/exportStream');
 
-// Dashboard com estatísticas gerais
+const BULK_BATCH_SIZE = 500;
+const MAX_BULK_QUANTITY = parseInt(process.env.GIFT_CODE_MAX_BULK_QUANTITY) || 10000;
+const MAX_CODE_ATTEMPTS = 10;
+
+// Dashboard com estatísticas gerais (contadores mantidos incrementalmente)
 exports.getDashboard = async (req, res) => {
     try {
-        const stats = await Promise.all([
-            // Total de códigos
-            GiftCode.count(),
-
-            // Códigos ativos
-            GiftCode.count({ where: { isActive: true } }),
-
-            // Códigos usados completamente
-            GiftCode.count({
-                where: {
-                    [Op.and]: [
-                        sequelize.literal('usedCount >= maxUses')
-                    ]
-                }
-            }),
-
-            // Total de usos hoje
-            GiftCodeUsage.count({
-                where: {
-                    createdAt: {
-                        [Op.gte]: new Date(new Date().setHours(0, 0, 0, 0))
-                    }
-                }
-            }),
-
-            // Códigos que expiram em 7 dias
-            GiftCode.count({
-                where: {
-                    expiresAt: {
-                        [Op.lte]: new Date(Date.now() + 7 * 24 * 60 * 60 * 1000),
-                        [Op.gt]: new Date()
-                    }
-                }
-            })
-        ]);
-
-        res.json({
-            totalCodes: stats[0],
-            activeCodes: stats[1],
-            exhaustedCodes: stats[2],
-            usagesToday: stats[3],
-            expiringCodes: stats[4]
-        });
+        res.json(await giftCodeCounters.getDashboard());
 
     } catch (error) {
         console.error('❌ Erro no dashboard:', error);
@@ -124,51 +88,81 @@ exports.listCodes = async (req, res) => {
     }
 };
 
+// Gera `count` códigos inéditos: uma consulta de unicidade por rodada, não por código
+async function generateUniqueCodes(prefix, count) {
+    const codes = new Set();
+
+    for (let attempt = 1; codes.size < count; attempt++) {
+        if (attempt > MAX_CODE_ATTEMPTS) {
+            throw new Error('Muitas tentativas para gerar código único');
+        }
+
+        const candidates = new Set();
+        while (candidates.size < count - codes.size) {
+            const randomPart = Math.random().toString(36).substring(2, 8).toUpperCase();
+            const code = `${prefix}${randomPart}`;
+            if (!codes.has(code)) candidates.add(code);
+        }
+
+        const existing = await GiftCode.findAll({
+            attributes: ['code'],
+            where: { code: { [Op.in]: [...candidates] } },
+            raw: true
+        });
+        const taken = new Set(existing.map(row => row.code));
+        candidates.forEach(code => !taken.has(code) && codes.add(code));
+    }
+
+    return [...codes];
+}
+
 // Criar códigos em lote
 exports.createBulkCodes = async (req, res) => {
     try {
         const {
             prefix = 'BULK',
-            quantity = 10,
             maxUses = 1,
             expiresAt = null,
             description = ''
         } = req.body;
+        const quantity = parseInt(req.body.quantity ?? 10);
 
-        const codes = [];
-        const createdCodes = [];
-
-        // Gerar códigos únicos
-        for (let i = 0; i < quantity; i++) {
-            let code;
-            let attempts = 0;
-
-            do {
-                const randomPart = Math.random().toString(36).substring(2, 8).toUpperCase();
-                code = `${prefix}${randomPart}`;
-                attempts++;
-
-                if (attempts > 10) {
-                    throw new Error('Muitas tentativas para gerar código único');
-                }
-            } while (codes.includes(code) || await GiftCode.findOne({ where: { code } }));
-
-            codes.push(code);
+        if (!(quantity >= 1 && quantity <= MAX_BULK_QUANTITY)) {
+            return res.status(400).json({ error: `Quantidade deve estar entre 1 e ${MAX_BULK_QUANTITY}.` });
         }
 
-        // Criar códigos no banco
-        for (const code of codes) {
-            const giftCode = await GiftCode.create({
-                code,
-                maxUses,
-                expiresAt: expiresAt ? new Date(expiresAt) : null,
-                isActive: true,
-                usedCount: 0,
-                createdById: req.user?.id,
-                description
-            });
+        const createdCodes = [];
 
-            createdCodes.push(giftCode);
+        // Inserção em lotes; conflito de unicidade (criação concorrente) gera o lote novamente
+        for (let offset = 0; offset < quantity; offset += BULK_BATCH_SIZE) {
+            const size = Math.min(BULK_BATCH_SIZE, quantity - offset);
+
+            for (let attempt = 1; ; attempt++) {
+                const codes = await generateUniqueCodes(prefix, size);
+
+                try {
+                    await GiftCode.bulkCreate(codes.map(code => ({
+                        code,
+                        maxUses,
+                        expiresAt: expiresAt ? new Date(expiresAt) : null,
+                        isActive: true,
+                        usedCount: 0,
+                        createdById: req.user?.id,
+                        description
+                    })));
+
+                    createdCodes.push(...await GiftCode.findAll({
+                        where: { code: { [Op.in]: codes } },
+                        order: [['id', 'ASC']]
+                    }));
+                    break;
+                } catch (error) {
+                    if (!(error instanceof UniqueConstraintError) || attempt >= MAX_CODE_ATTEMPTS) {
+                        throw error;
+                    }
+                    console.warn(`[Admin] Conflito ao inserir lote de códigos, tentativa ${attempt}`);
+                }
+            }
         }
 
         res.status(201).json({
@@ -249,13 +243,14 @@ exports.deleteCode = async (req, res) => {
     }
 };
 
-// Relatório de uso
+// Relatório de uso (JSON ou ?format=csv), enviado em lotes
 exports.getUsageReport = async (req, res) => {
     try {
         const {
             startDate,
             endDate,
-            codeId
+            codeId,
+            format
         } = req.query;
 
         const where = {};
@@ -270,7 +265,7 @@ exports.getUsageReport = async (req, res) => {
             where.giftCodeId = codeId;
         }
 
-        const usages = await GiftCodeUsage.findAll({
+        const usages = exportStream.batches(GiftCodeUsage, {
             where,
             include: [
                 {
@@ -283,32 +278,66 @@ exports.getUsageReport = async (req, res) => {
                     as: 'user',
                     attributes: ['email', 'name']
                 }
+            ]
+        });
+
+        if (format === 'csv') {
+            res.setHeader('Content-Type', 'text/csv; charset=utf-8');
+            res.setHeader('Content-Disposition', 'attachment; filename=gift-code-usages.csv');
+            await exportStream.write(res, exportStream.csvLine(['Data', 'Código', 'Descrição', 'Email', 'Nome']));
+
+            for await (const batch of usages) {
+                await exportStream.write(res, batch.map(usage => exportStream.csvLine([
+                    new Date(usage.createdAt).toISOString(),
+                    usage.giftCode?.code,
+                    usage.giftCode?.description,
+                    usage.user?.email,
+                    usage.user?.name
+                ])).join(''));
+            }
+            return res.end();
+        }
+
+        // Estatísticas em uma única agregação no banco
+        const [totals] = await GiftCodeUsage.findAll({
+            attributes: [
+                [fn('COUNT', col('id')), 'totalUsages'],
+                [fn('COUNT', fn('DISTINCT', col('userId'))), 'uniqueUsers'],
+                [fn('COUNT', fn('DISTINCT', col('giftCodeId'))), 'uniqueCodes']
             ],
-            order: [['createdAt', 'DESC']]
+            where,
+            raw: true
         });
 
-        // Estatísticas
         const stats = {
-            totalUsages: usages.length,
-            uniqueUsers: [...new Set(usages.map(u => u.userId))].length,
-            uniqueCodes: [...new Set(usages.map(u => u.giftCodeId))].length
+            totalUsages: Number(totals?.totalUsages) || 0,
+            uniqueUsers: Number(totals?.uniqueUsers) || 0,
+            uniqueCodes: Number(totals?.uniqueCodes) || 0
         };
 
-        res.json({
-            usages,
-            stats
-        });
+        res.setHeader('Content-Type', 'application/json; charset=utf-8');
+        await exportStream.write(res, `{"stats":${JSON.stringify(stats)},"usages":[`);
+
+        let first = true;
+        for await (const batch of usages) {
+            const chunk = batch.map(usage => JSON.stringify(usage)).join(',');
+            await exportStream.write(res, (first ? '' : ',') + chunk);
+            first = false;
+        }
+
+        await exportStream.write(res, ']}');
+        res.end();
 
     } catch (error) {
         console.error('❌ Erro no relatório:', error);
-        res.status(500).json({ error: 'Erro ao gerar relatório.' });
+        exportStream.fail(res, error, 'Erro ao gerar relatório.');
     }
 };
 
-// Exportar códigos para CSV
+// Exportar códigos para CSV (ou ?format=json), enviado em lotes
 exports.exportCodes = async (req, res) => {
     try {
-        const { status } = req.query;
+        const { status, format } = req.query;
 
         const where = {};
         if (status === 'active') {
@@ -317,28 +346,47 @@ exports.exportCodes = async (req, res) => {
             where.isActive = false;
         }
 
-        const codes = await GiftCode.findAll({
+        const codes = exportStream.batches(GiftCode, {
             where,
-            order: [['createdAt', 'DESC']]
+            attributes: ['id', 'code', 'description', 'isActive', 'usedCount', 'maxUses', 'expiresAt', 'createdAt'],
+            raw: true
         });
 
-        // Gerar CSV
-        let csv = 'Código,Status,Usos,Máximo,Expira Em,Criado Em\n';
+        if (format === 'json') {
+            res.setHeader('Content-Type', 'application/json; charset=utf-8');
+            res.setHeader('Content-Disposition', 'attachment; filename=gift-codes.json');
+            await exportStream.write(res, '[');
 
-        codes.forEach(code => {
-            const status = code.isActive ? 'Ativo' : 'Inativo';
-            const expiresAt = code.expiresAt ? code.expiresAt.toISOString() : 'Nunca';
-            const createdAt = code.createdAt.toISOString();
+            let first = true;
+            for await (const batch of codes) {
+                const chunk = batch.map(code => JSON.stringify({ ...code, isActive: !!code.isActive })).join(',');
+                await exportStream.write(res, (first ? '' : ',') + chunk);
+                first = false;
+            }
 
-            csv += `${code.code},${status},${code.usedCount},${code.maxUses},${expiresAt},${createdAt}\n`;
-        });
+            await exportStream.write(res, ']');
+            return res.end();
+        }
 
         res.setHeader('Content-Type', 'text/csv');
         res.setHeader('Content-Disposition', 'attachment; filename=gift-codes.csv');
-        res.send(csv);
+        await exportStream.write(res, 'Código,Status,Usos,Máximo,Expira Em,Criado Em\n');
+
+        for await (const batch of codes) {
+            await exportStream.write(res, batch.map(code => exportStream.csvLine([
+                code.code,
+                code.isActive ? 'Ativo' : 'Inativo',
+                code.usedCount,
+                code.maxUses,
+                code.expiresAt ? new Date(code.expiresAt).toISOString() : 'Nunca',
+                new Date(code.createdAt).toISOString()
+            ])).join(''));
+        }
+
+        res.end();
 
     } catch (error) {
         console.error('❌ Erro ao exportar:', error);
-        res.status(500).json({ error: 'Erro ao exportar códigos.' });
+        exportStream.fail(res, error, 'Erro ao exportar códigos.');
     }
-}; 
\ No newline at end of file
+};
@@ -0,0 +1,169 @@
+const fs = require('fs');
+const User = require('../models/user');
+const AnalysisJob = require('../models/AnalysisJob');
+const analysisQueue = require('../services/analysisQueue');
+const analysisPipeline = require('../services/analysisPipeline');
+const { signJobEventsToken } = require('../utils/authMiddleware');
+
+const SSE_HEARTBEAT_MS = 15000;
+const SSE_POLL_MS = parseInt(process.env.ANALYSIS_SSE_POLL_MS) || 2000;
+
+// URL do SSE com token restrito ao job (o JWT de sessão não vai para a query string)
+function eventsUrl(job) {
+  return `/api/ats/jobs/${job.id}/events?token=${signJobEventsToken(job.userId, job.id)}`;
+}
+
+function discardUpload(req) {
+  if (req.file?.path) {
+    fs.unlink(req.file.path, () => { });
+  }
+}
+
+// Enfileira uma análise e retorna imediatamente o id do job (202)
+exports.enqueue = async (req, res) => {
+  try {
+    const userId = req.user?.id;
+    if (!userId) {
+      discardUpload(req);
+      return res.status(401).json({ error: 'Usuário não autenticado.' });
+    }
+
+    const user = await User.findByPk(userId);
+    if (!user) {
+      discardUpload(req);
+      return res.status(404).json({ error: 'Usuário não encontrado.' });
+    }
+
+    const resumePath = req.file?.path;
+    let jobLinks;
+    try {
+      jobLinks = JSON.parse(req.body.jobLinks || '[]');
+    } catch (error) {
+      jobLinks = [];
+    }
+
+    const inputError = analysisPipeline.validateInput(resumePath, jobLinks);
+    if (inputError) {
+      console.warn('[AnalysisJob] Requisição inválida:', inputError);
+      discardUpload(req);
+      return res.status(400).json({ error: inputError });
+    }
+
+    // Prioridade só pode ser definida por administradores
+    const priority = user.isAdmin ? (parseInt(req.body.priority) || 0) : 0;
+
+    // Reserva o crédito de forma atômica (403 sem créditos disponíveis)
+    const job = await analysisQueue.enqueue({
+      userId,
+      resumePath,
+      fileName: req.file?.originalname || 'arquivo.pdf',
+      jobLinks,
+      priority
+    });
+
+    res.status(202).json({
+      jobId: job.id,
+      status: job.status,
+      statusUrl: `/api/ats/jobs/${job.id}`,
+      eventsUrl: eventsUrl(job)
+    });
+  } catch (err) {
+    discardUpload(req);
+    console.error('[AnalysisJob] Erro ao enfileirar análise:', err);
+    res.status(err.statusCode || 500).json({ error: err.statusCode ? err.message : 'Erro ao enfileirar análise.' });
+  }
+};
+
+// Estado atual do job (resultado incluso quando concluído)
+exports.getJob = async (req, res) => {
+  try {
+    const job = await analysisQueue.getJob(req.params.id, req.user?.id);
+    if (!job) {
+      return res.status(404).json({ error: 'Análise não encontrada.' });
+    }
+    // Token novo a cada consulta: permite reconectar o SSE depois que o anterior expira
+    res.json({ ...AnalysisJob.toPublicJSON(job), eventsUrl: eventsUrl(job) });
+  } catch (err) {
+    console.error('[AnalysisJob] Erro ao buscar job:', err);
+    res.status(500).json({ error: 'Erro ao buscar análise.' });
+  }
+};
+
+// Progresso do job via Server-Sent Events
+exports.streamEvents = async (req, res) => {
+  let job;
+  try {
+    job = await analysisQueue.getJob(req.params.id, req.user?.id);
+  } catch (err) {
+    console.error('[AnalysisJob] Erro ao buscar job:', err);
+    return res.status(500).json({ error: 'Erro ao buscar análise.' });
+  }
+  if (!job) {
+    return res.status(404).json({ error: 'Análise não encontrada.' });
+  }
+
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache, no-transform',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no' // desativar buffer em proxies nginx
+  });
+
+  let lastSent = null;
+  let closed = false;
+
+  const send = (event, data) => {
+    if (closed) return;
+    res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+  };
+
+  const cleanup = () => {
+    if (closed) return;
+    closed = true;
+    clearInterval(heartbeat);
+    clearInterval(poll);
+    analysisQueue.off('job', onJob);
+    analysisQueue.off('stop', cleanup);
+    res.end();
+  };
+
+  const sendState = (state) => {
+    const key = `${state.status}:${state.stage}:${state.progress}`;
+    if (key === lastSent) return;
+    lastSent = key;
+
+    if (state.status === 'completed' || state.status === 'failed') {
+      // Estado final completo (com resultado) direto do banco
+      analysisQueue.getJob(job.id, job.userId)
+        .then(finalJob => {
+          send(state.status, AnalysisJob.toPublicJSON(finalJob));
+          cleanup();
+        })
+        .catch(() => cleanup());
+      return;
+    }
+    send('progress', { id: state.id, status: state.status, stage: state.stage, progress: state.progress, details: state.details });
+  };
+
+  const onJob = (state) => {
+    if (state.id === job.id) sendState(state);
+  };
+
+  analysisQueue.on('job', onJob);
+  // Encerramento do processo: fecha o stream (o EventSource reconecta em outro worker)
+  analysisQueue.once('stop', cleanup);
+
+  // Comentário periódico mantém a conexão aberta em proxies
+  const heartbeat = setInterval(() => !closed && res.write(': heartbeat\n\n'), SSE_HEARTBEAT_MS);
+
+  // O job pode estar rodando em outro processo: acompanhar também pelo banco
+  const poll = setInterval(() => {
+    analysisQueue.getJob(job.id, job.userId)
+      .then(current => current && sendState(current))
+      .catch(() => { });
+  }, SSE_POLL_MS);
+
+  req.on('close', cleanup);
+
+  sendState(job);
+};
@@ -1,5 +1,5 @@
 const atsService = require('../services/atsService');
-const GupyOptimizationService = require('../services/gupyOptimizationService');
+const analysisPipeline = require('../services/analysisPipeline');
 const fs = require('fs');
 const User = require('../models/user'); // Importando o modelo de usuário para gerenciar créditos
 const AnalysisResults = require('../models/AnalysisResults'); // Importando o modelo para salvar análises
@@ -35,17 +35,10 @@ exports.analyze = async (req, res) => {
       console.log('[ATS] Extensão detectada:', path.extname(resumePath));
     }
     console.log('[ATS] Links recebidos:', jobLinks);
-    if (!resumePath || !jobLinks.length) {
-      console.warn('[ATS] Dados insuficientes: arquivo ou links ausentes.');
-      return res.status(400).json({ error: 'Arquivo de currículo ou links de vagas ausentes.' });
-    }
-    if (jobLinks.length < 3) {
-      console.warn('[ATS] Limite de vagas insuficiente:', jobLinks.length);
-      return res.status(400).json({ error: 'É necessário incluir pelo menos 3 vagas para uma análise completa.' });
-    }
-    if (jobLinks.length > 7) {
-      console.warn('[ATS] Limite de vagas excedido:', jobLinks.length);
-      return res.status(400).json({ error: 'O limite máximo é de 7 vagas por análise. Remova alguns links e tente novamente.' });
+    const inputError = analysisPipeline.validateInput(resumePath, jobLinks);
+    if (inputError) {
+      console.warn('[ATS] Requisição inválida:', inputError);
+      return res.status(400).json({ error: inputError });
     }
 
     // Análise padrão do ATS
@@ -77,163 +70,8 @@ exports.analyze = async (req, res) => {
     }
     console.log(`[ATS] jobsText criado com ${jobsText.length} caracteres de ${result.jobs?.length || 0} vagas`);
 
-    // Análise específica para Gupy (se detectarmos vagas da Gupy)
-    const gupyJobs = jobLinks.filter(link =>
-      link.includes('gupy.io') || link.includes('gupy.com')
-    );
-
-    if (gupyJobs.length > 0 && result.jobs && Array.isArray(result.jobs)) {
-      console.log('[ATS] Detectadas vagas da Gupy, realizando análise específica...');
-
-      // Para cada vaga da Gupy, fazer análise especializada
-      result.gupy_optimization = [];
-
-      // Verificar se result.jobs existe e é um array antes de acessar length
-      if (!result.jobs) {
-        console.warn('[ATS] Alerta: result.jobs está undefined ou null');
-        result.jobs = [];
-      }
-
-      for (let i = 0; i < Math.min(gupyJobs.length, result.jobs.length); i++) {
-        const jobData = result.jobs.find(job =>
-          gupyJobs.some(gupyLink => job && job.link === gupyLink)
-        );
-
-        if (jobData && jobData.description) {
-          let gupyAnalysis;
-          try {
-            gupyAnalysis = GupyOptimizationService.analyzeGupyCompatibility(
-              resumeText,
-              jobData.description
-            );
-          } catch (error) {
-            console.error('[ATS] Erro na análise Gupy:', error);
-            gupyAnalysis = { score: 0, suggestions: [], matches: [] };
-          }
-
-          result.gupy_optimization.push({
-            job_title: jobData.title || 'Vaga sem título',
-            job_link: jobData.link,
-            compatibility_score: gupyAnalysis.score,
-            algorithm_tips: gupyAnalysis.recommendations,
-            keyword_analysis: {
-              present: gupyAnalysis.keywords.present,
-              missing: gupyAnalysis.keywords.missing,
-              density: gupyAnalysis.keywords.density
-            },
-            format_optimization: gupyAnalysis.format
-          });
-        }
-      }
-
-      // Adicionar dicas gerais para Gupy
-      result.gupy_tips = {
-        general_advice: [
-          "Use formato objetivo: 'Experiência com X, Y, Z' ao invés de frases longas",
-          "Repita palavras-chave da vaga em contextos diferentes",
-          "Organize experiências em formato claro: Empresa | Cargo | Período",
-          "Use bullet points para destacar habilidades e responsabilidades",
-          "Evite adjetivos excessivos, foque em resultados concretos"
-        ],
-        algorithm_insights: {
-          name: "GAIA - Inteligência Artificial da Gupy",
-          factors: [
-            "Analisa 200+ métricas diferentes",
-            "Prioriza keywords exatas da vaga",
-            "Valoriza formato objetivo e estruturado",
-            "Considera formação, experiência e fit cultural",
-            "Aprende com contratações bem-sucedidas"
-          ]
-        }
-      };
-    }
-
-    // Cruzamento real: só palavras da vaga encontradas no currículo
-    const { filterPresentKeywords, deduplicateKeywords, countKeywordOccurrences, deduplicateKeywordCounts } = require('../services/atsKeywordVerifier');
-    if (result.job_keywords && Array.isArray(result.job_keywords) && result.jobsText) {
-      // Extrai as palavras-chave da vaga e remove duplicidades
-      let jobKeywords = result.job_keywords;
-      jobKeywords = deduplicateKeywords(jobKeywords);
-
-      // Contar ocorrências das palavras-chave nas vagas usando o jobsText do result
-      // Conta quantas vezes cada palavra-chave aparece
-      const rawKeywordCounts = countKeywordOccurrences(jobKeywords, result.jobsText);
-
-      // Consolida palavras-chave hierárquicas (ex: "escopo" + "definir escopo")
-      const keywordCounts = deduplicateKeywordCounts(rawKeywordCounts);
-
-      result.job_keywords_with_count = keywordCounts;
-
-      // Atualizar job_keywords com ordem de relevância (apenas as palavras-chave, sem contagem)
-      result.job_keywords = keywordCounts.map(item => item.keyword);
-
-      const presentes = filterPresentKeywords(jobKeywords, result.resumeText);
-      const ausentes = jobKeywords.filter(k => !presentes.includes(k));
-
-      // Adicionar contagem para palavras presentes
-      result.job_keywords_present_with_count = keywordCounts.filter(item =>
-        presentes.includes(item.keyword)
-      );
-
-      // Adicionar contagem para palavras ausentes
-      result.job_keywords_missing_with_count = keywordCounts.filter(item =>
-        ausentes.includes(item.keyword)
-      );
-
-      // Manter compatibilidade com versões anteriores
-      result.job_keywords_present = presentes;
-      result.job_keywords_missing = ausentes;
-
-      // Criar estatísticas de relevância
-      result.keyword_statistics = {
-        total_identified: keywordCounts.length,
-        total_occurrences: keywordCounts.reduce((sum, item) => sum + item.count, 0),
-        present_in_resume: presentes.length,
-        missing_in_resume: ausentes.length,
-        match_percentage: keywordCounts.length > 0 ? Math.round((presentes.length / keywordCounts.length) * 100) : 0
-      };
-
-      // Atualizar a conclusão para refletir os dados reais processados pelo backend
-      const matchPercentage = result.keyword_statistics.match_percentage;
-      const totalKeywords = keywordCounts.length;
-      const presentCount = presentes.length;
-      const missingCount = ausentes.length;
-
-      // Gerar conclusão consistente com os dados reais
-      let matchQuality;
-      if (matchPercentage >= 80) {
-        matchQuality = "excelente aderência";
-      } else if (matchPercentage >= 60) {
-        matchQuality = "boa aderência";
-      } else if (matchPercentage >= 40) {
-        matchQuality = "aderência moderada";
-      } else if (matchPercentage >= 20) {
-        matchQuality = "aderência básica";
-      } else {
-        matchQuality = "aderência limitada";
-      }
-
-      result.conclusion = `O currículo apresenta ${matchQuality} às vagas analisadas, com ${matchPercentage}% das palavras-chave presentes (${presentCount} de ${totalKeywords} palavras-chave identificadas). ${matchPercentage >= 60
-        ? `O perfil demonstra boa compatibilidade com os requisitos identificados.`
-        : `Há oportunidades significativas de melhoria para aumentar a compatibilidade.`
-        } ${missingCount > 0
-          ? `As principais áreas de desenvolvimento incluem as ${missingCount} palavras-chave ausentes identificadas na análise.`
-          : 'O currículo atende bem aos requisitos técnicos das vagas.'
-        } ${matchPercentage >= 80
-          ? 'Com pequenos ajustes, o currículo tem excelente potencial para se destacar.'
-          : matchPercentage >= 40
-            ? 'Com ajustes focados nas palavras-chave ausentes, o currículo pode se tornar mais competitivo.'
-            : 'É recomendado revisar e incluir mais palavras-chave relevantes para melhorar significativamente a compatibilidade.'
-        }`;
-
-
-
-      // Limpar dados internos antes de enviar ao frontend
-      delete result.jobsText;
-      delete result.resumeText;
-    }
-
-
+    // Análise Gupy e verificação real das palavras-chave
+    analysisPipeline.enrichResult(result, resumeText, jobLinks);
 
     // Decrementar créditos do usuário após análise bem-sucedida
     try {
@@ -250,52 +88,13 @@ exports.analyze = async (req, res) => {
     }
 
     // Salvar a análise no banco de dados
-    try {
-      const fileName = req.file?.originalname || 'arquivo.pdf';
-
-      // Preparar dados para salvamento
-      const analysisData = {
-        userId: userId,
-        resumeFileName: fileName,
-        resumeContent: resumeText,
-        jobUrls: jobLinks,
-        result: result
-      };
-
-      console.log(`[ATS] Salvando análise no histórico para usuário ${userId}...`);
-      console.log(`[ATS] Dados a salvar:`, {
-        userId: analysisData.userId,
-        fileName: analysisData.resumeFileName,
-        jobUrlsCount: Array.isArray(analysisData.jobUrls) ? analysisData.jobUrls.length : 0,
-        resultKeys: Object.keys(analysisData.result || {}),
-        hasConclusion: !!(analysisData.result && analysisData.result.conclusion),
-        hasResumo: !!(analysisData.result && analysisData.result.resumo),
-        hasKeywords: !!(analysisData.result && analysisData.result.job_keywords_present)
-      });
-
-      const savedAnalysis = await AnalysisResults.create(analysisData);
-
-      console.log(`[ATS] ✅ Análise salva com sucesso! ID: ${savedAnalysis.id}`);
-
-      // Adicionar ID da análise ao resultado para referência
-      result.savedAnalysisId = savedAnalysis.id;
-
-    } catch (saveErr) {
-      console.error('[ATS] ❌ Erro ao salvar análise no histórico:', saveErr);
-      console.error('[ATS] Stack trace:', saveErr.stack);
-
-      // Log detalhado do erro para debug
-      if (saveErr.name === 'SequelizeValidationError') {
-        console.error('[ATS] Erros de validação:', saveErr.errors.map(e => e.message));
-      } else if (saveErr.name === 'SequelizeDatabaseError') {
-        console.error('[ATS] Erro de banco de dados:', saveErr.message);
-      }
-
-      // Não interromper o fluxo se houver erro ao salvar
-      // Mas adicionar flag no resultado para indicar que não foi salvo
-      result.historySaveError = true;
-      result.historySaveErrorMessage = saveErr.message;
-    }
+    await analysisPipeline.saveAnalysis({
+      userId,
+      fileName: req.file?.originalname || 'arquivo.pdf',
+      resumeText,
+      jobLinks,
+      result
+    });
 
     fs.unlink(resumePath, () => { }); // Limpa upload temporário
 
@@ -306,6 +105,11 @@ exports.analyze = async (req, res) => {
       // Erro vindo da OpenAI ou de outro serviço HTTP
       console.error('[ATS] Erro na análise:', err.response.status, err.response.data);
       res.status(err.response.status).json({ error: err.response.data });
+    } else if (err.statusCode === 429) {
+      // Orçamentos globais de IA esgotados (openaiService)
+      console.warn('[ATS] Análise recusada por limite de uso:', err.message);
+      res.set('Retry-After', String(Math.ceil(err.retryAfterMs / 1000)));
+      res.status(429).json({ error: err.message });
     } else {
       console.error('[ATS] Erro na análise:', err.message, err);
       res.status(500).json({ error: err.message || 'Erro interno no ATS.' });
@@ -326,8 +130,16 @@ exports.getAnalysisHistory = async (req, res) => {
 
     console.log(`[ATS] 🔍 Buscando análises para usuário ${userId}...`);
 
-    // Usar método personalizado do modelo
-    const formattedAnalyses = await AnalysisResults.findUserAnalyses(userId, 50);
+    // Paginação por cursor: ?limit=&cursor= (próxima página no header X-Next-Cursor)
+    const limit = Math.min(Math.max(parseInt(req.query?.limit) || 50, 1), 50);
+    const { items: formattedAnalyses, nextCursor } = await AnalysisResults.findUserAnalysesPage(userId, {
+      limit,
+      cursor: req.query?.cursor
+    });
+
+    if (nextCursor) {
+      res.set('X-Next-Cursor', nextCursor);
+    }
 
     console.log(`[ATS] ✅ Encontradas ${formattedAnalyses.length} análises para o usuário ${userId}`);
 
@@ -9,7 +9,7 @@ if (!process.env.RAILWAY_ENVIRONMENT) {
   logger.info('Ambiente local detectado - forçando uso de SQLite');
 
   // Configurar SQLite para desenvolvimento
-  const dbPath = path.join(__dirname, 'database', 'dev.sqlite');
+  const dbPath = process.env.SQLITE_STORAGE || path.join(__dirname, 'database', 'dev.sqlite');
   sequelize = new Sequelize({
     dialect: 'sqlite',
     storage: dbPath,
@@ -27,7 +27,7 @@ if (!process.env.RAILWAY_ENVIRONMENT) {
   logger.info('Ambiente de desenvolvimento detectado - usando SQLite como fallback');
 
   // Configurar SQLite para desenvolvimento
-  const dbPath = path.join(__dirname, 'database', 'dev.sqlite');
+  const dbPath = process.env.SQLITE_STORAGE || path.join(__dirname, 'database', 'dev.sqlite');
   sequelize = new Sequelize({
     dialect: 'sqlite',
     storage: dbPath,
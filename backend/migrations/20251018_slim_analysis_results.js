@@ -0,0 +1,125 @@
+'use strict';
+
+const { Op } = require('sequelize');
+const analysisStorage = require('../utils/analysisStorage');
+
+const TABLE = 'AnalysisResults';
+const INDEX_NAME = 'analysis_results_user_created_idx';
+const BATCH_SIZE = 100;
+
+function parseJSON(value, fallback) {
+  if (value === null || value === undefined) return fallback;
+  if (typeof value !== 'string') return value;
+  try {
+    return JSON.parse(value);
+  } catch (error) {
+    return fallback;
+  }
+}
+
+/**
+ * Percorre a tabela em lotes ordenados por id (keyset), aplicando `handle` a cada linha
+ */
+async function forEachBatch(queryInterface, where, attributes, handle) {
+  let lastId = null;
+  let total = 0;
+
+  for (; ;) {
+    const rows = await queryInterface.select(null, TABLE, {
+      attributes,
+      where: lastId ? { ...where, id: { [Op.gt]: lastId } } : where,
+      order: [['id', 'ASC']],
+      limit: BATCH_SIZE
+    });
+    if (rows.length === 0) break;
+
+    for (const row of rows) {
+      await handle(row);
+    }
+
+    lastId = rows[rows.length - 1].id;
+    total += rows.length;
+    console.log(`[Migration] ${total} análises processadas...`);
+  }
+
+  return total;
+}
+
+module.exports = {
+  up: async (queryInterface, Sequelize) => {
+    const tableInfo = await queryInterface.describeTable(TABLE);
+
+    const columns = {
+      jobCount: { type: Sequelize.INTEGER, allowNull: true },
+      hasCompatibilityScores: { type: Sequelize.BOOLEAN, allowNull: true },
+      hasKeywords: { type: Sequelize.BOOLEAN, allowNull: true },
+      hasEvaluations: { type: Sequelize.BOOLEAN, allowNull: true },
+      resultCompressed: { type: Sequelize.BLOB, allowNull: true },
+      resumeContentCompressed: { type: Sequelize.BLOB, allowNull: true },
+      compression: { type: Sequelize.STRING(8), allowNull: true }
+    };
+
+    for (const [name, definition] of Object.entries(columns)) {
+      if (!tableInfo[name]) {
+        await queryInterface.addColumn(TABLE, name, definition);
+      }
+    }
+
+    // Novas análises gravam o resultado apenas na coluna comprimida
+    await queryInterface.changeColumn(TABLE, 'result', {
+      type: Sequelize.JSON,
+      allowNull: true
+    });
+
+    const indexes = await queryInterface.showIndex(TABLE);
+    if (!indexes.some(index => index.name === INDEX_NAME)) {
+      await queryInterface.addIndex(TABLE, ['userId', 'createdAt', 'id'], { name: INDEX_NAME });
+    }
+
+    // Backfill: resumo + compressão das análises existentes
+    const total = await forEachBatch(
+      queryInterface,
+      { resultCompressed: null },
+      ['id', 'jobUrls', 'result', 'resumeContent'],
+      async (row) => {
+        const result = parseJSON(row.result, {});
+        const jobUrls = parseJSON(row.jobUrls, []);
+
+        await queryInterface.bulkUpdate(TABLE, {
+          ...analysisStorage.summarize(result, jobUrls),
+          resultCompressed: await analysisStorage.compressJSON(result),
+          resumeContentCompressed: await analysisStorage.compressText(row.resumeContent),
+          compression: analysisStorage.COMPRESSION,
+          result: null,
+          resumeContent: null
+        }, { id: row.id });
+      }
+    );
+
+    console.log(`✅ Migração aplicada: ${total} análises compactadas`);
+  },
+
+  down: async (queryInterface, Sequelize) => {
+    // Restaurar resultado e currículo nas colunas originais antes de remover as novas
+    await forEachBatch(
+      queryInterface,
+      { resultCompressed: { [Op.ne]: null } },
+      ['id', 'resultCompressed', 'resumeContentCompressed', 'compression'],
+      async (row) => {
+        await queryInterface.bulkUpdate(TABLE, {
+          result: JSON.stringify(await analysisStorage.decompressJSON(row.resultCompressed, row.compression)),
+          resumeContent: await analysisStorage.decompressText(row.resumeContentCompressed, row.compression)
+        }, { id: row.id });
+      }
+    );
+
+    await queryInterface.removeIndex(TABLE, INDEX_NAME);
+
+    for (const name of ['jobCount', 'hasCompatibilityScores', 'hasKeywords', 'hasEvaluations',
+      'resultCompressed', 'resumeContentCompressed', 'compression']) {
+      await queryInterface.removeColumn(TABLE, name);
+    }
+
+    console.log('⏪ Migração revertida: análises descompactadas');
+  }
+};
@@ -0,0 +1,115 @@
+const { DataTypes } = require('sequelize');
+const sequelize = require('../db');
+
+/**
+ * Job de análise ATS assíncrona
+ * Estado durável da fila: sobrevive a reinícios do processo (ver analysisQueue.recover)
+ */
+const AnalysisJob = sequelize.define('AnalysisJob', {
+    id: {
+        type: DataTypes.UUID,
+        defaultValue: DataTypes.UUIDV4,
+        primaryKey: true
+    },
+    userId: {
+        type: DataTypes.INTEGER,
+        allowNull: false,
+        references: {
+            model: 'users',
+            key: 'id'
+        }
+    },
+    status: {
+        type: DataTypes.ENUM('queued', 'running', 'completed', 'failed'),
+        allowNull: false,
+        defaultValue: 'queued'
+    },
+    priority: {
+        type: DataTypes.INTEGER,
+        allowNull: false,
+        defaultValue: 0
+    },
+    stage: {
+        type: DataTypes.STRING,
+        allowNull: true
+    },
+    progress: {
+        type: DataTypes.INTEGER,
+        allowNull: false,
+        defaultValue: 0
+    },
+    resumePath: {
+        type: DataTypes.STRING,
+        allowNull: false
+    },
+    resumeFileName: {
+        type: DataTypes.STRING,
+        allowNull: true
+    },
+    jobUrls: {
+        type: DataTypes.JSON,
+        allowNull: false
+    },
+    result: {
+        type: DataTypes.JSON,
+        allowNull: true
+    },
+    error: {
+        type: DataTypes.TEXT,
+        allowNull: true
+    },
+    attempts: {
+        type: DataTypes.INTEGER,
+        allowNull: false,
+        defaultValue: 0
+    },
+    // Marcado na mesma transação do débito: garante cobrança única por job
+    creditCharged: {
+        type: DataTypes.BOOLEAN,
+        allowNull: false,
+        defaultValue: false
+    },
+    analysisResultId: {
+        type: DataTypes.UUID,
+        allowNull: true
+    },
+    startedAt: {
+        type: DataTypes.DATE,
+        allowNull: true
+    },
+    finishedAt: {
+        type: DataTypes.DATE,
+        allowNull: true
+    }
+}, {
+    tableName: 'analysis_jobs',
+    timestamps: true,
+    indexes: [
+        { fields: ['userId', 'status'] },
+        { fields: ['status', 'priority', 'createdAt'] }
+    ]
+});
+
+/**
+ * Representação pública do job (sem caminho interno do arquivo)
+ * Função estática em vez de método de instância: funciona também com o mock do banco nos testes
+ * @param {AnalysisJob} job
+ */
+AnalysisJob.toPublicJSON = function (job) {
+    return {
+        id: job.id,
+        status: job.status,
+        stage: job.stage,
+        progress: job.progress,
+        fileName: job.resumeFileName,
+        jobCount: Array.isArray(job.jobUrls) ? job.jobUrls.length : 0,
+        error: job.error,
+        analysisId: job.analysisResultId,
+        createdAt: job.createdAt,
+        startedAt: job.startedAt,
+        finishedAt: job.finishedAt,
+        result: job.status === 'completed' ? job.result : undefined
+    };
+};
+
+module.exports = AnalysisJob;
@@ -1,5 +1,6 @@
-const { DataTypes } = require('sequelize');
+const { DataTypes, Op } = require('sequelize');
 const sequelize = require('../db');
+const analysisStorage = require('../utils/analysisStorage');
 
 const AnalysisResults = sequelize.define('AnalysisResults', {
     id: {
@@ -60,9 +61,10 @@ const AnalysisResults = sequelize.define('AnalysisResults', {
             }
         }
     },
+    // Legado: análises novas guardam o resultado comprimido em resultCompressed
     result: {
         type: DataTypes.JSON,
-        allowNull: false,
+        allowNull: true,
         get() {
             const rawValue = this.getDataValue('result');
             if (!rawValue) return {};
@@ -97,6 +99,36 @@ const AnalysisResults = sequelize.define('AnalysisResults', {
             }
         }
     },
+    // Resumo calculado no salvamento para a listagem do histórico
+    jobCount: {
+        type: DataTypes.INTEGER,
+        allowNull: true
+    },
+    hasCompatibilityScores: {
+        type: DataTypes.BOOLEAN,
+        allowNull: true
+    },
+    hasKeywords: {
+        type: DataTypes.BOOLEAN,
+        allowNull: true
+    },
+    hasEvaluations: {
+        type: DataTypes.BOOLEAN,
+        allowNull: true
+    },
+    // Conteúdo grande comprimido, lido apenas em findUserAnalysis
+    resultCompressed: {
+        type: DataTypes.BLOB,
+        allowNull: true
+    },
+    resumeContentCompressed: {
+        type: DataTypes.BLOB,
+        allowNull: true
+    },
+    compression: {
+        type: DataTypes.STRING(8),
+        allowNull: true
+    },
     createdAt: {
         type: DataTypes.DATE,
         defaultValue: DataTypes.NOW,
@@ -108,8 +140,15 @@ const AnalysisResults = sequelize.define('AnalysisResults', {
 }, {
     tableName: 'AnalysisResults',
     timestamps: true,
+    indexes: [
+        {
+            // Paginação por (userId, createdAt) na listagem do histórico
+            name: 'analysis_results_user_created_idx',
+            fields: ['userId', 'createdAt', 'id']
+        }
+    ],
     hooks: {
-        beforeCreate: (analysis) => {
+        beforeCreate: async (analysis) => {
             // Validar dados antes de criar
             if (!analysis.result || typeof analysis.result !== 'object') {
                 throw new Error('Result deve ser um objeto válido');
@@ -118,36 +157,121 @@ const AnalysisResults = sequelize.define('AnalysisResults', {
             if (!analysis.userId) {
                 throw new Error('UserId é obrigatório');
             }
+
+            await compactAnalysis(analysis);
         },
-        beforeUpdate: (analysis) => {
+        beforeUpdate: async (analysis) => {
             // Validar dados antes de atualizar
             if (analysis.changed('result') && (!analysis.result || typeof analysis.result !== 'object')) {
                 throw new Error('Result deve ser um objeto válido');
             }
+
+            if (analysis.changed('result') || analysis.changed('resumeContent')) {
+                await compactAnalysis(analysis);
+            }
         }
     }
 });
 
-// Método para buscar análises de um usuário com dados formatados
-AnalysisResults.findUserAnalyses = async function (userId, limit = 50) {
+/**
+ * Preenche o resumo e move resultado/currículo para as colunas comprimidas
+ */
+async function compactAnalysis(analysis) {
+    const result = analysis.getDataValue('result');
+    const resumeContent = analysis.getDataValue('resumeContent');
+
+    if (result) {
+        const summary = analysisStorage.summarize(result, analysis.jobUrls);
+        Object.keys(summary).forEach(field => analysis.setDataValue(field, summary[field]));
+        analysis.setDataValue('resultCompressed', await analysisStorage.compressJSON(result));
+        analysis.setDataValue('result', null);
+    }
+
+    if (resumeContent) {
+        analysis.setDataValue('resumeContentCompressed', await analysisStorage.compressText(resumeContent));
+        analysis.setDataValue('resumeContent', null);
+    }
+
+    analysis.setDataValue('compression', analysisStorage.COMPRESSION);
+}
+
+// Resultado completo (comprimido ou legado)
+AnalysisResults.prototype.loadResult = async function () {
+    if (this.resultCompressed) {
+        return analysisStorage.decompressJSON(this.resultCompressed, this.compression);
+    }
+    return this.result;
+};
+
+// Texto do currículo (comprimido ou legado)
+AnalysisResults.prototype.loadResumeContent = async function () {
+    if (this.resumeContentCompressed) {
+        return analysisStorage.decompressText(this.resumeContentCompressed, this.compression);
+    }
+    return this.resumeContent;
+};
+
+// Colunas lidas na listagem: nenhuma coluna grande
+const LIST_ATTRIBUTES = [
+    'id', 'resumeFileName', 'jobUrls', 'createdAt',
+    'jobCount', 'hasCompatibilityScores', 'hasKeywords', 'hasEvaluations'
+];
+
+function encodeCursor(analysis) {
+    const createdAt = new Date(analysis.createdAt).toISOString();
+    return Buffer.from(`${createdAt}|${analysis.id}`).toString('base64url');
+}
+
+function decodeCursor(cursor) {
+    if (!cursor) return null;
+    const [createdAt, id] = Buffer.from(String(cursor), 'base64url').toString().split('|');
+    const date = new Date(createdAt);
+    if (!id || isNaN(date.getTime())) return null;
+    return { createdAt: date, id };
+}
+
+// Página do histórico de um usuário (keyset em createdAt/id, mais recentes primeiro)
+AnalysisResults.findUserAnalysesPage = async function (userId, { limit = 50, cursor } = {}) {
+    const where = { userId };
+    const position = decodeCursor(cursor);
+    if (position) {
+        where[Op.or] = [
+            { createdAt: { [Op.lt]: position.createdAt } },
+            { createdAt: position.createdAt, id: { [Op.lt]: position.id } }
+        ];
+    }
+
     const analyses = await this.findAll({
-        where: { userId },
-        order: [['createdAt', 'DESC']],
-        limit: limit
+        attributes: LIST_ATTRIBUTES,
+        where,
+        order: [['createdAt', 'DESC'], ['id', 'DESC']],
+        limit: limit + 1
     });
 
-    return analyses.map(analysis => ({
+    const page = analyses.slice(0, limit);
+    const items = page.map(analysis => ({
         id: analysis.id,
         fileName: analysis.resumeFileName,
         jobUrls: analysis.jobUrls,
         createdAt: analysis.createdAt,
-        jobCount: Array.isArray(analysis.jobUrls) ? analysis.jobUrls.length : 0,
+        jobCount: analysis.jobCount ?? (Array.isArray(analysis.jobUrls) ? analysis.jobUrls.length : 0),
         summary: {
-            hasCompatibilityScores: !!(analysis.result && analysis.result.jobs),
-            hasKeywords: !!(analysis.result && analysis.result.job_keywords),
-            hasEvaluations: !!(analysis.result && (analysis.result.resumo || analysis.result.idiomas))
+            hasCompatibilityScores: !!analysis.hasCompatibilityScores,
+            hasKeywords: !!analysis.hasKeywords,
+            hasEvaluations: !!analysis.hasEvaluations
         }
     }));
+
+    return {
+        items,
+        nextCursor: analyses.length > limit ? encodeCursor(page[page.length - 1]) : null
+    };
+};
+
+// Método para buscar análises de um usuário com dados formatados
+AnalysisResults.findUserAnalyses = async function (userId, limit = 50) {
+    const { items } = await this.findUserAnalysesPage(userId, { limit });
+    return items;
 };
 
 // Método para buscar análise específica com validação de usuário
@@ -163,8 +287,8 @@ AnalysisResults.findUserAnalysis = async function (analysisId, userId) {
         return null;
     }
 
-    // Preparar dados para o frontend
-    const result = analysis.result;
+    // Preparar dados para o frontend (descomprime apenas aqui)
+    const result = (await analysis.loadResult()) || {};
     result.isHistoricalView = true;
     result.originalDate = analysis.createdAt;
     result.fileName = analysis.resumeFileName;
@@ -0,0 +1,21 @@
+const { DataTypes } = require('sequelize');
+const sequelize = require('../db');
+
+// Contadores do painel admin, mantidos de forma incremental por services/giftCodeCounters
+const GiftCodeCounter = sequelize.define('GiftCodeCounter', {
+  name: {
+    type: DataTypes.STRING(64),
+    primaryKey: true,
+    comment: 'Nome do contador (ex: totalCodes, usages:2025-10-18)'
+  },
+  value: {
+    type: DataTypes.INTEGER,
+    allowNull: false,
+    defaultValue: 0
+  }
+}, {
+  tableName: 'gift_code_counters',
+  timestamps: true,
+});
+
+module.exports = GiftCodeCounter;
@@ -2,7 +2,9 @@ const express = require('express');
 const multer = require('multer');
 const path = require('path');
 const atsController = require('../controllers/atsController');
+const analysisJobController = require('../controllers/analysisJobController');
 const authMiddleware = require('../utils/authMiddleware');
+const metrics = require('../utils/metrics');
 
 const router = express.Router();
 const storage = multer.diskStorage({
@@ -18,11 +20,18 @@ const storage = multer.diskStorage({
     }
 });
 const upload = multer({ storage });
+const uploadResume = metrics.timed('upload', upload.single('resume'));
 
-router.post('/analyze', authMiddleware, upload.single('resume'), atsController.analyze);
+router.post('/analyze', authMiddleware, uploadResume, atsController.analyze);
 
 // Novas rotas para histórico de análises
 router.get('/history', authMiddleware, atsController.getAnalysisHistory);
 router.get('/analysis/:id', authMiddleware, atsController.getAnalysisById);
 
+// Análises assíncronas: enfileira e acompanha o progresso
+router.post('/jobs', authMiddleware, uploadResume, analysisJobController.enqueue);
+router.get('/jobs/:id', authMiddleware, analysisJobController.getJob);
+// EventSource não envia cabeçalhos: token do job (eventsUrl) na query string
+router.get('/jobs/:id/events', authMiddleware.jobEventsAuth, analysisJobController.streamEvents);
+
 module.exports = router;
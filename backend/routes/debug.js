@@ -30,13 +30,15 @@ router.get('/rate-limits', (req, res) => {
 });
 
 // Endpoint para resetar contadores de rate limit (apenas para debug)
-router.post('/reset-rate-limits', (req, res) => {
+router.post('/reset-rate-limits', async (req, res) => {
     try {
         // Reset manual dos contadores
         rateLimitMonitor.openaiLimits.requests.used = 0;
         rateLimitMonitor.openaiLimits.tokens.used = 0;
         rateLimitMonitor.claudeLimits.requests.used = 0;
         rateLimitMonitor.claudeLimits.tokens.used = 0;
+        // Orçamento global compartilhado entre workers
+        await rateLimitMonitor.resetBudgets();
 
         res.json({
             success: true,
@@ -0,0 +1,27 @@
+const express = require('express');
+const crypto = require('crypto');
+const router = express.Router();
+const metrics = require('../utils/metrics');
+
+// Compara o token sem vazar o tamanho do acerto pelo tempo de resposta
+function validToken(header, token) {
+    const expected = Buffer.from(`Bearer ${token}`);
+    const received = Buffer.from(header || '');
+    return received.length === expected.length && crypto.timingSafeEqual(received, expected);
+}
+
+// Métricas no formato Prometheus (METRICS_TOKEN como Bearer; obrigatório em produção)
+router.get('/', async (req, res) => {
+    const token = process.env.METRICS_TOKEN;
+    if (!token && process.env.NODE_ENV === 'production') {
+        return res.status(403).json({ error: 'Métricas desabilitadas: defina METRICS_TOKEN' });
+    }
+    if (token && !validToken(req.get('Authorization'), token)) {
+        return res.status(401).json({ error: 'Token de métricas inválido' });
+    }
+
+    res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+    res.send(await metrics.collect());
+});
+
+module.exports = router;
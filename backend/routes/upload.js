@@ -3,6 +3,7 @@ const router = express.Router();
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
+const metrics = require('../utils/metrics');
 
 // Configure storage for uploaded files
 const storage = multer.diskStorage({
@@ -39,7 +40,7 @@ const upload = multer({
 });
 
 // Route for file upload
-router.post('/resume', upload.single('resume'), (req, res) => {
+router.post('/resume', metrics.timed('upload', upload.single('resume')), (req, res) => {
   try {
     if (!req.file) {
       return res.status(400).json({ error: 'Nenhum arquivo foi enviado' });
@@ -0,0 +1,175 @@
+#!/usr/bin/env node
+
+/**
+ * Benchmark da listagem do histórico de análises
+ *
+ * Popula um banco temporário com N análises de um usuário (resultado JSON e
+ * texto do currículo de tamanho realista) em dois formatos e compara:
+ *  - legado: findAll de linhas completas + resumo calculado sobre o resultado
+ *  - compacto: projeção das colunas de resumo + página keyset (LIMIT)
+ *
+ * Mede latência (p50/p95) e bytes/heap alocados por requisição.
+ *
+ * Uso: node scripts/benchmark-analysis-history.js [análises] [requisições]
+ * Banco: SQLite temporário, ou BENCH_DATABASE_URL (ex.: Postgres de staging)
+ */
+
+const os = require('os');
+const fs = require('fs');
+const path = require('path');
+const { performance } = require('perf_hooks');
+const { Sequelize, DataTypes } = require('sequelize');
+const analysisStorage = require('../utils/analysisStorage');
+
+const ROWS = parseInt(process.argv[2]) || 500;
+const REQUESTS = parseInt(process.argv[3]) || 50;
+const PAGE_SIZE = 50;
+const USER_ID = 1;
+
+function createDatabase() {
+    if (process.env.BENCH_DATABASE_URL) {
+        return { sequelize: new Sequelize(process.env.BENCH_DATABASE_URL, { logging: false }), cleanup: () => { } };
+    }
+
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'bench-history-'));
+    const sequelize = new Sequelize({ dialect: 'sqlite', storage: path.join(dir, 'bench.sqlite'), logging: false });
+    return { sequelize, cleanup: () => fs.rmSync(dir, { recursive: true, force: true }) };
+}
+
+// Resultado no formato retornado pela análise ATS (~30-60KB de JSON)
+function fakeResult(index) {
+    const jobs = Array.from({ length: 5 }, (_, job) => ({
+        name: `Vaga ${index}-${job}`,
+        link: `https://empresa.gupy.io/jobs/${index * 10 + job}`,
+        compatibilidade: 40 + ((index + job) % 60),
+        descricao: 'Responsabilidades e requisitos da vaga. '.repeat(80)
+    }));
+    return {
+        jobs,
+        job_keywords: Array.from({ length: 120 }, (_, k) => `palavra-chave-${k}`),
+        resumo: { nota: 7, sugestao: 'Detalhe mais suas conquistas com números. '.repeat(30) },
+        idiomas: { nota: 6, sugestao: 'Informe o nível de inglês. '.repeat(20) },
+        conclusion: 'Conclusão da análise. '.repeat(50)
+    };
+}
+
+const RESUME_TEXT = 'Experiência profissional, formação e habilidades do candidato. '.repeat(150);
+
+function percentile(sorted, p) {
+    return sorted[Math.min(sorted.length - 1, Math.ceil(sorted.length * p) - 1)] || 0;
+}
+
+async function measure(name, query) {
+    await query(); // aquecimento
+
+    const latencies = [];
+    let bytes = 0;
+    global.gc && global.gc();
+    const heapBefore = process.memoryUsage().heapUsed;
+    let heapPeak = heapBefore;
+
+    for (let i = 0; i < REQUESTS; i++) {
+        const start = performance.now();
+        const items = await query();
+        latencies.push(performance.now() - start);
+        bytes += Buffer.byteLength(JSON.stringify(items));
+        heapPeak = Math.max(heapPeak, process.memoryUsage().heapUsed);
+    }
+
+    latencies.sort((a, b) => a - b);
+    const kb = value => (value / 1024).toFixed(1);
+    console.log(`${name.padEnd(9)} p50=${percentile(latencies, 0.5).toFixed(1)}ms  p95=${percentile(latencies, 0.95).toFixed(1)}ms  ` +
+        `resposta=${kb(bytes / REQUESTS)}KB/req  heap pico=+${kb(heapPeak - heapBefore)}KB`);
+}
+
+async function main() {
+    const { sequelize, cleanup } = createDatabase();
+
+    const common = {
+        id: { type: DataTypes.UUID, defaultValue: DataTypes.UUIDV4, primaryKey: true },
+        userId: { type: DataTypes.INTEGER, allowNull: false },
+        resumeFileName: DataTypes.STRING,
+        jobUrls: DataTypes.JSON
+    };
+
+    const Legacy = sequelize.define('BenchLegacyAnalysis', {
+        ...common,
+        resumeContent: DataTypes.TEXT,
+        result: DataTypes.JSON
+    }, { tableName: 'bench_legacy_analyses' });
+
+    const Slim = sequelize.define('BenchSlimAnalysis', {
+        ...common,
+        jobCount: DataTypes.INTEGER,
+        hasCompatibilityScores: DataTypes.BOOLEAN,
+        hasKeywords: DataTypes.BOOLEAN,
+        hasEvaluations: DataTypes.BOOLEAN,
+        resultCompressed: DataTypes.BLOB,
+        resumeContentCompressed: DataTypes.BLOB,
+        compression: DataTypes.STRING(8)
+    }, {
+        tableName: 'bench_slim_analyses',
+        indexes: [{ fields: ['userId', 'createdAt', 'id'] }]
+    });
+
+    try {
+        await sequelize.sync({ force: true });
+
+        console.log(`🌱 Populando ${ROWS} análises...`);
+        let rawBytes = 0;
+        let compressedBytes = 0;
+        for (let i = 0; i < ROWS; i++) {
+            const result = fakeResult(i);
+            const jobUrls = result.jobs.map(job => job.link);
+            const createdAt = new Date(Date.now() - i * 60000);
+            const base = { userId: USER_ID, resumeFileName: `cv-${i}.pdf`, jobUrls, createdAt, updatedAt: createdAt };
+
+            await Legacy.create({ ...base, resumeContent: RESUME_TEXT, result });
+
+            const resultCompressed = await analysisStorage.compressJSON(result);
+            const resumeContentCompressed = await analysisStorage.compressText(RESUME_TEXT);
+            rawBytes += Buffer.byteLength(JSON.stringify(result)) + Buffer.byteLength(RESUME_TEXT);
+            compressedBytes += resultCompressed.length + resumeContentCompressed.length;
+
+            await Slim.create({
+                ...base,
+                ...analysisStorage.summarize(result, jobUrls),
+                resultCompressed,
+                resumeContentCompressed,
+                compression: analysisStorage.COMPRESSION
+            });
+        }
+        console.log(`📦 Armazenamento: ${(rawBytes / 1024 / 1024).toFixed(1)}MB → ${(compressedBytes / 1024 / 1024).toFixed(1)}MB comprimidos\n`);
+
+        // Listagem antiga: todas as colunas, resumo calculado em memória
+        await measure('legado', async () => {
+            const analyses = await Legacy.findAll({ where: { userId: USER_ID }, order: [['createdAt', 'DESC']], limit: PAGE_SIZE });
+            return analyses.map(analysis => ({
+                id: analysis.id,
+                fileName: analysis.resumeFileName,
+                jobUrls: analysis.jobUrls,
+                createdAt: analysis.createdAt,
+                ...analysisStorage.summarize(analysis.result, analysis.jobUrls)
+            }));
+        });
+
+        await measure('compacto', async () => {
+            const analyses = await Slim.findAll({
+                attributes: ['id', 'resumeFileName', 'jobUrls', 'createdAt', 'jobCount',
+                    'hasCompatibilityScores', 'hasKeywords', 'hasEvaluations'],
+                where: { userId: USER_ID },
+                order: [['createdAt', 'DESC'], ['id', 'DESC']],
+                limit: PAGE_SIZE + 1
+            });
+            return analyses.slice(0, PAGE_SIZE).map(analysis => analysis.get({ plain: true }));
+        });
+    } finally {
+        await sequelize.close();
+        cleanup();
+    }
+}
+
+main().catch(error => {
+    console.error('❌ Erro no benchmark:', error);
+    process.exit(1);
+});
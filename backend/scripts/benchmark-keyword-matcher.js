@@ -0,0 +1,88 @@
+#!/usr/bin/env node
+
+/**
+ * Micro-benchmark do matching de palavras-chave
+ *
+ * Compara a implementação antiga (uma RegExp por palavra-chave × forma × variação,
+ * reescaneando o texto inteiro) com o keywordMatcher (normalização/tokenização
+ * única + varredura única) usando os textos de test-scripts/test-large-analysis.js.
+ *
+ * Uso: node scripts/benchmark-keyword-matcher.js [iterações]
+ */
+
+const { performance } = require('perf_hooks');
+const verifier = require('../services/atsKeywordVerifier');
+const legacy = require('../tests/helpers/legacyKeywordVerifier');
+const { largeCVText, sevenJobsText } = require('../test-scripts/test-large-analysis');
+
+const ITERATIONS = parseInt(process.argv[2]) || 50;
+
+// ~80 palavras-chave, volume típico extraído pelo LLM para 7 vagas
+const KEYWORDS = [
+    'JavaScript', 'React', 'Node.js', 'Python', 'TypeScript', 'APIs', 'API RESTful', 'GraphQL',
+    'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP', 'microserviços', 'arquitetura de software',
+    'arquitetura de sistemas', 'metodologias ágeis', 'Scrum', 'Kanban', 'liderança técnica',
+    'code reviews', 'testes automatizados', 'testes unitários', 'Jest', 'Cypress', 'CI/CD',
+    'DevOps', 'bancos de dados', 'PostgreSQL', 'MongoDB', 'Redis', 'inglês', 'inglês avançado',
+    'espanhol', 'comunicação', 'comunicação efetiva', 'gestão de equipes', 'gestão do backlog',
+    'mentoria', 'desenvolvimento de aplicações web', 'Product Owner', 'design patterns',
+    'pair programming', 'performance', 'otimização de performance', 'cloud', 'segurança',
+    'LGPD', 'Git', 'HTML5', 'CSS3', 'Next.js', 'Vue.js', 'Angular', 'Java', 'Spring',
+    'trabalho em equipe', 'integração com APIs', 'análise de dados', 'machine learning',
+    'engenharia de software', 'boas práticas', 'clean code', 'SOLID', 'TDD', 'monitoramento',
+    'observabilidade', 'escalabilidade', 'alta disponibilidade', 'resolução de problemas',
+    'pensamento crítico', 'proatividade', 'autonomia', 'visão de produto', 'stakeholders',
+    'documentação técnica', 'open source', 'startups', 'fintech', 'e-commerce', 'SaaS'
+];
+
+function timeIt(fn) {
+    const durations = [];
+    for (let i = 0; i < ITERATIONS; i++) {
+        const start = performance.now();
+        fn(i);
+        durations.push(performance.now() - start);
+    }
+    durations.sort((a, b) => a - b);
+    return {
+        mean: durations.reduce((sum, d) => sum + d, 0) / durations.length,
+        p50: durations[Math.floor(durations.length * 0.5)],
+        p95: durations[Math.min(durations.length - 1, Math.ceil(durations.length * 0.95) - 1)]
+    };
+}
+
+// Mesma sequência de chamadas feita pelo atsController
+function analyze(impl, jobsText, resumeText) {
+    const counts = impl.countKeywordOccurrences(KEYWORDS, jobsText);
+    const present = impl.filterPresentKeywords(KEYWORDS, resumeText);
+    return { counts, present };
+}
+
+function report(name, stats, baseline) {
+    const speedup = baseline ? `  (${(baseline.mean / stats.mean).toFixed(1)}x)` : '';
+    console.log(`${name.padEnd(34)} média=${stats.mean.toFixed(2)}ms  p50=${stats.p50.toFixed(2)}ms  p95=${stats.p95.toFixed(2)}ms${speedup}`);
+}
+
+function main() {
+    // Garantir que os resultados são idênticos antes de medir
+    const expected = JSON.stringify(analyze(legacy, sevenJobsText, largeCVText));
+    const actual = JSON.stringify(analyze(verifier, sevenJobsText, largeCVText));
+    if (expected !== actual) {
+        console.error('❌ Resultados divergentes entre as implementações');
+        process.exit(1);
+    }
+
+    console.log(`🏁 ${KEYWORDS.length} palavras-chave, vagas=${sevenJobsText.length} chars, CV=${largeCVText.length} chars, ${ITERATIONS} iterações\n`);
+
+    const baseline = timeIt(() => analyze(legacy, sevenJobsText, largeCVText));
+    report('Regex por palavra-chave (antigo)', baseline);
+
+    // Textos inéditos a cada iteração: inclui normalização/tokenização
+    report('keywordMatcher (textos novos)', timeIt(i =>
+        analyze(verifier, `${sevenJobsText} ${i}`, `${largeCVText} ${i}`)), baseline);
+
+    // Mesmos textos: automato e textos preparados em cache
+    report('keywordMatcher (cache quente)', timeIt(() =>
+        analyze(verifier, sevenJobsText, largeCVText)), baseline);
+}
+
+main();
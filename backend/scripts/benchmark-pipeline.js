@@ -0,0 +1,431 @@
+#!/usr/bin/env node
+
+/**
+ * Benchmark de carga do pipeline ATS (headless)
+ *
+ * Reenvia os currículos de exemplo de uploads/ para um app Express local com as
+ * mesmas etapas das rotas de análise (upload multer → extração → scraping → LLM →
+ * Gupy/verificação → gravação no banco). Vagas e LLM (OpenAI/Claude) são
+ * servidores stub com latência variável rodando em outro processo, para não
+ * disputar o event loop medido. Reporta vazão e p50/p95/p99 por etapa a partir
+ * dos spans de utils/metrics, além do atraso do event loop e do pico de heap.
+ *
+ * Uso: node scripts/benchmark-pipeline.js [opções]
+ *   --requests 60          análises medidas
+ *   --concurrency 4        clientes simultâneos
+ *   --llm-latency 800      latência mediana do LLM stub (ms)
+ *   --llm-error-rate 0     fração de respostas 429 da OpenAI (exercita retentativas)
+ *   --board-latency 150    latência mediana das páginas de vaga (ms)
+ *   --warm                 reenviar os mesmos bytes (usa o cache de texto extraído)
+ *   --no-save              pular a gravação no banco
+ *   --json arquivo         salvar o relatório em JSON
+ *   --baseline arquivo     comparar com relatório anterior; sai com 1 se houver regressão
+ *   --tolerance 0.25       piora tolerada no p95 de cada etapa e na vazão
+ *
+ * Banco: SQLite temporário (nunca o banco de desenvolvimento).
+ */
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const http = require('http');
+const { fork } = require('child_process');
+
+function option(name, fallback) {
+    const index = process.argv.indexOf(`--${name}`);
+    if (index === -1) return fallback;
+    if (typeof fallback === 'boolean') return true;
+    const value = process.argv[index + 1];
+    return typeof fallback === 'number' ? parseFloat(value) : value;
+}
+
+const OPTIONS = {
+    requests: option('requests', 60),
+    concurrency: option('concurrency', 4),
+    llmLatency: option('llm-latency', 800),
+    llmErrorRate: option('llm-error-rate', 0),
+    boardLatency: option('board-latency', 150),
+    warm: option('warm', false),
+    save: !option('no-save', false),
+    json: option('json', null),
+    baseline: option('baseline', null),
+    tolerance: option('tolerance', 0.25),
+    verbose: option('verbose', false)
+};
+
+const LINKS_PER_ANALYSIS = 7;
+const GUPY_LINKS = 2;
+const UPLOADS_DIR = path.join(__dirname, '..', 'uploads');
+
+// Ordem das etapas no relatório
+const STAGES = ['upload', 'extract', 'scrape', 'scrape_url', 'llm', 'llm_request:openai', 'llm_request:claude', 'gupy', 'verify', 'save'];
+
+// ---------------------------------------------------------------------------
+// Servidores stub (processo filho)
+// ---------------------------------------------------------------------------
+
+const KEYWORDS = [
+    'JavaScript', 'Node.js', 'React', 'TypeScript', 'SQL', 'PostgreSQL', 'APIs REST', 'Docker',
+    'Kubernetes', 'AWS', 'testes automatizados', 'metodologias ágeis', 'Scrum', 'Kanban', 'Git',
+    'CI/CD', 'microsserviços', 'mensageria', 'Python', 'análise de dados', 'Excel', 'Power BI',
+    'comunicação', 'liderança', 'gestão de projetos', 'inglês', 'negociação', 'atendimento ao cliente',
+    'arquitetura de software', 'segurança da informação', 'observabilidade', 'escopo', 'definir escopo',
+    'documentação técnica', 'code review', 'resolução de problemas', 'trabalho em equipe', 'Jira',
+    'GraphQL', 'Redis', 'MongoDB', 'Linux', 'performance', 'UX', 'Figma', 'produto', 'indicadores'
+];
+
+// Página de vaga com o ruído típico de um job board (~40KB)
+function jobHtml(id) {
+    const pick = (offset, count) => Array.from({ length: count }, (_, i) => KEYWORDS[(id * 7 + offset + i) % KEYWORDS.length]);
+    const nav = '<nav><a href="/">Início</a><a href="/vagas">Vagas</a><a href="/empresas">Empresas</a></nav>'.repeat(20);
+    const footer = '<footer><p>Política de privacidade · Termos de uso · Cookies · Acessibilidade</p></footer>'.repeat(30);
+    return `<!doctype html><html><head><title>Vaga ${id}</title><script>${'var x=1;'.repeat(2000)}</script></head><body>
+${nav}
+<h1>Pessoa Desenvolvedora ${id}</h1>
+<h2>Sobre a vaga</h2><p>${'Buscamos uma pessoa para atuar no time de plataforma com foco em qualidade e entrega contínua. '.repeat(15)}</p>
+<h2>Responsabilidades</h2><ul>${pick(0, 10).map(k => `<li>Atuar com ${k} no dia a dia do time</li>`).join('')}</ul>
+<h2>Requisitos</h2><ul>${pick(10, 12).map(k => `<li>Experiência com ${k}</li>`).join('')}</ul>
+<h2>Diferenciais</h2><ul>${pick(22, 6).map(k => `<li>Conhecimento em ${k}</li>`).join('')}</ul>
+${footer}
+</body></html>`;
+}
+
+// Latência com cauda longa em torno da mediana
+function latency(median) {
+    const roll = Math.random();
+    if (roll < 0.9) return median * (0.6 + Math.random() * 0.8);
+    return median * (2 + Math.random() * 2);
+}
+
+function llmPayload(links) {
+    return JSON.stringify({
+        job_keywords: KEYWORDS,
+        resume_keywords: KEYWORDS.filter((_, i) => i % 3 === 0),
+        jobs: links.map((link, i) => ({
+            title: `Pessoa Desenvolvedora ${i}`,
+            link,
+            description: `Experiência com ${KEYWORDS.slice(i, i + 12).join(', ')}. `.repeat(10)
+        })),
+        resumo: { nota: 7, sugestao: 'Destaque resultados com números.' },
+        idiomas: { nota: 6, sugestao: 'Informe o nível de inglês.' },
+        conclusion: 'Análise gerada pelo LLM stub.'
+    });
+}
+
+function listen(server) {
+    return new Promise(resolve => server.listen(0, '127.0.0.1', () => resolve(`http://127.0.0.1:${server.address().port}`)));
+}
+
+async function runStubs(options) {
+    const pages = new Map();
+
+    // Três job boards (hosts distintos por porta, como no fetchScheduler real)
+    const boards = await Promise.all([0, 1, 2].map(() => listen(http.createServer((req, res) => {
+        const id = parseInt(req.url.split('/').pop()) || 0;
+        if (!pages.has(id)) pages.set(id, jobHtml(id));
+        setTimeout(() => {
+            res.writeHead(200, { 'Content-Type': 'text/html; charset=utf-8' });
+            res.end(pages.get(id));
+        }, latency(options.boardLatency));
+    }))));
+
+    // Links no caminho "gupy.io" acionam a análise específica da Gupy
+    const links = Array.from({ length: LINKS_PER_ANALYSIS }, (_, i) => (i < GUPY_LINKS
+        ? `${boards[i % boards.length]}/gupy.io/vaga/${i}`
+        : `${boards[i % boards.length]}/vaga/${i}`));
+    const content = llmPayload(links);
+
+    const llm = await listen(http.createServer((req, res) => {
+        req.resume();
+        req.on('end', () => setTimeout(() => {
+            if (req.url.startsWith('/claude')) {
+                res.writeHead(200, { 'Content-Type': 'application/json' });
+                return res.end(JSON.stringify({ content: [{ type: 'text', text: content }] }));
+            }
+
+            const headers = {
+                'Content-Type': 'application/json',
+                'x-ratelimit-limit-requests': '10000',
+                'x-ratelimit-remaining-requests': '9990',
+                'x-ratelimit-limit-tokens': '30000000',
+                'x-ratelimit-remaining-tokens': '29900000'
+            };
+            if (Math.random() < options.llmErrorRate) {
+                res.writeHead(429, headers);
+                return res.end(JSON.stringify({ error: { type: 'rate_limit_exceeded', message: 'stub' } }));
+            }
+            res.writeHead(200, headers);
+            res.end(JSON.stringify({ choices: [{ message: { role: 'assistant', content } }] }));
+        }, latency(options.llmLatency)));
+    }));
+
+    process.send({ ready: true, links, llm });
+}
+
+function startStubs() {
+    return new Promise((resolve, reject) => {
+        const child = fork(__filename, ['--stubs', JSON.stringify(OPTIONS)], { stdio: 'inherit' });
+        child.once('message', ({ links, llm }) => resolve({ child, links, llm }));
+        child.once('error', reject);
+        child.once('exit', code => reject(new Error(`Processo dos stubs saiu (${code})`)));
+    });
+}
+
+// ---------------------------------------------------------------------------
+// App sob teste (este processo)
+// ---------------------------------------------------------------------------
+
+async function setupDatabase(dir) {
+    process.env.SQLITE_STORAGE = path.join(dir, 'bench.sqlite');
+    const sequelize = require('../db');
+    const User = require('../models/user');
+    require('../models/AnalysisResults');
+
+    await sequelize.sync();
+    const user = await User.create({ name: 'Benchmark', email: 'benchmark@example.com', password: 'benchmark' });
+    return { sequelize, userId: user.id };
+}
+
+function createApp({ uploadDir, userId }) {
+    const express = require('express');
+    const multer = require('multer');
+    const metrics = require('../utils/metrics');
+    const analysisPipeline = require('../services/analysisPipeline');
+
+    // Mesmo armazenamento da rota /api/ats (extensão original preservada)
+    const storage = multer.diskStorage({
+        destination: uploadDir,
+        filename: (req, file, cb) => cb(null, `${Date.now()}-${Math.round(Math.random() * 1E9)}${path.extname(file.originalname)}`)
+    });
+    const upload = multer({ storage });
+
+    const app = express();
+    app.post('/analyze', metrics.timed('upload', upload.single('resume')), async (req, res) => {
+        const resumePath = req.file.path;
+        const jobLinks = JSON.parse(req.body.jobLinks);
+        try {
+            const { result, resumeText } = await analysisPipeline.runAnalysis({ resumePath, jobLinks });
+            if (userId) {
+                await analysisPipeline.saveAnalysis({ userId, fileName: req.file.originalname, resumeText, jobLinks, result });
+            }
+            res.json({ ok: true, saveError: !!result.historySaveError });
+        } catch (error) {
+            res.status(500).json({ error: error.message });
+        } finally {
+            fs.unlink(resumePath, () => { });
+        }
+    });
+    return app;
+}
+
+// ---------------------------------------------------------------------------
+// Medição e relatório
+// ---------------------------------------------------------------------------
+
+function percentile(sorted, p) {
+    if (!sorted.length) return 0;
+    return sorted[Math.min(sorted.length - 1, Math.max(0, Math.ceil((p / 100) * sorted.length) - 1))];
+}
+
+function summarize(samples) {
+    const sorted = samples.map(sample => sample.durationMs).sort((a, b) => a - b);
+    return {
+        count: sorted.length,
+        errors: samples.filter(sample => sample.outcome === 'error').length,
+        p50: percentile(sorted, 50),
+        p95: percentile(sorted, 95),
+        p99: percentile(sorted, 99),
+        max: sorted[sorted.length - 1] || 0
+    };
+}
+
+function loadCVs() {
+    const files = fs.readdirSync(UPLOADS_DIR).filter(file => /\.(pdf|docx)$/i.test(file)).sort();
+    if (!files.length) throw new Error(`Nenhum currículo de exemplo em ${UPLOADS_DIR}`);
+    return files.map(file => ({ name: file, buffer: fs.readFileSync(path.join(UPLOADS_DIR, file)) }));
+}
+
+// Bytes únicos por envio (comentário após %%EOF) para não cair no cache de extração
+function uploadBytes(cv, index) {
+    if (OPTIONS.warm || !cv.name.toLowerCase().endsWith('.pdf')) return cv.buffer;
+    return Buffer.concat([cv.buffer, Buffer.from(`\n%benchmark-${index}\n`)]);
+}
+
+async function sendAnalysis(baseUrl, cv, index, links) {
+    const form = new FormData();
+    form.append('resume', new Blob([uploadBytes(cv, index)], { type: 'application/pdf' }), cv.name);
+    form.append('jobLinks', JSON.stringify(links));
+
+    const start = process.hrtime.bigint();
+    const response = await fetch(`${baseUrl}/analyze`, { method: 'POST', body: form });
+    const body = await response.json();
+    return {
+        durationMs: Number(process.hrtime.bigint() - start) / 1e6,
+        outcome: response.ok && !body.saveError ? 'ok' : 'error',
+        error: body.error
+    };
+}
+
+async function runLoad(baseUrl, cvs, links, total, onResult) {
+    let next = 0;
+    const client = async () => {
+        while (next < total) {
+            const index = next++;
+            onResult(await sendAnalysis(baseUrl, cvs[index % cvs.length], index, links));
+        }
+    };
+    await Promise.all(Array.from({ length: OPTIONS.concurrency }, client));
+}
+
+function printReport(report) {
+    const ms = value => `${Math.round(value)}ms`.padStart(9);
+    console.info(`\n🏁 ${report.requests} análises, ${report.concurrency} simultâneas, LLM ~${OPTIONS.llmLatency}ms, vagas ~${OPTIONS.boardLatency}ms`);
+    console.info(`Vazão: ${report.throughput.toFixed(2)} análises/s  (erros: ${report.errors})\n`);
+    console.info(`${'etapa'.padEnd(20)}${'n'.padStart(6)}${'p50'.padStart(9)}${'p95'.padStart(9)}${'p99'.padStart(9)}${'máx'.padStart(9)}${'erros'.padStart(7)}`);
+    for (const [stage, stats] of Object.entries(report.stages)) {
+        console.info(`${stage.padEnd(20)}${String(stats.count).padStart(6)}${ms(stats.p50)}${ms(stats.p95)}${ms(stats.p99)}${ms(stats.max)}${String(stats.errors).padStart(7)}`);
+    }
+    const lag = report.eventLoopLag;
+    console.info(`\nEvent loop: p50=${lag.p50.toFixed(1)}ms p99=${lag.p99.toFixed(1)}ms máx=${lag.max.toFixed(1)}ms`);
+    console.info(`Heap: pico ${(report.heapPeakBytes / 1024 / 1024).toFixed(1)}MB`);
+}
+
+// Regressão: p95 da etapa piorou além da tolerância (e de 5ms de ruído) ou a vazão caiu
+function compare(report, baseline) {
+    const regressions = [];
+    for (const [stage, stats] of Object.entries(report.stages)) {
+        const previous = baseline.stages && baseline.stages[stage];
+        if (!previous || !previous.count) continue;
+        if (stats.p95 > previous.p95 * (1 + OPTIONS.tolerance) && stats.p95 - previous.p95 > 5) {
+            regressions.push(`${stage}: p95 ${Math.round(previous.p95)}ms → ${Math.round(stats.p95)}ms`);
+        }
+    }
+    if (baseline.throughput && report.throughput < baseline.throughput * (1 - OPTIONS.tolerance)) {
+        regressions.push(`vazão: ${baseline.throughput.toFixed(2)} → ${report.throughput.toFixed(2)} análises/s`);
+    }
+    return regressions;
+}
+
+async function main() {
+    const { child, links, llm } = await startStubs();
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'bench-pipeline-'));
+    const uploadDir = path.join(dir, 'uploads');
+    fs.mkdirSync(uploadDir);
+
+    // Antes de carregar os serviços: URLs dos stubs, sem caches de LLM/scraping
+    Object.assign(process.env, {
+        OPENAI_API_URL: `${llm}/openai`,
+        OPENAI_API_KEY: 'benchmark',
+        CLAUDE_API_URL: `${llm}/claude`,
+        CLAUDE_API_KEY: 'benchmark',
+        LLM_CACHE_ENABLED: 'false',
+        SCRAPE_CACHE_ENABLED: 'false'
+    });
+    delete process.env.RAILWAY_ENVIRONMENT; // garante o SQLite temporário
+    delete process.env.REDIS_URL;
+
+    const originalLog = { log: console.log, warn: console.warn, error: console.error };
+    if (!OPTIONS.verbose) {
+        console.log = () => { };
+        console.warn = () => { };
+        console.error = () => { };
+    }
+
+    let database = null;
+    let server = null;
+    try {
+        if (OPTIONS.save) {
+            try {
+                database = await setupDatabase(dir);
+            } catch (error) {
+                originalLog.warn(`⚠️ Banco indisponível, etapa "save" não medida: ${error.message}`);
+            }
+        }
+
+        const metrics = require('../utils/metrics');
+        const textExtractor = require('../utils/textExtractor');
+        server = createApp({ uploadDir, userId: database && database.userId }).listen(0, '127.0.0.1');
+        await new Promise(resolve => server.once('listening', resolve));
+        const baseUrl = `http://127.0.0.1:${server.address().port}`;
+        const cvs = loadCVs();
+
+        // Aquecimento (JIT, conexões keep-alive, pool de extração) fora da medição
+        await runLoad(baseUrl, cvs, links, OPTIONS.concurrency, () => { });
+        if (!OPTIONS.warm) textExtractor.clearCache();
+
+        const spans = {};
+        const requests = [];
+        metrics.on('span', span => {
+            const name = span.labels.provider ? `${span.stage}:${span.labels.provider}` : span.stage;
+            (spans[name] = spans[name] || []).push(span);
+        });
+        metrics.loopDelay.reset();
+        let heapPeakBytes = process.memoryUsage().heapUsed;
+        const sampler = setInterval(() => {
+            heapPeakBytes = Math.max(heapPeakBytes, process.memoryUsage().heapUsed);
+        }, 100);
+
+        const start = process.hrtime.bigint();
+        await runLoad(baseUrl, cvs, links, OPTIONS.requests, result => {
+            requests.push(result);
+            if (result.error && OPTIONS.verbose) originalLog.error('[Benchmark] Falha:', result.error);
+        });
+        const elapsedS = Number(process.hrtime.bigint() - start) / 1e9;
+        clearInterval(sampler);
+
+        const stages = {};
+        for (const stage of [...STAGES, ...Object.keys(spans).filter(name => !STAGES.includes(name))]) {
+            if (spans[stage]) stages[stage] = summarize(spans[stage]);
+        }
+        stages.request = summarize(requests);
+
+        const report = {
+            date: new Date().toISOString(),
+            requests: OPTIONS.requests,
+            concurrency: OPTIONS.concurrency,
+            options: { llmLatency: OPTIONS.llmLatency, llmErrorRate: OPTIONS.llmErrorRate, boardLatency: OPTIONS.boardLatency, warm: OPTIONS.warm },
+            throughput: requests.length / elapsedS,
+            errors: requests.filter(request => request.outcome === 'error').length,
+            stages,
+            eventLoopLag: metrics.runtime().eventLoopLag,
+            heapPeakBytes
+        };
+
+        Object.assign(console, originalLog);
+        printReport(report);
+
+        if (OPTIONS.json) {
+            fs.writeFileSync(OPTIONS.json, JSON.stringify(report, null, 2));
+            console.info(`\n📄 Relatório salvo em ${OPTIONS.json}`);
+        }
+
+        if (OPTIONS.baseline) {
+            const regressions = compare(report, JSON.parse(fs.readFileSync(OPTIONS.baseline, 'utf8')));
+            if (regressions.length) {
+                console.error(`\n❌ Regressões acima de ${Math.round(OPTIONS.tolerance * 100)}%:`);
+                regressions.forEach(line => console.error(`  - ${line}`));
+                process.exitCode = 1;
+            } else {
+                console.info(`\n✅ Sem regressões em relação a ${OPTIONS.baseline}`);
+            }
+        }
+    } finally {
+        Object.assign(console, originalLog);
+        if (server) server.close();
+        if (database) await database.sequelize.close().catch(() => { });
+        child.removeAllListeners('exit');
+        child.kill();
+        fs.rmSync(dir, { recursive: true, force: true });
+    }
+
+    process.exit(process.exitCode || 0);
+}
+
+if (process.argv[2] === '--stubs') {
+    runStubs(JSON.parse(process.argv[3]));
+} else {
+    main().catch(error => {
+        console.error('❌ Erro no benchmark:', error);
+        process.exit(1);
+    });
+}
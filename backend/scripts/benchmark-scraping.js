@@ -0,0 +1,109 @@
+#!/usr/bin/env node
+
+/**
+ * Benchmark de scraping - análise com 7 links
+ *
+ * Compara o processamento antigo (lotes fixos de 3 + pausa de 1s) com o
+ * fetchScheduler (pool por host + keep-alive) contra um servidor local de vagas
+ * com latência variável. Reporta p50/p95/máx de cada estratégia.
+ *
+ * Uso: node scripts/benchmark-scraping.js [iterações]
+ */
+
+process.env.SCRAPE_CACHE_ENABLED = 'false'; // medir apenas a rede
+
+const http = require('http');
+const relevantJobScraper = require('../utils/relevantJobScraper');
+const hybridJobScraper = require('../utils/hybridJobScraper');
+
+const ITERATIONS = parseInt(process.argv[2]) || 20;
+const LINKS_PER_ANALYSIS = 7;
+
+const JOB_HTML = `<html><body>
+<h1>Desenvolvedor Full Stack</h1>
+<h2>Responsabilidades</h2><ul><li>Desenvolver APIs em Node.js</li><li>Manter aplicações React</li></ul>
+<h2>Requisitos</h2><ul><li>JavaScript</li><li>SQL</li><li>Metodologias ágeis</li></ul>
+</body></html>`;
+
+// Latência com cauda longa: maioria rápida, algumas vagas lentas
+function simulatedLatency() {
+    const roll = Math.random();
+    if (roll < 0.7) return 40 + Math.random() * 120;
+    if (roll < 0.95) return 200 + Math.random() * 400;
+    return 800 + Math.random() * 700;
+}
+
+function startJobBoard() {
+    const server = http.createServer((req, res) => {
+        setTimeout(() => {
+            res.writeHead(200, { 'Content-Type': 'text/html; charset=utf-8' });
+            res.end(JOB_HTML);
+        }, simulatedLatency());
+    });
+    return new Promise(resolve => server.listen(0, '127.0.0.1', () => resolve(server)));
+}
+
+// Estratégia anterior: lotes de 3, espera o mais lento e pausa fixa de 1s
+async function legacyBatches(urls, concurrency = 3) {
+    const texts = [];
+    for (let i = 0; i < urls.length; i += concurrency) {
+        const batch = urls.slice(i, i + concurrency);
+        texts.push(...await Promise.all(batch.map(url => relevantJobScraper.extractRelevantSections(url))));
+        if (i + concurrency < urls.length) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+    return texts;
+}
+
+function percentile(values, p) {
+    const sorted = [...values].sort((a, b) => a - b);
+    const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+    return sorted[Math.max(0, index)];
+}
+
+function report(name, durations) {
+    console.info(`${name.padEnd(22)} p50=${Math.round(percentile(durations, 50))}ms  p95=${Math.round(percentile(durations, 95))}ms  max=${Math.round(Math.max(...durations))}ms`);
+}
+
+async function measure(fn) {
+    const durations = [];
+    for (let i = 0; i < ITERATIONS; i++) {
+        const start = process.hrtime.bigint();
+        await fn(i);
+        durations.push(Number(process.hrtime.bigint() - start) / 1e6);
+    }
+    return durations;
+}
+
+async function main() {
+    // Três "job boards" distintos (hosts diferentes por porta)
+    const servers = await Promise.all([startJobBoard(), startJobBoard(), startJobBoard()]);
+    const hosts = servers.map(server => `http://127.0.0.1:${server.address().port}`);
+    const linksFor = (iteration) => Array.from({ length: LINKS_PER_ANALYSIS }, (_, i) =>
+        `${hosts[i % hosts.length]}/vaga/${iteration}-${i}`);
+
+    // Silenciar logs do scraper durante a medição
+    const originalLog = console.log;
+    const originalWarn = console.warn;
+    console.log = () => { };
+    console.warn = () => { };
+
+    console.info(`🏁 ${ITERATIONS} análises de ${LINKS_PER_ANALYSIS} links cada\n`);
+
+    try {
+        report('Lotes fixos (antigo)', await measure(i => legacyBatches(linksFor(i))));
+        report('fetchScheduler', await measure(i => hybridJobScraper.extractMultiple(linksFor(i))));
+    } finally {
+        console.log = originalLog;
+        console.warn = originalWarn;
+        servers.forEach(server => server.close());
+    }
+
+    process.exit(0);
+}
+
+main().catch(error => {
+    console.error('❌ Erro no benchmark:', error);
+    process.exit(1);
+});
@@ -0,0 +1,104 @@
+#!/usr/bin/env node
+
+/**
+ * Benchmark da extração de texto dos currículos
+ *
+ * Extrai todos os PDFs de uploads/ com concorrência simulando requisições
+ * simultâneas e mede o atraso do event loop em três modos:
+ *  - inline: pdf-parse no event loop principal (comportamento antigo)
+ *  - pool: worker_threads
+ *  - pool + cache: segunda passada sobre os mesmos arquivos (hash do conteúdo)
+ *
+ * Uso: node scripts/benchmark-text-extraction.js [concorrência]
+ */
+
+const fs = require('fs');
+const path = require('path');
+const { performance } = require('perf_hooks');
+const { extractFromBuffer } = require('../utils/textExtractionWorker');
+const TextExtractionPool = require('../utils/textExtractionPool');
+
+const CONCURRENCY = parseInt(process.argv[2]) || 4;
+const UPLOADS_DIR = path.join(__dirname, '../uploads');
+
+async function runAll(files, extractOne) {
+    const queue = [...files];
+    const workers = Array.from({ length: CONCURRENCY }, async () => {
+        while (queue.length > 0) {
+            await extractOne(queue.shift());
+        }
+    });
+    await Promise.all(workers);
+}
+
+// Sonda de atraso do event loop: um timer de PROBE_MS que registra o quanto atrasou.
+// (monitorEventLoopDelay não registra amostras enquanto o loop fica bloqueado do início ao fim)
+const PROBE_MS = 10;
+
+function startLagProbe() {
+    const samples = [];
+    let expected = performance.now() + PROBE_MS;
+    const timer = setInterval(() => {
+        const now = performance.now();
+        samples.push(Math.max(0, now - expected));
+        expected = now + PROBE_MS;
+    }, PROBE_MS);
+
+    return async () => {
+        // Deixar o último timer atrasado disparar antes de encerrar a medição
+        await new Promise(resolve => setTimeout(resolve, PROBE_MS * 2));
+        clearInterval(timer);
+        return samples.sort((a, b) => a - b);
+    };
+}
+
+function percentile(sorted, p) {
+    if (sorted.length === 0) return 0;
+    return sorted[Math.min(sorted.length - 1, Math.ceil(sorted.length * p) - 1)];
+}
+
+async function measure(name, files, extractOne) {
+    const stopProbe = startLagProbe();
+    const start = performance.now();
+
+    await runAll(files, extractOne);
+
+    const elapsed = performance.now() - start;
+    const lag = await stopProbe();
+    console.log(`${name.padEnd(14)} total=${elapsed.toFixed(0)}ms  lag p50=${percentile(lag, 0.5).toFixed(1)}ms  p99=${percentile(lag, 0.99).toFixed(1)}ms  max=${(lag[lag.length - 1] || 0).toFixed(1)}ms`);
+}
+
+async function main() {
+    const files = fs.readdirSync(UPLOADS_DIR)
+        .filter(file => file.toLowerCase().endsWith('.pdf'))
+        .map(file => path.join(UPLOADS_DIR, file));
+
+    if (files.length === 0) {
+        console.error('❌ Nenhum PDF encontrado em uploads/');
+        process.exit(1);
+    }
+
+    const totalBytes = files.reduce((sum, file) => sum + fs.statSync(file).size, 0);
+    console.log(`🏁 ${files.length} PDFs (${(totalBytes / 1024 / 1024).toFixed(1)}MB), concorrência ${CONCURRENCY}\n`);
+
+    await measure('inline', files, file => extractFromBuffer(fs.readFileSync(file), '.pdf'));
+
+    const pool = new TextExtractionPool({ size: Math.min(CONCURRENCY, 4), maxQueue: files.length });
+    // Aquecer os workers (carregamento do pdf-parse) fora da medição
+    await runAll(files.slice(0, CONCURRENCY), file => pool.run(fs.readFileSync(file), '.pdf'));
+    await measure('pool', files, file => pool.run(fs.readFileSync(file), '.pdf'));
+    await pool.close();
+
+    // textExtractor com cache por hash: primeira passada aquece, segunda é servida do cache
+    process.env.TEXT_EXTRACTION_WORKERS = String(Math.min(CONCURRENCY, 4));
+    const textExtractor = require('../utils/textExtractor');
+    await runAll(files, file => textExtractor.extract(file));
+    await measure('pool + cache', files, file => textExtractor.extract(file));
+    console.log('\n📊 Cache:', JSON.stringify(textExtractor.getStats().cache));
+    await textExtractor.pool.close();
+}
+
+main().catch(error => {
+    console.error('❌ Erro no benchmark:', error);
+    process.exit(1);
+});
@@ -0,0 +1,46 @@
+#!/usr/bin/env node
+
+/**
+ * Migrações versionadas do banco
+ *
+ * Uso:
+ *   node scripts/migrate.js up      # aplica as pendentes (padrão)
+ *   node scripts/migrate.js status  # lista aplicadas e pendentes
+ *   node scripts/migrate.js down    # reverte a última aplicada
+ *
+ * Executar antes de iniciar o servidor: com colunas faltando ele recusa subir.
+ */
+
+const path = require('path');
+require('dotenv').config({ path: path.join(__dirname, '..', '.env') });
+
+const sequelize = require('../db');
+const migrator = require('../utils/migrator');
+
+async function main(command = 'up') {
+    await sequelize.authenticate();
+
+    if (command === 'status') {
+        const { applied, pending } = await migrator.status(sequelize);
+        applied.forEach(name => console.log(`  ✅ ${name}`));
+        pending.forEach(name => console.log(`  ⏳ ${name}`));
+        console.log(`📋 ${applied.length} aplicadas, ${pending.length} pendentes`);
+    } else if (command === 'up') {
+        const applied = await migrator.up(sequelize);
+        console.log(applied.length ? `🎉 ${applied.length} migrações aplicadas` : '✅ Banco já está atualizado');
+    } else if (command === 'down') {
+        const reverted = await migrator.down(sequelize);
+        console.log(reverted ? `⏪ ${reverted} revertida` : 'ℹ️ Nenhuma migração para reverter');
+    } else {
+        throw new Error(`Comando desconhecido: ${command} (use up, status ou down)`);
+    }
+}
+
+main(process.argv[2])
+    .then(() => sequelize.close())
+    .then(() => process.exit(0))
+    .catch(async (error) => {
+        console.error('❌ Migração falhou:', error.message);
+        await sequelize.close().catch(() => { });
+        process.exit(1);
+    });
@@ -12,6 +12,7 @@ const express = require('express');
 const cors = require('cors');
 const helmet = require('helmet');
 const rateLimit = require('express-rate-limit');
+const SharedRateLimitStore = require('./utils/rateLimitStore');
 const { logger, logRequest, logError } = require('./utils/logger');
 const atsRoutes = require('./routes/ats');
 const userRoutes = require('./routes/user');
@@ -73,18 +74,25 @@ app.use(helmet({
 
 // Rate limiting - configurações mais permissivas para desenvolvimento
 const isDevelopment = process.env.NODE_ENV !== 'production';
+
+// Consulta de jobs (polling e reconexões do SSE): não consome a cota de análises
+const isJobStatusRequest = (req) => req.method === 'GET' && req.originalUrl.startsWith('/api/ats/jobs/');
+
 const limiter = rateLimit({
   windowMs: isDevelopment ? 60 * 1000 : 15 * 60 * 1000, // 1 minuto em dev, 15 minutos em prod
   max: isDevelopment ? 10000 : 100, // 10000 requests em dev (muito permissivo), 100 em prod
   message: 'Muitas tentativas. Tente novamente em alguns minutos.',
   standardHeaders: true,
   legacyHeaders: false,
+  // Contadores compartilhados entre workers/réplicas (Redis ou processo primário do cluster)
+  store: new SharedRateLimitStore('global'),
+  passOnStoreError: true,
   skip: (req) => {
     // Em desenvolvimento, pular rate limiting para TUDO exceto casos específicos
     if (isDevelopment) {
       return true; // Pular rate limiting completamente em desenvolvimento
     }
-    return false;
+    return isJobStatusRequest(req); // limite próprio (jobStatusLimiter)
   }
 });
 
@@ -95,15 +103,29 @@ const atsLimiter = rateLimit({
   message: 'Limite de análises excedido. Tente novamente em 1 hora.',
   standardHeaders: true,
   legacyHeaders: false,
+  store: new SharedRateLimitStore('ats'),
+  passOnStoreError: true,
   skip: (req) => {
     // Em desenvolvimento, pular rate limiting para ATS também
     if (isDevelopment) {
       return true;
     }
-    return false;
+    return isJobStatusRequest(req);
   }
 });
 
+// Rate limiting da consulta de jobs: acompanhar um job não esgota a cota de análises
+const jobStatusLimiter = rateLimit({
+  windowMs: 15 * 60 * 1000, // 15 minutos
+  max: 1000, // polling a cada ~1s durante toda a janela
+  message: 'Muitas consultas de status. Tente novamente em alguns minutos.',
+  standardHeaders: true,
+  legacyHeaders: false,
+  store: new SharedRateLimitStore('ats-jobs'),
+  passOnStoreError: true,
+  skip: (req) => isDevelopment || !isJobStatusRequest(req)
+});
+
 app.use(limiter);
 
 // Configuração de CORS para produção
@@ -113,6 +135,7 @@ const corsOptions = {
     : '*',
   methods: ['GET', 'POST', 'PUT', 'DELETE'],
   allowedHeaders: ['Content-Type', 'Authorization'],
+  exposedHeaders: ['X-Next-Cursor'], // paginação do histórico de análises
   credentials: true,
   maxAge: 86400 // 24 horas
 };
@@ -166,7 +189,7 @@ app.get('/history', async (req, res) => {
 
 // API Routes (ANTES dos arquivos estáticos)
 app.use('/api/user', userRoutes);
-app.use('/api/ats', atsLimiter, atsRoutes); // Rate limiting específico para ATS
+app.use('/api/ats', atsLimiter, jobStatusLimiter, atsRoutes); // Rate limiting específico para ATS
 app.use('/api/upload', require('./routes/upload'));
 app.use('/api/payment', require('./routes/payment'));
 app.use('/api/gift-code', require('./routes/giftCode'));
@@ -176,6 +199,7 @@ app.use('/api/admin', require('./routes/admin')); // Rotas administrativas
 app.use('/api/config', require('./routes/config')); // ✅ Configurações dinâmicas
 app.use('/api/debug', require('./routes/debug')); // ✅ Debug e monitoramento
 app.use('/health', require('./routes/health')); // Health check endpoint
+app.use('/metrics', require('./routes/metrics')); // Métricas Prometheus (etapas da análise e runtime)
 
 // ✅ API health check para Railway
 app.get('/api/health', (req, res) => {
@@ -271,6 +295,8 @@ const User = require('./models/user');
 const GiftCode = require('./models/giftCode');
 const GiftCodeUsage = require('./models/giftCodeUsage');
 const Transaction = require('./models/Transaction');
+require('./models/AnalysisJob');
+require('./models/giftCodeCounter');
 
 console.log('Modelo User importado:', User ? 'OK' : 'ERRO');
 
@@ -290,24 +316,78 @@ Object.keys(models).forEach(modelName => {
 });
 
 const PORT = process.env.PORT || 3000;
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.SHUTDOWN_TIMEOUT_MS) || 30000;
+
+let server = null;
+let shuttingDown = false;
+
+/**
+ * Encerramento gracioso: para de aceitar conexões, aguarda requisições e
+ * análises em execução (até SHUTDOWN_TIMEOUT_MS) e fecha o banco.
+ * Análises ainda na fila ou interrompidas são retomadas por outro processo via recover().
+ */
+async function shutdown(reason) {
+  if (shuttingDown) return;
+  shuttingDown = true;
+  console.log(`[Server] Encerrando (${reason})...`);
+
+  const forceExit = setTimeout(() => {
+    console.warn('[Server] ⚠️ Tempo limite de encerramento atingido, forçando saída');
+    process.exit(1);
+  }, SHUTDOWN_TIMEOUT_MS);
+  forceExit.unref();
+
+  // Para de despachar jobs da fila (ficam para outros processos) e fecha os streams SSE
+  const analysisQueue = require('./services/analysisQueue');
+  analysisQueue.stop();
+  require('./services/giftCodeCounters').stop();
+
+  await Promise.all([
+    server ? new Promise(resolve => server.close(resolve)) : null,
+    analysisQueue.getStats().running > 0 ? new Promise(resolve => analysisQueue.once('idle', resolve)) : null
+  ]);
+
+  await sequelize.close().catch(() => { });
+  console.log('[Server] ✅ Encerrado');
+  process.exit(0);
+}
+
+process.on('SIGTERM', () => shutdown('SIGTERM'));
+process.on('SIGINT', () => shutdown('SIGINT'));
+// Reinício gracioso solicitado pelo processo primário (cluster.js)
+process.on('message', (message) => {
+  if (message && message.type === 'shutdown') shutdown('cluster');
+});
+
+function listen(suffix = '') {
+  server = app.listen(PORT, () => {
+    console.log(`🚀 ATS backend rodando na porta ${PORT}${suffix}`);
+    console.log(`🌐 Frontend servido em: http://localhost:${PORT}`);
+    if (!suffix) console.log('✅ Servidor pronto para teste de validação!');
+  });
+}
 
 // ✅ Sincronização segura - apenas criar tabelas que não existem
-// Alterado de { alter: true } para { force: false } para evitar conflitos de foreign key
-sequelize.sync({ force: false })
+// Alterado de { alter: true } para { force: false } para evitar conflitos de foreign key.
+// Como o sync não adiciona colunas, tabelas alteradas por migrações são conferidas antes
+require('./utils/migrator').assertSchema(sequelize, [require('./models/AnalysisResults')])
+  .then(() => sequelize.sync({ force: false }))
   .then(() => {
     console.log('✅ Banco de dados sincronizado com segurança');
     console.log('📊 Tabelas criadas se necessário, sem alterar estruturas existentes');
-    app.listen(PORT, () => {
-      console.log(`🚀 ATS backend rodando na porta ${PORT}`);
-      console.log(`🌐 Frontend servido em: http://localhost:${PORT}`);
-      console.log('✅ Servidor pronto para teste de validação!');
-    });
+    // Retomar análises assíncronas pendentes (estado durável em analysis_jobs)
+    require('./services/analysisQueue').start();
+    // Contadores do painel admin (hooks + reconciliação periódica)
+    require('./services/giftCodeCounters').start();
+
+    listen();
   })
   .catch(err => {
+    if (err.code === 'PENDING_MIGRATIONS') {
+      console.error(`❌ ${err.message}`);
+      process.exit(1);
+    }
     console.error('❌ Erro ao sincronizar banco de dados:', err);
     console.log('⚠️ Tentando iniciar servidor mesmo assim...');
-    app.listen(PORT, () => {
-      console.log(`🚀 ATS backend rodando na porta ${PORT} (modo fallback)`);
-      console.log(`🌐 Frontend servido em: http://localhost:${PORT}`);
-    });
+    listen(' (modo fallback)');
   });
@@ -0,0 +1,283 @@
+const GupyOptimizationService = require('./gupyOptimizationService');
+const atsService = require('./atsService');
+const textExtractor = require('../utils/textExtractor');
+const analysisProgress = require('../utils/analysisProgress');
+const metrics = require('../utils/metrics');
+
+/**
+ * Etapas da análise ATS compartilhadas entre a rota síncrona (/analyze)
+ * e o executor de jobs assíncronos (analysisQueue)
+ */
+
+/**
+ * Valida currículo e links de vagas da requisição
+ * @returns {string|null} mensagem de erro ou null se válido
+ */
+function validateInput(resumePath, jobLinks) {
+  if (!resumePath || !Array.isArray(jobLinks) || !jobLinks.length) {
+    return 'Arquivo de currículo ou links de vagas ausentes.';
+  }
+  if (jobLinks.length < 3) {
+    return 'É necessário incluir pelo menos 3 vagas para uma análise completa.';
+  }
+  if (jobLinks.length > 7) {
+    return 'O limite máximo é de 7 vagas por análise. Remova alguns links e tente novamente.';
+  }
+  return null;
+}
+
+/**
+ * Complementa o resultado do LLM com a análise Gupy e a verificação real
+ * das palavras-chave (altera `result`)
+ * @param {Object} result - retorno de atsService.processATS
+ * @param {string} resumeText
+ * @param {string[]} jobLinks
+ */
+function enrichResult(result, resumeText, jobLinks) {
+  analysisProgress.stage('verify');
+
+  // Análise específica para Gupy (se detectarmos vagas da Gupy)
+  const gupyJobs = jobLinks.filter(link =>
+    link.includes('gupy.io') || link.includes('gupy.com')
+  );
+
+  if (gupyJobs.length > 0 && result.jobs && Array.isArray(result.jobs)) {
+    console.log('[ATS] Detectadas vagas da Gupy, realizando análise específica...');
+    const endGupySpan = metrics.startSpan('gupy');
+
+    // Para cada vaga da Gupy, fazer análise especializada
+    result.gupy_optimization = [];
+
+    // Verificar se result.jobs existe e é um array antes de acessar length
+    if (!result.jobs) {
+      console.warn('[ATS] Alerta: result.jobs está undefined ou null');
+      result.jobs = [];
+    }
+
+    for (let i = 0; i < Math.min(gupyJobs.length, result.jobs.length); i++) {
+      const jobData = result.jobs.find(job =>
+        gupyJobs.some(gupyLink => job && job.link === gupyLink)
+      );
+
+      if (jobData && jobData.description) {
+        let gupyAnalysis;
+        try {
+          gupyAnalysis = GupyOptimizationService.analyzeGupyCompatibility(
+            resumeText,
+            jobData.description
+          );
+        } catch (error) {
+          console.error('[ATS] Erro na análise Gupy:', error);
+          gupyAnalysis = { score: 0, suggestions: [], matches: [] };
+        }
+
+        result.gupy_optimization.push({
+          job_title: jobData.title || 'Vaga sem título',
+          job_link: jobData.link,
+          compatibility_score: gupyAnalysis.score,
+          algorithm_tips: gupyAnalysis.recommendations,
+          keyword_analysis: {
+            present: gupyAnalysis.keywords.present,
+            missing: gupyAnalysis.keywords.missing,
+            density: gupyAnalysis.keywords.density
+          },
+          format_optimization: gupyAnalysis.format
+        });
+      }
+    }
+
+    // Adicionar dicas gerais para Gupy
+    result.gupy_tips = {
+      general_advice: [
+        "Use formato objetivo: 'Experiência com X, Y, Z' ao invés de frases longas",
+        "Repita palavras-chave da vaga em contextos diferentes",
+        "Organize experiências em formato claro: Empresa | Cargo | Período",
+        "Use bullet points para destacar habilidades e responsabilidades",
+        "Evite adjetivos excessivos, foque em resultados concretos"
+      ],
+      algorithm_insights: {
+        name: "GAIA - Inteligência Artificial da Gupy",
+        factors: [
+          "Analisa 200+ métricas diferentes",
+          "Prioriza keywords exatas da vaga",
+          "Valoriza formato objetivo e estruturado",
+          "Considera formação, experiência e fit cultural",
+          "Aprende com contratações bem-sucedidas"
+        ]
+      }
+    };
+    endGupySpan();
+  }
+
+  // Cruzamento real: só palavras da vaga encontradas no currículo
+  const { filterPresentKeywords, deduplicateKeywords, countKeywordOccurrences, deduplicateKeywordCounts } = require('./atsKeywordVerifier');
+  if (result.job_keywords && Array.isArray(result.job_keywords) && result.jobsText) {
+    const endVerifySpan = metrics.startSpan('verify');
+
+    // Extrai as palavras-chave da vaga e remove duplicidades
+    let jobKeywords = result.job_keywords;
+    jobKeywords = deduplicateKeywords(jobKeywords);
+
+    // Contar ocorrências das palavras-chave nas vagas usando o jobsText do result
+    // Conta quantas vezes cada palavra-chave aparece
+    const rawKeywordCounts = countKeywordOccurrences(jobKeywords, result.jobsText);
+
+    // Consolida palavras-chave hierárquicas (ex: "escopo" + "definir escopo")
+    const keywordCounts = deduplicateKeywordCounts(rawKeywordCounts);
+
+    result.job_keywords_with_count = keywordCounts;
+
+    // Atualizar job_keywords com ordem de relevância (apenas as palavras-chave, sem contagem)
+    result.job_keywords = keywordCounts.map(item => item.keyword);
+
+    const presentes = filterPresentKeywords(jobKeywords, result.resumeText);
+    const ausentes = jobKeywords.filter(k => !presentes.includes(k));
+
+    // Adicionar contagem para palavras presentes
+    result.job_keywords_present_with_count = keywordCounts.filter(item =>
+      presentes.includes(item.keyword)
+    );
+
+    // Adicionar contagem para palavras ausentes
+    result.job_keywords_missing_with_count = keywordCounts.filter(item =>
+      ausentes.includes(item.keyword)
+    );
+
+    // Manter compatibilidade com versões anteriores
+    result.job_keywords_present = presentes;
+    result.job_keywords_missing = ausentes;
+
+    // Criar estatísticas de relevância
+    result.keyword_statistics = {
+      total_identified: keywordCounts.length,
+      total_occurrences: keywordCounts.reduce((sum, item) => sum + item.count, 0),
+      present_in_resume: presentes.length,
+      missing_in_resume: ausentes.length,
+      match_percentage: keywordCounts.length > 0 ? Math.round((presentes.length / keywordCounts.length) * 100) : 0
+    };
+
+    // Atualizar a conclusão para refletir os dados reais processados pelo backend
+    const matchPercentage = result.keyword_statistics.match_percentage;
+    const totalKeywords = keywordCounts.length;
+    const presentCount = presentes.length;
+    const missingCount = ausentes.length;
+
+    // Gerar conclusão consistente com os dados reais
+    let matchQuality;
+    if (matchPercentage >= 80) {
+      matchQuality = "excelente aderência";
+    } else if (matchPercentage >= 60) {
+      matchQuality = "boa aderência";
+    } else if (matchPercentage >= 40) {
+      matchQuality = "aderência moderada";
+    } else if (matchPercentage >= 20) {
+      matchQuality = "aderência básica";
+    } else {
+      matchQuality = "aderência limitada";
+    }
+
+    result.conclusion = `O currículo apresenta ${matchQuality} às vagas analisadas, com ${matchPercentage}% das palavras-chave presentes (${presentCount} de ${totalKeywords} palavras-chave identificadas). ${matchPercentage >= 60
+      ? `O perfil demonstra boa compatibilidade com os requisitos identificados.`
+      : `Há oportunidades significativas de melhoria para aumentar a compatibilidade.`
+      } ${missingCount > 0
+        ? `As principais áreas de desenvolvimento incluem as ${missingCount} palavras-chave ausentes identificadas na análise.`
+        : 'O currículo atende bem aos requisitos técnicos das vagas.'
+      } ${matchPercentage >= 80
+        ? 'Com pequenos ajustes, o currículo tem excelente potencial para se destacar.'
+        : matchPercentage >= 40
+          ? 'Com ajustes focados nas palavras-chave ausentes, o currículo pode se tornar mais competitivo.'
+          : 'É recomendado revisar e incluir mais palavras-chave relevantes para melhorar significativamente a compatibilidade.'
+      }`;
+
+
+
+    // Limpar dados internos antes de enviar ao frontend
+    delete result.jobsText;
+    delete result.resumeText;
+    endVerifySpan();
+  }
+
+  return result;
+}
+
+/**
+ * Salva a análise no histórico do usuário
+ * Erros não interrompem o fluxo: o resultado recebe historySaveError
+ * @returns {Promise<Object|null>} registro salvo ou null
+ */
+async function saveAnalysis({ userId, fileName, resumeText, jobLinks, result }) {
+  analysisProgress.stage('save');
+
+  try {
+    // Preparar dados para salvamento
+    const analysisData = {
+      userId: userId,
+      resumeFileName: fileName,
+      resumeContent: resumeText,
+      jobUrls: jobLinks,
+      result: result
+    };
+
+    console.log(`[ATS] Salvando análise no histórico para usuário ${userId}...`);
+    console.log(`[ATS] Dados a salvar:`, {
+      userId: analysisData.userId,
+      fileName: analysisData.resumeFileName,
+      jobUrlsCount: Array.isArray(analysisData.jobUrls) ? analysisData.jobUrls.length : 0,
+      resultKeys: Object.keys(analysisData.result || {}),
+      hasConclusion: !!(analysisData.result && analysisData.result.conclusion),
+      hasResumo: !!(analysisData.result && analysisData.result.resumo),
+      hasKeywords: !!(analysisData.result && analysisData.result.job_keywords_present)
+    });
+
+    // Carregado sob demanda: o pipeline roda sem banco (ex.: benchmark sem SQLite)
+    const AnalysisResults = require('../models/AnalysisResults');
+    const savedAnalysis = await metrics.span('save', () => AnalysisResults.create(analysisData));
+
+    console.log(`[ATS] ✅ Análise salva com sucesso! ID: ${savedAnalysis.id}`);
+
+    // Adicionar ID da análise ao resultado para referência
+    result.savedAnalysisId = savedAnalysis.id;
+    return savedAnalysis;
+  } catch (saveErr) {
+    console.error('[ATS] ❌ Erro ao salvar análise no histórico:', saveErr);
+    console.error('[ATS] Stack trace:', saveErr.stack);
+
+    // Log detalhado do erro para debug
+    if (saveErr.name === 'SequelizeValidationError') {
+      console.error('[ATS] Erros de validação:', saveErr.errors.map(e => e.message));
+    } else if (saveErr.name === 'SequelizeDatabaseError') {
+      console.error('[ATS] Erro de banco de dados:', saveErr.message);
+    }
+
+    // Não interromper o fluxo se houver erro ao salvar
+    // Mas adicionar flag no resultado para indicar que não foi salvo
+    result.historySaveError = true;
+    result.historySaveErrorMessage = saveErr.message;
+  }
+
+  return null;
+}
+
+/**
+ * Executa a análise completa (extração, scraping, LLM e verificação)
+ * @returns {Promise<{result: Object, resumeText: string}>}
+ */
+async function runAnalysis({ resumePath, jobLinks }) {
+  let result = await atsService.processATS(resumePath, jobLinks);
+  // Garantir que result tenha uma estrutura válida
+  if (!result) result = {};
+  if (!result.jobs) result.jobs = [];
+
+  // Texto já extraído em processATS: servido pelo cache do textExtractor
+  const resumeText = await textExtractor.extract(resumePath);
+
+  enrichResult(result, resumeText, jobLinks);
+  return { result, resumeText };
+}
+
+module.exports = {
+  validateInput,
+  enrichResult,
+  saveAnalysis,
+  runAnalysis
+};
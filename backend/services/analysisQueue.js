@@ -0,0 +1,383 @@
+const fs = require('fs');
+const EventEmitter = require('events');
+const { Op } = require('sequelize');
+const sequelize = require('../db');
+const AnalysisJob = require('../models/AnalysisJob');
+const User = require('../models/user');
+const analysisPipeline = require('./analysisPipeline');
+const analysisProgress = require('../utils/analysisProgress');
+
+/**
+ * Fila de análises ATS assíncronas
+ *
+ * - POST enfileira e retorna o id do job; a análise roda em segundo plano
+ * - Pool limitado de execuções simultâneas, ordenado por prioridade (maior primeiro)
+ * - Estado durável na tabela analysis_jobs (mesmo banco Sequelize, sem Redis)
+ * - Eventos 'job' a cada mudança de etapa, consumidos pelo SSE
+ * - Crédito reservado no enfileiramento (UPDATE condicional, atômico entre requisições
+ *   simultâneas) e devolvido uma única vez se o job falhar (flag creditCharged)
+ * - Heartbeat periódico (updatedAt) enquanto o job roda; jobs órfãos (processo
+ *   reiniciado) ficam sem heartbeat e são reenfileirados por recover()
+ */
+class AnalysisQueue extends EventEmitter {
+    constructor(options = {}) {
+        super();
+        this.setMaxListeners(0); // um listener por conexão SSE
+
+        this.concurrency = options.concurrency || parseInt(process.env.ANALYSIS_CONCURRENCY) || 2;
+        this.maxQueued = options.maxQueued || parseInt(process.env.ANALYSIS_MAX_QUEUED) || 100;
+        this.maxAttempts = options.maxAttempts || parseInt(process.env.ANALYSIS_MAX_ATTEMPTS) || 2;
+        // Sem heartbeat por este tempo, um job 'running' é considerado órfão
+        this.staleMs = options.staleMs || parseInt(process.env.ANALYSIS_JOB_STALE_MS) || 5 * 60 * 1000;
+        // Etapas longas (llm) podem passar de staleMs: o heartbeat não depende de mudança de etapa
+        this.heartbeatMs = options.heartbeatMs || Math.floor(this.staleMs / 3);
+        this.recoverIntervalMs = options.recoverIntervalMs || 60 * 1000;
+
+        this.pending = [];
+        this.running = new Map();
+        this.sequence = 0;
+        this.recoverTimer = null;
+        this.stopped = false;
+    }
+
+    /**
+     * Cria o job e o coloca na fila
+     * @returns {Promise<AnalysisJob>}
+     */
+    async enqueue({ userId, resumePath, fileName, jobLinks, priority = 0 }) {
+        if (this.pending.length >= this.maxQueued) {
+            const error = new Error('Muitas análises na fila no momento. Tente novamente em alguns minutos.');
+            error.statusCode = 503;
+            throw error;
+        }
+
+        // Reserva o crédito antes de criar o job: duas requisições com 1 crédito não passam juntas
+        const [reserved] = await User.update(
+            { credits: sequelize.literal('credits - 1') },
+            { where: { id: userId, credits: { [Op.gt]: 0 } } }
+        );
+        if (!reserved) {
+            const error = new Error('Você não possui créditos suficientes para realizar uma análise.');
+            error.statusCode = 403;
+            throw error;
+        }
+
+        let job;
+        try {
+            job = await AnalysisJob.create({
+                userId,
+                resumePath,
+                resumeFileName: fileName,
+                jobUrls: jobLinks,
+                priority,
+                status: 'queued',
+                stage: 'queued',
+                progress: 0,
+                creditCharged: true
+            });
+        } catch (error) {
+            await User.increment('credits', { by: 1, where: { id: userId } });
+            throw error;
+        }
+
+        console.log(`[AnalysisQueue] Job ${job.id} enfileirado (usuário ${userId}, prioridade ${priority})`);
+        this.push(job.id, priority);
+        this.publish(job);
+        this.drain();
+
+        return job;
+    }
+
+    /**
+     * Insere mantendo a ordem: prioridade decrescente, FIFO dentro da mesma prioridade
+     */
+    push(id, priority) {
+        // Após stop() o job fica 'queued' no banco para outro processo
+        if (this.stopped) return;
+        if (this.running.has(id) || this.pending.some(item => item.id === id)) return;
+
+        const item = { id, priority, sequence: this.sequence++ };
+        const index = this.pending.findIndex(other => other.priority < priority);
+        if (index === -1) {
+            this.pending.push(item);
+        } else {
+            this.pending.splice(index, 0, item);
+        }
+    }
+
+    drain() {
+        while (!this.stopped && this.running.size < this.concurrency && this.pending.length > 0) {
+            const { id } = this.pending.shift();
+            this.running.set(id, null);
+            this.execute(id)
+                .catch(error => console.error(`[AnalysisQueue] Erro inesperado no job ${id}:`, error))
+                .finally(() => {
+                    this.running.delete(id);
+                    this.drain();
+                    if (this.running.size === 0 && this.pending.length === 0) {
+                        this.emit('idle');
+                    }
+                });
+        }
+    }
+
+    async execute(id) {
+        // Reivindicação atômica: em vários processos, apenas um executa o job
+        const [claimed] = await AnalysisJob.update({
+            status: 'running',
+            startedAt: new Date(),
+            attempts: sequelize.literal('attempts + 1')
+        }, {
+            where: { id, status: 'queued' }
+        });
+        if (!claimed) return;
+
+        const job = await AnalysisJob.findByPk(id);
+        this.running.set(id, job);
+        this.publish(job);
+
+        const heartbeat = setInterval(() => this.heartbeat(id), this.heartbeatMs);
+        heartbeat.unref();
+
+        try {
+            await analysisProgress.run(
+                (stage, details) => this.updateStage(job, stage, details),
+                async () => {
+                    // Já salvo em uma tentativa anterior: apenas concluir (sem nova análise)
+                    if (!job.analysisResultId) {
+                        const { result, resumeText } = await analysisPipeline.runAnalysis({
+                            resumePath: job.resumePath,
+                            jobLinks: job.jobUrls
+                        });
+
+                        const saved = await analysisPipeline.saveAnalysis({
+                            userId: job.userId,
+                            fileName: job.resumeFileName || 'arquivo.pdf',
+                            resumeText,
+                            jobLinks: job.jobUrls,
+                            result
+                        });
+
+                        await job.update({ result, analysisResultId: saved ? saved.id : null });
+                    }
+                }
+            );
+        } catch (error) {
+            console.error(`[AnalysisQueue] ❌ Job ${id} falhou:`, error.message);
+            await job.update({
+                status: 'failed',
+                error: error.message || 'Erro ao processar análise ATS.',
+                finishedAt: new Date()
+            });
+            this.publish(job);
+            await this.refund(job);
+            await this.cleanup(job);
+            return;
+        } finally {
+            clearInterval(heartbeat);
+        }
+
+        try {
+            await this.complete(job);
+        } catch (error) {
+            // Análise pronta e gravada: o job continua 'running' (sem heartbeat) e
+            // recover() o conclui pelo ramo "já salvo", sem repetir a análise
+            console.error(`[AnalysisQueue] ⚠️ Erro ao concluir job ${id}, será retomado:`, error.message);
+            return;
+        }
+        await this.cleanup(job);
+    }
+
+    /**
+     * Limpa o upload temporário
+     */
+    async cleanup(job) {
+        await fs.promises.unlink(job.resumePath).catch(() => { });
+    }
+
+    /**
+     * Devolve o crédito reservado de um job que falhou (no máximo uma vez)
+     */
+    async refund(job) {
+        await sequelize.transaction(async (transaction) => {
+            const [released] = await AnalysisJob.update(
+                { creditCharged: false },
+                { where: { id: job.id, creditCharged: true }, transaction }
+            );
+
+            if (released) {
+                await User.increment('credits', { by: 1, where: { id: job.userId }, transaction });
+                console.log(`[AnalysisQueue] Crédito devolvido ao usuário ${job.userId} (job ${job.id})`);
+            }
+        });
+    }
+
+    /**
+     * Conclui o job; debita o crédito só se ainda não reservado (jobs anteriores à
+     * reserva no enfileiramento), exatamente uma vez
+     */
+    async complete(job) {
+        await sequelize.transaction(async (transaction) => {
+            const [charged] = await AnalysisJob.update(
+                { creditCharged: true },
+                { where: { id: job.id, creditCharged: false }, transaction }
+            );
+
+            if (charged) {
+                await User.decrement('credits', {
+                    by: 1,
+                    where: { id: job.userId, credits: { [Op.gt]: 0 } },
+                    transaction
+                });
+                console.log(`[AnalysisQueue] Crédito debitado para o usuário ${job.userId} (job ${job.id})`);
+            }
+
+            await AnalysisJob.update({
+                status: 'completed',
+                stage: 'completed',
+                progress: 100,
+                finishedAt: new Date()
+            }, { where: { id: job.id }, transaction });
+        });
+
+        const user = await User.findByPk(job.userId);
+        const result = { ...(job.result || {}) };
+        if (user) result.credits_remaining = user.credits;
+        if (job.analysisResultId) result.savedAnalysisId = job.analysisResultId;
+
+        await job.reload();
+        await job.update({ result });
+        console.log(`[AnalysisQueue] ✅ Job ${job.id} concluído`);
+        this.publish(job);
+    }
+
+    updateStage(job, stage, details = {}) {
+        const progress = analysisProgress.STAGES[stage];
+        if (progress === undefined) return;
+
+        job.stage = stage;
+        job.progress = progress;
+        AnalysisJob.update({ stage, progress }, { where: { id: job.id } })
+            .catch(error => console.error('[AnalysisQueue] Erro ao registrar etapa:', error.message));
+        this.publish(job, details);
+    }
+
+    /**
+     * Renova updatedAt do job em execução (recover() só retoma jobs sem heartbeat)
+     */
+    heartbeat(id) {
+        // updatedAt é somente leitura no update: o Sequelize o renova ao gravar status
+        AnalysisJob.update({ status: 'running' }, { where: { id, status: 'running' } })
+            .catch(error => console.error('[AnalysisQueue] Erro ao registrar heartbeat:', error.message));
+    }
+
+    publish(job, details = {}) {
+        this.emit('job', {
+            id: job.id,
+            userId: job.userId,
+            status: job.status,
+            stage: job.stage,
+            progress: job.progress,
+            details
+        });
+    }
+
+    /**
+     * Reenfileira jobs pendentes no banco e jobs 'running' sem heartbeat
+     */
+    async recover() {
+        const staleBefore = new Date(Date.now() - this.staleMs);
+        const jobs = await AnalysisJob.findAll({
+            where: {
+                [Op.or]: [
+                    { status: 'queued' },
+                    { status: 'running', updatedAt: { [Op.lt]: staleBefore } }
+                ]
+            },
+            order: [['priority', 'DESC'], ['createdAt', 'ASC']]
+        });
+
+        let recovered = 0;
+        for (const job of jobs) {
+            if (this.running.has(job.id)) continue;
+
+            // Jobs já salvos só precisam ser concluídos: não contam tentativas
+            const missingFile = !job.analysisResultId && !fs.existsSync(job.resumePath);
+            const exhausted = !job.analysisResultId && job.attempts >= this.maxAttempts;
+            if (exhausted || missingFile) {
+                const [failed] = await AnalysisJob.update({
+                    status: 'failed',
+                    error: missingFile
+                        ? 'Arquivo do currículo não está mais disponível. Envie novamente.'
+                        : 'Análise interrompida. Por favor, tente novamente.',
+                    finishedAt: new Date()
+                }, { where: { id: job.id, status: job.status } });
+                if (failed) await this.refund(job);
+                continue;
+            }
+
+            if (job.status === 'running') {
+                const [requeued] = await AnalysisJob.update(
+                    { status: 'queued' },
+                    { where: { id: job.id, status: 'running' } }
+                );
+                if (!requeued) continue;
+            }
+
+            this.push(job.id, job.priority);
+            recovered++;
+        }
+
+        if (recovered > 0) {
+            console.log(`[AnalysisQueue] ${recovered} job(s) recuperado(s)`);
+        }
+        this.drain();
+        return recovered;
+    }
+
+    /**
+     * Recupera jobs pendentes e agenda verificações periódicas
+     */
+    start() {
+        if (this.recoverTimer) return;
+        this.stopped = false;
+
+        const recover = () => this.recover()
+            .catch(error => console.error('[AnalysisQueue] Erro ao recuperar jobs:', error.message));
+
+        recover();
+        this.recoverTimer = setInterval(recover, this.recoverIntervalMs);
+        this.recoverTimer.unref();
+    }
+
+    /**
+     * Encerramento: para de despachar a fila local (os jobs continuam 'queued' no
+     * banco e são retomados por outro processo via recover()) e avisa as conexões
+     * SSE ('stop'). Jobs em execução seguem até o fim; 'idle' sinaliza o término.
+     */
+    stop() {
+        clearInterval(this.recoverTimer);
+        this.recoverTimer = null;
+        this.stopped = true;
+        this.pending = [];
+        this.emit('stop');
+    }
+
+    async getJob(id, userId) {
+        return AnalysisJob.findOne({ where: { id, userId } });
+    }
+
+    getStats() {
+        return {
+            concurrency: this.concurrency,
+            running: this.running.size,
+            queued: this.pending.length,
+            maxQueued: this.maxQueued
+        };
+    }
+}
+
+const analysisQueue = new AnalysisQueue();
+
+module.exports = analysisQueue;
+module.exports.AnalysisQueue = AnalysisQueue;
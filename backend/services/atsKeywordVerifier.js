@@ -1,29 +1,17 @@
 // Verificador de palavras-chave realmente presentes no currículo
 // Aceita plural/singular, pequenas variações morfológicas e sinônimos profissionais relevantes
 // Utiliza stemming/lemmatização básica e matching semântico moderado
+// O matching em si é feito pelo keywordMatcher (texto normalizado/tokenizado uma vez)
 
 const natural = require('natural');
 const stemmer = natural.PorterStemmerPt; // para português
-
-/**
- * Normaliza string para comparação (lowercase, remove acentos)
- */
-function normalize(str) {
-  return str
-    .toLowerCase()
-    .normalize('NFD')
-    .replace(/\p{Diacritic}/gu, '')
-    .replace(/[^a-z0-9\s]/gi, '');
-}
-
-function singularPluralForms(word) {
-  // Retorna array com singular e plural para português simples
-  if (word.endsWith('s')) {
-    return [word, word.slice(0, -1)];
-  } else {
-    return [word, word + 's'];
-  }
-}
+const {
+  normalize,
+  singularPluralForms,
+  generatePrepositionVariations,
+  prepareText,
+  compileKeywordMatcher
+} = require('./keywordMatcher');
 
 /**
  * Mapas de idiomas e níveis para reconhecimento inteligente
@@ -48,11 +36,17 @@ const levelMap = {
   'fluente': ['fluente', 'fluent', 'nativo', 'native', 'proficiente', 'proficient']
 };
 
+// Variações já normalizadas (calculadas uma única vez)
+const normalizedLanguageMap = Object.entries(languageMap)
+  .map(([lang, variations]) => [lang, variations.map(normalize)]);
+const normalizedLevelMap = Object.entries(levelMap)
+  .map(([level, variations]) => [level, variations.map(normalize)]);
+
 /**
  * Verifica se um idioma específico está presente no currículo, considerando níveis
  */
 function checkLanguageInResume(requestedLanguage, resumeText) {
-  const normResume = normalize(resumeText);
+  const resume = prepareText(resumeText);
   const requestedLang = normalize(requestedLanguage);
 
   // Primeiro, verificar se é uma palavra-chave de idioma
@@ -60,14 +54,11 @@ function checkLanguageInResume(requestedLanguage, resumeText) {
   let requestedLevel = null;
 
   // Identificar se a palavra-chave contém um idioma conhecido
-  for (const [lang, variations] of Object.entries(languageMap)) {
-    for (const variation of variations) {
-      if (requestedLang.includes(normalize(variation))) {
-        targetLanguage = lang;
-        break;
-      }
+  for (const [lang, variations] of normalizedLanguageMap) {
+    if (variations.some(variation => requestedLang.includes(variation))) {
+      targetLanguage = lang;
+      break;
     }
-    if (targetLanguage) break;
   }
 
   // Se não é um idioma, usar verificação padrão
@@ -76,29 +67,19 @@ function checkLanguageInResume(requestedLanguage, resumeText) {
   }
 
   // Identificar se há um nível específico na requisição
-  for (const [level, variations] of Object.entries(levelMap)) {
-    for (const variation of variations) {
-      if (requestedLang.includes(normalize(variation))) {
-        requestedLevel = level;
-        break;
-      }
+  for (const [level, variations] of normalizedLevelMap) {
+    if (variations.some(variation => requestedLang.includes(variation))) {
+      requestedLevel = level;
+      break;
     }
-    if (requestedLevel) break;
   }
 
   // Procurar o idioma no currículo
-  const languageVariations = languageMap[targetLanguage];
-  let foundLanguage = false;
+  const languageVariations = normalizedLanguageMap.find(([lang]) => lang === targetLanguage)[1];
   let foundLevel = null;
 
   // Verificar se o idioma está presente
-  for (const variation of languageVariations) {
-    const regex = new RegExp(`\\b${normalize(variation)}\\b`, 'i');
-    if (regex.test(normResume)) {
-      foundLanguage = true;
-      break;
-    }
-  }
+  const foundLanguage = languageVariations.some(variation => resume.hasForm(variation));
 
   if (!foundLanguage) {
     return false;
@@ -112,15 +93,15 @@ function checkLanguageInResume(requestedLanguage, resumeText) {
   // Procurar o nível no currículo (busca em contexto próximo ao idioma)
   for (const variation of languageVariations) {
     // Buscar em um contexto de ~100 caracteres ao redor do idioma
-    const langRegex = new RegExp(`(.{0,100}\\b${normalize(variation)}\\b.{0,100})`, 'gi');
-    const matches = normResume.match(langRegex);
+    const langRegex = new RegExp(`(.{0,100}\\b${variation}\\b.{0,100})`, 'gi');
+    const matches = resume.normalized.match(langRegex);
 
     if (matches) {
       for (const match of matches) {
         // Verificar se há algum nível mencionado no contexto
-        for (const [level, levelVariations] of Object.entries(levelMap)) {
+        for (const [level, levelVariations] of normalizedLevelMap) {
           for (const levelVar of levelVariations) {
-            if (match.includes(normalize(levelVar))) {
+            if (match.includes(levelVar)) {
               foundLevel = level;
               break;
             }
@@ -157,21 +138,16 @@ function checkLanguageInResume(requestedLanguage, resumeText) {
  * Usa stemmer para aceitar variações simples e lógica especial para idiomas
  */
 function keywordInResume(keyword, resumeText) {
-  const normResume = normalize(resumeText);
+  const resume = prepareText(resumeText);
 
   // Verificação especial para idiomas
-  if (checkLanguageInResume(keyword, resumeText)) {
+  if (checkLanguageInResume(keyword, resume)) {
     return true;
   }
 
-  // Verificação padrão para outras palavras-chave
+  // Verificação padrão para outras palavras-chave (palavra inteira, ignorando caixa)
   const forms = singularPluralForms(normalize(keyword));
-  for (const form of forms) {
-    // Regex para palavra inteira (\b) ignorando caixa
-    const regex = new RegExp(`\\b${form}\\b`, 'i');
-    if (regex.test(normResume)) return true;
-  }
-  return false;
+  return forms.some(form => resume.hasForm(form));
 }
 
 /**
@@ -182,82 +158,12 @@ function keywordInResume(keyword, resumeText) {
  * @returns {Object[]} Array de objetos com keyword e count, ordenado por relevância (count descendente)
  */
 function countKeywordOccurrences(keywords, jobsText) {
-  const normJobsText = normalize(jobsText);
-  const keywordCounts = [];
-
-  keywords.forEach(keyword => {
-    let totalCount = 0;
-    const normalizedKeyword = normalize(keyword);
-
-    // 1. Para expressões compostas (mais de uma palavra), usar busca mais flexível
-    if (normalizedKeyword.includes(' ')) {
-      // Dividir em palavras principais (ignorar conectores)
-      const palavrasPrincipais = normalizedKeyword.split(' ').filter(palavra =>
-        palavra.length > 2 && !['de', 'da', 'do', 'dos', 'das', 'em', 'na', 'no', 'nos', 'nas', 'com', 'para', 'por', 'ao', 'a', 'e', 'ou', 'que', 'se'].includes(palavra)
-      );
-
-      // Se tem palavras principais, verificar se todas aparecem próximas
-      if (palavrasPrincipais.length >= 2) {
-        // Criar regex que permite palavras entre as principais (até 3 palavras de distância)
-        const regexPattern = palavrasPrincipais.map(palavra => `\\b${palavra}\\b`).join('[\\s\\w]{0,20}');
-        const flexibleRegex = new RegExp(regexPattern, 'gi');
-        const matches = normJobsText.match(flexibleRegex);
-        if (matches) {
-          totalCount += matches.length;
-        }
-      }
-    } else {
-      // 2. Para palavras simples, contar variações de singular/plural
-      const forms = singularPluralForms(normalizedKeyword);
-      forms.forEach(form => {
-        const regex = new RegExp(`\\b${form}\\b`, 'gi');
-        const matches = normJobsText.match(regex);
-        if (matches) {
-          totalCount += matches.length;
-        }
-      });
-    }
+  const counts = compileKeywordMatcher(keywords).count(prepareText(jobsText));
 
-    // 3. Contar variações preposicionais (se existirem)
-    const prepositionVariations = generatePrepositionVariations(keyword);
-
-    // Para cada variação preposicional
-    prepositionVariations.forEach(variation => {
-      // Pular a versão já contada acima
-      if (variation === normalizedKeyword) return;
-
-      // Aplicar mesma lógica: flexível para expressões, exata para palavras simples
-      if (variation.includes(' ')) {
-        const palavrasPrincipais = variation.split(' ').filter(palavra =>
-          palavra.length > 2 && !['de', 'da', 'do', 'dos', 'das', 'em', 'na', 'no', 'nos', 'nas', 'com', 'para', 'por', 'ao', 'a', 'e', 'ou', 'que', 'se'].includes(palavra)
-        );
-
-        if (palavrasPrincipais.length >= 2) {
-          const regexPattern = palavrasPrincipais.map(palavra => `\\b${palavra}\\b`).join('[\\s\\w]{0,20}');
-          const flexibleRegex = new RegExp(regexPattern, 'gi');
-          const matches = normJobsText.match(flexibleRegex);
-          if (matches) {
-            totalCount += matches.length;
-          }
-        }
-      } else {
-        // Palavra simples - usar busca exata
-        const variationForms = singularPluralForms(variation);
-        variationForms.forEach(form => {
-          const regex = new RegExp(`\\b${form}\\b`, 'gi');
-          const matches = normJobsText.match(regex);
-          if (matches) {
-            totalCount += matches.length;
-          }
-        });
-      }
-    });
-
-    keywordCounts.push({
-      keyword: keyword,
-      count: totalCount
-    });
-  });
+  const keywordCounts = keywords.map((keyword, index) => ({
+    keyword: keyword,
+    count: counts[index]
+  }));
 
   // Ordenar por relevância (count descendente), depois alfabeticamente para empates
   return keywordCounts.sort((a, b) => {
@@ -366,41 +272,6 @@ function deduplicateKeywordCounts(keywordCounts) {
   });
 }
 
-/**
- * Gera todas as variações preposicionais possíveis de uma palavra-chave
- * para contagem mais precisa de relevância
- */
-function generatePrepositionVariations(keyword) {
-  const normalized = normalize(keyword);
-  const variations = new Set([normalized]); // Começar com a versão normalizada
-
-  // Mapas de variações bidirecionais
-  const prepositionVariations = [
-    [' de ', ' do ', ' da ', ' dos ', ' das '],
-    [' em ', ' no ', ' na ', ' nos ', ' nas '],
-    [' a ', ' ao ', ' aos ', ' às ', ' à '],
-    [' com ', ' com o ', ' com a ', ' com os ', ' com as ']
-  ];
-
-  // Para cada grupo de preposições
-  prepositionVariations.forEach(group => {
-    // Se a palavra-chave contém alguma preposição do grupo
-    group.forEach(prep => {
-      if (normalized.includes(prep)) {
-        // Gerar variações com todas as outras preposições do grupo
-        group.forEach(altPrep => {
-          if (prep !== altPrep) {
-            const variation = normalized.replace(new RegExp(prep, 'g'), altPrep);
-            variations.add(variation);
-          }
-        });
-      }
-    });
-  });
-
-  return Array.from(variations);
-}
-
 /**
  * Consolida palavras-chave hierárquicas APENAS quando há certeza semântica absoluta
  * CORRIGIDO: Consolidação muito mais restritiva para evitar contagens incorretas
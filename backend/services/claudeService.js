@@ -1,7 +1,7 @@
 const axios = require('axios');
 
 const CLAUDE_API_KEY = process.env.CLAUDE_API_KEY;
-const CLAUDE_URL = 'https://api.anthropic.com/v1/messages';
+const CLAUDE_URL = process.env.CLAUDE_API_URL || 'https://api.anthropic.com/v1/messages';
 const CLAUDE_MODEL = 'claude-3-7-sonnet-latest'; // 160k tokens, disponível e de alta qualidade
 
 /**
@@ -49,3 +49,5 @@ exports.extractATSDataClaude = async function (prompt) {
     }
   }
 };
+
+exports.CLAUDE_MODEL = CLAUDE_MODEL;
@@ -0,0 +1,220 @@
+const { Op, UniqueConstraintError, col, where } = require('sequelize');
+const sequelize = require('../db');
+const GiftCode = require('../models/giftCode');
+const GiftCodeUsage = require('../models/giftCodeUsage');
+const GiftCodeCounter = require('../models/giftCodeCounter');
+
+/**
+ * Contadores do painel de códigos de presente
+ *
+ * - Tabela gift_code_counters atualizada pelos hooks de GiftCode/GiftCodeUsage
+ *   (UPDATE value = value + delta, na mesma transação da escrita original)
+ * - Usos do dia em um contador por data (usages:AAAA-MM-DD)
+ * - Códigos que expiram em 7 dias dependem do relógio: uma contagem em cache por TTL
+ * - rebuild() recalcula tudo a partir das tabelas de origem (início e reconciliação periódica)
+ */
+
+const STATIC_COUNTERS = ['totalCodes', 'activeCodes', 'exhaustedCodes'];
+const USAGE_PREFIX = 'usages:';
+const EXPIRING_WINDOW_MS = 7 * 24 * 60 * 60 * 1000;
+
+// Data local (mesmo critério do painel: meia-noite do servidor)
+function dayKey(date = new Date()) {
+    const d = new Date(date);
+    const month = String(d.getMonth() + 1).padStart(2, '0');
+    const day = String(d.getDate()).padStart(2, '0');
+    return `${USAGE_PREFIX}${d.getFullYear()}-${month}-${day}`;
+}
+
+/**
+ * Contribuição de um código para cada contador
+ */
+function classify(values) {
+    return {
+        totalCodes: 1,
+        activeCodes: values.isActive === false ? 0 : 1,
+        exhaustedCodes: (values.usedCount || 0) >= (values.maxUses ?? 1) ? 1 : 0
+    };
+}
+
+function combine(target, deltas, sign = 1) {
+    Object.keys(deltas).forEach(name => {
+        target[name] = (target[name] || 0) + sign * deltas[name];
+    });
+    return target;
+}
+
+class GiftCodeCounters {
+    constructor(options = {}) {
+        this.expiringTtlMs = options.expiringTtlMs || parseInt(process.env.GIFT_CODE_EXPIRING_TTL_MS) || 60 * 1000;
+        this.reconcileIntervalMs = options.reconcileIntervalMs || parseInt(process.env.GIFT_CODE_COUNTERS_RECONCILE_MS) || 60 * 60 * 1000;
+
+        this.attached = false;
+        this.expiring = null;
+        this.reconcileTimer = null;
+    }
+
+    /**
+     * Registra os hooks de manutenção incremental nos modelos
+     */
+    attach() {
+        if (this.attached) return;
+        this.attached = true;
+
+        GiftCode.addHook('afterCreate', 'giftCodeCounters', (code, options) =>
+            this.apply(classify(code.get()), options));
+        GiftCode.addHook('afterBulkCreate', 'giftCodeCounters', (codes, options) =>
+            this.apply(codes.reduce((acc, code) => combine(acc, classify(code.get())), {}), options));
+        GiftCode.addHook('afterUpdate', 'giftCodeCounters', (code, options) =>
+            this.apply(this.codeUpdateDelta(code), options));
+        GiftCode.addHook('afterDestroy', 'giftCodeCounters', (code, options) =>
+            this.apply(combine({}, classify(code.get()), -1), options));
+
+        GiftCodeUsage.addHook('afterCreate', 'giftCodeCounters', (usage, options) =>
+            this.apply({ [dayKey(usage.createdAt)]: 1 }, options));
+        GiftCodeUsage.addHook('afterBulkCreate', 'giftCodeCounters', (usages, options) =>
+            this.apply(usages.reduce((acc, usage) => combine(acc, { [dayKey(usage.createdAt)]: 1 }), {}), options));
+        GiftCodeUsage.addHook('afterDestroy', 'giftCodeCounters', (usage, options) =>
+            this.apply({ [dayKey(usage.createdAt)]: -1 }, options));
+    }
+
+    // Diferença entre o estado anterior (previous) e o atual de um código
+    codeUpdateDelta(code) {
+        const current = code.get();
+        const previous = { ...current, ...code.previous() };
+        return combine(classify(current), classify(previous), -1);
+    }
+
+    /**
+     * Aplica deltas aos contadores; falhas são registradas e corrigidas na reconciliação
+     */
+    async apply(deltas, options = {}) {
+        const transaction = options.transaction;
+
+        for (const [name, delta] of Object.entries(deltas)) {
+            if (!delta) continue;
+
+            try {
+                if (!(await this.increment(name, delta, transaction))) {
+                    await GiftCodeCounter.create({ name, value: delta }, { transaction })
+                        .catch(error => {
+                            // Outro processo criou o contador ao mesmo tempo
+                            if (!(error instanceof UniqueConstraintError)) throw error;
+                            return this.increment(name, delta, transaction);
+                        });
+                }
+            } catch (error) {
+                console.error(`[GiftCodeCounters] Erro ao atualizar contador ${name}:`, error.message);
+            }
+        }
+    }
+
+    async increment(name, delta, transaction) {
+        const [updated] = await GiftCodeCounter.update(
+            { value: sequelize.literal(`value + ${Math.trunc(delta)}`) },
+            { where: { name }, transaction }
+        );
+        return updated > 0;
+    }
+
+    /**
+     * Recalcula os contadores a partir de gift_codes/gift_code_usages
+     */
+    async rebuild() {
+        const today = dayKey();
+        const startOfDay = new Date(new Date().setHours(0, 0, 0, 0));
+
+        const [totalCodes, activeCodes, exhaustedCodes, usagesToday] = await Promise.all([
+            GiftCode.count(),
+            GiftCode.count({ where: { isActive: true } }),
+            GiftCode.count({ where: where(col('usedCount'), Op.gte, col('maxUses')) }),
+            GiftCodeUsage.count({ where: { createdAt: { [Op.gte]: startOfDay } } })
+        ]);
+
+        const values = { totalCodes, activeCodes, exhaustedCodes, [today]: usagesToday };
+        for (const [name, value] of Object.entries(values)) {
+            await GiftCodeCounter.upsert({ name, value });
+        }
+
+        // Contadores de dias anteriores não são mais lidos
+        await GiftCodeCounter.destroy({
+            where: { name: { [Op.like]: `${USAGE_PREFIX}%`, [Op.ne]: today } }
+        });
+
+        this.expiring = null;
+        console.log(`[GiftCodeCounters] Contadores recalculados: ${JSON.stringify(values)}`);
+        return values;
+    }
+
+    async countExpiring() {
+        const now = Date.now();
+        if (this.expiring && this.expiring.expiresAt > now) {
+            return this.expiring.value;
+        }
+
+        const value = await GiftCode.count({
+            where: {
+                expiresAt: {
+                    [Op.lte]: new Date(now + EXPIRING_WINDOW_MS),
+                    [Op.gt]: new Date(now)
+                }
+            }
+        });
+        this.expiring = { value, expiresAt: now + this.expiringTtlMs };
+        return value;
+    }
+
+    /**
+     * Estatísticas do painel: uma leitura da tabela de contadores + contagem de expiração em cache
+     */
+    async getDashboard() {
+        const today = dayKey();
+        let rows = await GiftCodeCounter.findAll({
+            where: { name: { [Op.in]: [...STATIC_COUNTERS, today] } },
+            raw: true
+        });
+
+        // Tabela ainda não populada (primeira execução)
+        if (!STATIC_COUNTERS.every(name => rows.some(row => row.name === name))) {
+            const values = await this.rebuild();
+            rows = Object.keys(values).map(name => ({ name, value: values[name] }));
+        }
+
+        const counters = Object.fromEntries(rows.map(row => [row.name, Number(row.value) || 0]));
+
+        return {
+            totalCodes: counters.totalCodes,
+            activeCodes: counters.activeCodes,
+            exhaustedCodes: counters.exhaustedCodes,
+            usagesToday: counters[today] || 0,
+            expiringCodes: await this.countExpiring()
+        };
+    }
+
+    /**
+     * Registra os hooks, recalcula os contadores e agenda a reconciliação periódica
+     */
+    start() {
+        this.attach();
+        if (this.reconcileTimer) return;
+
+        const reconcile = () => this.rebuild()
+            .catch(error => console.error('[GiftCodeCounters] Erro ao recalcular contadores:', error.message));
+
+        reconcile();
+        this.reconcileTimer = setInterval(reconcile, this.reconcileIntervalMs);
+        this.reconcileTimer.unref();
+    }
+
+    stop() {
+        clearInterval(this.reconcileTimer);
+        this.reconcileTimer = null;
+    }
+}
+
+const giftCodeCounters = new GiftCodeCounters();
+
+module.exports = giftCodeCounters;
+module.exports.GiftCodeCounters = GiftCodeCounters;
+module.exports.classify = classify;
+module.exports.dayKey = dayKey;
@@ -0,0 +1,306 @@
+// Motor de matching de palavras-chave em passagem única
+// Normaliza e tokeniza cada texto uma vez e compila o conjunto de palavras-chave
+// (formas singular/plural e variações preposicionais) em uma tabela de despacho
+// por token, reproduzindo exatamente a semântica das regex \b...\b usadas antes
+
+const STOPWORDS = new Set([
+  'de', 'da', 'do', 'dos', 'das', 'em', 'na', 'no', 'nos', 'nas', 'com',
+  'para', 'por', 'ao', 'a', 'e', 'ou', 'que', 'se'
+]);
+
+// Distância máxima (em caracteres) entre palavras de uma expressão composta,
+// equivalente ao [\s\w]{0,20} da regex original
+const MAX_GAP = 20;
+
+const TOKEN_REGEX = /[A-Za-z0-9]+/g;
+const SIMPLE_TERM = /^[a-z0-9]+$/;
+
+const PREPARED_CACHE_SIZE = 16;
+const MATCHER_CACHE_SIZE = 32;
+
+/**
+ * Normaliza string para comparação (lowercase, remove acentos)
+ */
+function normalize(str) {
+  return str
+    .toLowerCase()
+    .normalize('NFD')
+    .replace(/\p{Diacritic}/gu, '')
+    .replace(/[^a-z0-9\s]/gi, '');
+}
+
+function singularPluralForms(word) {
+  // Retorna array com singular e plural para português simples
+  if (word.endsWith('s')) {
+    return [word, word.slice(0, -1)];
+  } else {
+    return [word, word + 's'];
+  }
+}
+
+function principalWords(expression) {
+  return expression.split(' ').filter(palavra =>
+    palavra.length > 2 && !STOPWORDS.has(palavra)
+  );
+}
+
+/**
+ * Texto normalizado e tokenizado uma única vez
+ */
+class PreparedText {
+  constructor(text) {
+    this.normalized = normalize(text);
+    this.tokens = [];
+    this.starts = [];
+    this.ends = [];
+    this.tokenCounts = new Map();
+
+    TOKEN_REGEX.lastIndex = 0;
+    let match;
+    while ((match = TOKEN_REGEX.exec(this.normalized)) !== null) {
+      const token = match[0].toLowerCase();
+      this.tokens.push(token);
+      this.starts.push(match.index);
+      this.ends.push(match.index + match[0].length);
+      this.tokenCounts.set(token, (this.tokenCounts.get(token) || 0) + 1);
+    }
+  }
+
+  /**
+   * Equivalente a new RegExp(`\\b${form}\\b`, 'i').test(normalized)
+   */
+  hasForm(form) {
+    if (SIMPLE_TERM.test(form)) {
+      return this.tokenCounts.has(form);
+    }
+    return new RegExp(`\\b${form}\\b`, 'i').test(this.normalized);
+  }
+}
+
+// Cache LRU de textos preparados (o mesmo jobsText/resumeText é consultado várias vezes)
+const preparedCache = new Map();
+
+function prepareText(text) {
+  if (text instanceof PreparedText) return text;
+
+  const cached = preparedCache.get(text);
+  if (cached) {
+    preparedCache.delete(text);
+    preparedCache.set(text, cached);
+    return cached;
+  }
+
+  const prepared = new PreparedText(text);
+  preparedCache.set(text, prepared);
+  if (preparedCache.size > PREPARED_CACHE_SIZE) {
+    preparedCache.delete(preparedCache.keys().next().value);
+  }
+  return prepared;
+}
+
+/**
+ * Conjunto de palavras-chave compilado
+ * Padrões:
+ *  - token: palavra inteira (contagem direta pelo índice de tokens)
+ *  - sequence: palavras principais com até MAX_GAP caracteres entre si,
+ *    despachadas pelo primeiro token em uma única varredura
+ *  - regex: fallback para formas fora de [a-z0-9] (mantém o comportamento antigo)
+ */
+class KeywordMatcher {
+  constructor(keywords) {
+    this.keywords = keywords;
+    this.patterns = [];
+    this.patternIndex = new Map();
+    this.keywordPatterns = keywords.map(keyword => this.compileKeyword(keyword));
+
+    // Tabela de despacho: primeiro token -> padrões sequence que começam nele
+    this.dispatch = new Map();
+    this.patterns.forEach((pattern, index) => {
+      if (pattern.type !== 'sequence') return;
+      const first = pattern.words[0];
+      if (!this.dispatch.has(first)) this.dispatch.set(first, []);
+      this.dispatch.get(first).push(index);
+    });
+  }
+
+  addPattern(key, factory) {
+    if (!this.patternIndex.has(key)) {
+      this.patternIndex.set(key, this.patterns.length);
+      this.patterns.push(factory());
+    }
+    return this.patternIndex.get(key);
+  }
+
+  addForm(form) {
+    if (SIMPLE_TERM.test(form)) {
+      return this.addPattern(`w:${form}`, () => ({ type: 'token', form }));
+    }
+    return this.addPattern(`r:${form}`, () => ({ type: 'regex', source: `\\b${form}\\b` }));
+  }
+
+  addExpression(expression) {
+    const words = principalWords(expression);
+    if (words.length < 2) return [];
+
+    if (words.every(word => SIMPLE_TERM.test(word))) {
+      return [this.addPattern(`s:${words.join(' ')}`, () => ({ type: 'sequence', words }))];
+    }
+
+    const source = words.map(palavra => `\\b${palavra}\\b`).join(`[\\s\\w]{0,${MAX_GAP}}`);
+    return [this.addPattern(`r:${source}`, () => ({ type: 'regex', source }))];
+  }
+
+  /**
+   * Lista de padrões (com repetição) cuja soma forma a contagem da palavra-chave
+   */
+  compileKeyword(keyword) {
+    const indexes = [];
+    const normalizedKeyword = normalize(keyword);
+
+    const addVariant = (variant) => {
+      if (variant.includes(' ')) {
+        indexes.push(...this.addExpression(variant));
+      } else {
+        singularPluralForms(variant).forEach(form => indexes.push(this.addForm(form)));
+      }
+    };
+
+    addVariant(normalizedKeyword);
+
+    generatePrepositionVariations(keyword).forEach(variation => {
+      // Pular a versão já contada acima
+      if (variation === normalizedKeyword) return;
+      addVariant(variation);
+    });
+
+    return indexes;
+  }
+
+  /**
+   * Contagem de ocorrências de cada palavra-chave (na ordem de this.keywords)
+   */
+  count(text) {
+    const prepared = prepareText(text);
+    const patternCounts = new Array(this.patterns.length).fill(0);
+    const nextStart = new Array(this.patterns.length).fill(0);
+    const { tokens, starts, ends } = prepared;
+
+    this.patterns.forEach((pattern, index) => {
+      if (pattern.type === 'token') {
+        patternCounts[index] = prepared.tokenCounts.get(pattern.form) || 0;
+      } else if (pattern.type === 'regex') {
+        const matches = prepared.normalized.match(new RegExp(pattern.source, 'gi'));
+        patternCounts[index] = matches ? matches.length : 0;
+      }
+    });
+
+    // Varredura única dos tokens para as expressões compostas
+    if (this.dispatch.size > 0) {
+      for (let i = 0; i < tokens.length; i++) {
+        const candidates = this.dispatch.get(tokens[i]);
+        if (!candidates) continue;
+
+        for (const index of candidates) {
+          // Matches não se sobrepõem (mesma semântica de String.match com flag g)
+          if (starts[i] < nextStart[index]) continue;
+
+          const end = matchSequence(prepared, this.patterns[index].words, 1, i, ends[i]);
+          if (end >= 0) {
+            patternCounts[index]++;
+            nextStart[index] = end;
+          }
+        }
+      }
+    }
+
+    return this.keywordPatterns.map(indexes =>
+      indexes.reduce((sum, index) => sum + patternCounts[index], 0)
+    );
+  }
+}
+
+/**
+ * Procura words[k..] a partir do token `from` (terminado em `prevEnd`)
+ * Tenta primeiro o candidato mais distante, como o quantificador guloso da regex
+ * @returns {number} posição final do match ou -1
+ */
+function matchSequence(prepared, words, k, from, prevEnd) {
+  if (k === words.length) return prevEnd;
+
+  const { tokens, starts, ends } = prepared;
+  let last = from + 1;
+  while (last < tokens.length && starts[last] <= prevEnd + MAX_GAP) last++;
+
+  for (let j = last - 1; j > from; j--) {
+    if (tokens[j] !== words[k]) continue;
+    const end = matchSequence(prepared, words, k + 1, j, ends[j]);
+    if (end >= 0) return end;
+  }
+  return -1;
+}
+
+/**
+ * Gera todas as variações preposicionais possíveis de uma palavra-chave
+ * para contagem mais precisa de relevância
+ */
+function generatePrepositionVariations(keyword) {
+  const normalized = normalize(keyword);
+  const variations = new Set([normalized]); // Começar com a versão normalizada
+
+  // Mapas de variações bidirecionais
+  const prepositionVariations = [
+    [' de ', ' do ', ' da ', ' dos ', ' das '],
+    [' em ', ' no ', ' na ', ' nos ', ' nas '],
+    [' a ', ' ao ', ' aos ', ' às ', ' à '],
+    [' com ', ' com o ', ' com a ', ' com os ', ' com as ']
+  ];
+
+  // Para cada grupo de preposições
+  prepositionVariations.forEach(group => {
+    // Se a palavra-chave contém alguma preposição do grupo
+    group.forEach(prep => {
+      if (normalized.includes(prep)) {
+        // Gerar variações com todas as outras preposições do grupo
+        group.forEach(altPrep => {
+          if (prep !== altPrep) {
+            const variation = normalized.replace(new RegExp(prep, 'g'), altPrep);
+            variations.add(variation);
+          }
+        });
+      }
+    });
+  });
+
+  return Array.from(variations);
+}
+
+// Cache LRU de automatos compilados por conjunto de palavras-chave
+const matcherCache = new Map();
+
+function compileKeywordMatcher(keywords) {
+  const key = keywords.join('\u0000');
+
+  const cached = matcherCache.get(key);
+  if (cached) {
+    matcherCache.delete(key);
+    matcherCache.set(key, cached);
+    return cached;
+  }
+
+  const matcher = new KeywordMatcher(keywords);
+  matcherCache.set(key, matcher);
+  if (matcherCache.size > MATCHER_CACHE_SIZE) {
+    matcherCache.delete(matcherCache.keys().next().value);
+  }
+  return matcher;
+}
+
+module.exports = {
+  normalize,
+  singularPluralForms,
+  generatePrepositionVariations,
+  prepareText,
+  compileKeywordMatcher,
+  KeywordMatcher,
+  PreparedText,
+};
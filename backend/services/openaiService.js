@@ -1,9 +1,16 @@
 const axios = require('axios');
+const crypto = require('crypto');
 const claudeService = require('./claudeService');
 const rateLimitMonitor = require('./rateLimitMonitor');
+const llmCache = require('../utils/llmCache');
+const metrics = require('../utils/metrics');
 
 const OPENAI_API_KEY = process.env.OPENAI_API_KEY;
-const OPENAI_URL = 'https://api.openai.com/v1/chat/completions';
+const OPENAI_URL = process.env.OPENAI_API_URL || 'https://api.openai.com/v1/chat/completions';
+const OPENAI_MODEL = 'gpt-4o';
+const SYSTEM_MESSAGE = 'Você é um ATS especialista.';
+
+const llmRetries = metrics.counter('llm_retries_total', 'Retentativas de chamadas ao LLM');
 
 // Configurações de retry e rate limiting
 const RETRY_CONFIG = {
@@ -186,6 +193,14 @@ Responda em JSON, SEMPRE incluindo TODAS as chaves abaixo, mesmo que alguma este
 `;
 }
 
+// Versão do prompt: muda automaticamente quando o template ou os parâmetros mudam,
+// invalidando as respostas em cache geradas com o prompt anterior
+const PROMPT_VERSION = crypto.createHash('sha256')
+  .update(buildPrompt('\u0000', '\u0000'))
+  .update(JSON.stringify({ system: SYSTEM_MESSAGE, temperature: 0.1, max_tokens: 8000 }))
+  .digest('hex')
+  .slice(0, 16);
+
 exports.extractATSData = async (jobsText, resumeText) => {
   const prompt = buildPrompt(jobsText, resumeText);
   const estimatedTokens = Math.ceil(prompt.length / 4) + 8000; // Estimativa: 4 chars por token + output
@@ -193,15 +208,65 @@ exports.extractATSData = async (jobsText, resumeText) => {
   console.log('[OpenAI] Tamanho do prompt:', prompt.length, 'caracteres');
   console.log('[OpenAI] Tokens estimados:', estimatedTokens);
 
-  // Verificar rate limits antes de tentar
-  const recommendation = rateLimitMonitor.getRecommendedService(estimatedTokens);
+  const model = `${OPENAI_MODEL}|${claudeService.CLAUDE_MODEL}`;
+  const key = llmCache.buildKey({ model, promptVersion: PROMPT_VERSION, inputs: [jobsText, resumeText] });
+
+  // Span 'llm': chamada completa; outcome cache/coalesced quando não houve requisição
+  const endSpan = metrics.startSpan('llm');
+  let value, source;
+  try {
+    ({ value, source } = await llmCache.getOrCompute(
+      key,
+      () => requestATSData(prompt, estimatedTokens),
+      { model, promptVersion: PROMPT_VERSION, estimatedTokens }
+    ));
+  } catch (error) {
+    endSpan('error');
+    throw error;
+  }
+  endSpan(source === 'upstream' ? 'ok' : source);
+
+  if (source !== 'upstream') {
+    console.log(`[OpenAI] Resposta servida ${source === 'cache' ? 'do cache' : 'por requisição idêntica em andamento'} (${estimatedTokens} tokens economizados)`);
+    rateLimitMonitor.recordCacheHit(estimatedTokens, source);
+  }
+
+  return value;
+};
+
+// Os dois orçamentos globais esgotados: falha sem chamar nenhum provedor
+function rateLimitedError(waitTime) {
+  const error = new Error(`Serviços de IA no limite de uso. Tente novamente em ${Math.ceil(waitTime / 1000)}s.`);
+  error.statusCode = 429;
+  error.retryAfterMs = waitTime;
+  return error;
+}
+
+// Chamada ao Claude debitando o orçamento global dele (mesmos baldes compartilhados do OpenAI)
+async function requestClaude(prompt, estimatedTokens) {
+  const admission = await rateLimitMonitor.admitClaude(estimatedTokens);
+  if (!admission.allowed) {
+    const error = new Error(`Claude rate limited globalmente (aguardar ${Math.round(admission.waitTime / 1000)}s)`);
+    error.rateLimited = true;
+    error.waitTime = admission.waitTime;
+    throw error;
+  }
+
+  const raw = await metrics.span('llm_request', () => claudeService.extractATSDataClaude(prompt), { provider: 'claude' });
+  rateLimitMonitor.recordClaudeUsage(estimatedTokens);
+  return raw;
+}
+
+async function requestATSData(prompt, estimatedTokens) {
+  // Verificar rate limits antes de tentar (orçamento global entre workers)
+  const recommendation = await rateLimitMonitor.admit(estimatedTokens);
   console.log('[Rate Monitor]', recommendation.reason);
 
   // Se recomenda usar Claude direto, use Claude
   if (recommendation.service === 'claude') {
     console.log('[Strategy] Indo direto para Claude devido a rate limits');
     try {
-      const claudeRaw = await claudeService.extractATSDataClaude(prompt);
+      const claudeRaw = await requestClaude(prompt, estimatedTokens);
       console.log('[Claude] Resposta recebida com sucesso (escolha estratégica)');
 
       let text = claudeRaw.trim();
@@ -214,14 +279,18 @@ exports.extractATSData = async (jobsText, resumeText) => {
       return JSON.parse(text);
     } catch (errClaude) {
       console.error('[Claude] Falha na escolha estratégica:', errClaude.message);
+      // OpenAI também fora do orçamento: não insistir nele
+      if (errClaude.rateLimited) {
+        throw rateLimitedError(Math.min(recommendation.waitTime || errClaude.waitTime, errClaude.waitTime));
+      }
       // Continua para tentar OpenAI mesmo assim
     }
   }
 
   const requestConfig = {
-    model: 'gpt-4o',
+    model: OPENAI_MODEL,
     messages: [
-      { role: 'system', content: 'Você é um ATS especialista.' },
+      { role: 'system', content: SYSTEM_MESSAGE },
       { role: 'user', content: prompt }
     ],
     temperature: 0.1,
@@ -232,11 +301,12 @@ exports.extractATSData = async (jobsText, resumeText) => {
     model: requestConfig.model,
     temperature: requestConfig.temperature,
     max_tokens: requestConfig.max_tokens,
-    system: 'Você é um ATS especialista.'
+    system: SYSTEM_MESSAGE
   });
 
   // Implementar retry com backoff exponencial
   for (let attempt = 0; attempt <= RETRY_CONFIG.maxRetries; attempt++) {
+    const endAttempt = metrics.startSpan('llm_request', { provider: 'openai' });
     try {
       const response = await axios.post(
         OPENAI_URL,
@@ -249,6 +319,7 @@ exports.extractATSData = async (jobsText, resumeText) => {
           timeout: 60000
         }
       );
+      endAttempt('ok');
 
       // Atualizar monitor de rate limits com headers da resposta
       if (response.headers) {
@@ -280,6 +351,7 @@ exports.extractATSData = async (jobsText, resumeText) => {
       }
 
     } catch (error) {
+      endAttempt('error');
       const isLastAttempt = attempt === RETRY_CONFIG.maxRetries;
       const isRetriable = isRetriableError(error);
       const rateLimitInfo = getRateLimitInfo(error);
@@ -345,6 +417,7 @@ exports.extractATSData = async (jobsText, resumeText) => {
       }
 
       console.log(`[OpenAI] Rate limit atingido. Aguardando ${Math.round(delay / 1000)}s antes da próxima tentativa...`);
+      llmRetries.inc({ provider: 'openai' });
       await sleep(delay);
     }
   }
@@ -352,7 +425,7 @@ exports.extractATSData = async (jobsText, resumeText) => {
   // Fallback para Claude se todas as tentativas falharam
   try {
     console.log('[Claude] Iniciando fallback após falha do OpenAI');
-    const claudeRaw = await claudeService.extractATSDataClaude(prompt);
+    const claudeRaw = await requestClaude(prompt, estimatedTokens);
     console.log('[Claude] Resposta recebida com sucesso (fallback)');
 
     let text = claudeRaw.trim();
@@ -371,6 +444,9 @@ exports.extractATSData = async (jobsText, resumeText) => {
     }
   } catch (errClaude) {
     console.error('[Claude] Fallback também falhou:', errClaude.message);
+    if (errClaude.rateLimited) throw rateLimitedError(errClaude.waitTime);
     throw new Error(`Ambos os serviços falharam. OpenAI: Rate limit. Claude: ${errClaude.message}`);
   }
-};
+}
+
+exports.PROMPT_VERSION = PROMPT_VERSION;
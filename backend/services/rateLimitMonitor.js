@@ -1,6 +1,16 @@
+const sharedStore = require('../utils/sharedStore');
+
+// Janela dos limites dos provedores (por minuto)
+const BUDGET_WINDOW_MS = 60 * 1000;
+
 // Monitor de Rate Limits para OpenAI e Claude
+// Limites lidos dos headers ficam no processo; a admissão (admit) usa token buckets
+// no sharedStore, valendo para todos os workers/réplicas
 class RateLimitMonitor {
-    constructor() {
+    constructor(options = {}) {
+        this.store = options.store || sharedStore;
+        this.budgetRatio = options.budgetRatio || 0.9;
+
         this.openaiLimits = {
             requests: { used: 0, limit: 3000, resetTime: 0 }, // Por minuto
             tokens: { used: 0, limit: 150000, resetTime: 0 }   // Por minuto
@@ -10,6 +20,11 @@ class RateLimitMonitor {
             requests: { used: 0, limit: 1000, resetTime: 0 }, // Por minuto
             tokens: { used: 0, limit: 100000, resetTime: 0 }  // Por minuto
         };
+
+        // Respostas servidas pelo cache de LLM não consomem orçamento dos provedores
+        this.cacheUsage = { hits: 0, coalesced: 0, requestsSaved: 0, tokensSaved: 0 };
+
+        this.admission = { admitted: 0, rejected: 0, storeErrors: 0, claude: { admitted: 0, rejected: 0 } };
     }
 
     // Atualizar limites do OpenAI baseado nos headers da resposta
@@ -69,6 +84,104 @@ class RateLimitMonitor {
         this.openaiLimits.tokens.used += tokensUsed;
     }
 
+    recordClaudeUsage(tokensUsed = 0) {
+        this.claudeLimits.requests.used += 1;
+        this.claudeLimits.tokens.used += tokensUsed;
+    }
+
+    // Registrar resposta servida pelo cache (ou por requisição idêntica em andamento)
+    recordCacheHit(tokensSaved = 0, source = 'cache') {
+        if (source === 'coalesced') {
+            this.cacheUsage.coalesced += 1;
+        } else {
+            this.cacheUsage.hits += 1;
+        }
+        this.cacheUsage.requestsSaved += 1;
+        this.cacheUsage.tokensSaved += tokensSaved;
+    }
+
+    // Baldes globais de requisições e tokens de um provedor (90% do limite por minuto)
+    buckets(service, limits, estimatedTokens) {
+        const requests = limits.requests.limit * this.budgetRatio;
+        const tokens = limits.tokens.limit * this.budgetRatio;
+        return [
+            { key: `llm:${service}:requests`, capacity: requests, refillPerMs: requests / BUDGET_WINDOW_MS, cost: 1 },
+            { key: `llm:${service}:tokens`, capacity: tokens, refillPerMs: tokens / BUDGET_WINDOW_MS, cost: estimatedTokens }
+        ];
+    }
+
+    /**
+     * Admissão global: reserva requisição + tokens no orçamento compartilhado
+     * Mesma resposta de getRecommendedService; se o store falhar, decide localmente
+     */
+    async admit(estimatedTokens = 10000) {
+        // Headers do provedor indicam limite próximo: nem tenta reservar
+        const local = this.getRecommendedService(estimatedTokens);
+        if (local.service !== 'openai') {
+            return local;
+        }
+
+        let reservation;
+        try {
+            reservation = await this.store.take(this.buckets('openai', this.openaiLimits, estimatedTokens));
+        } catch (error) {
+            this.admission.storeErrors += 1;
+            console.error('[Rate Monitor] Erro no orçamento compartilhado, decidindo localmente:', error.message);
+            return local;
+        }
+
+        if (reservation.allowed) {
+            this.admission.admitted += 1;
+            return {
+                service: 'openai',
+                reason: 'OpenAI disponível',
+                waitTime: 0
+            };
+        }
+
+        this.admission.rejected += 1;
+        const waitTime = Number.isFinite(reservation.retryAfterMs) ? reservation.retryAfterMs : BUDGET_WINDOW_MS;
+
+        return {
+            service: 'claude',
+            reason: `OpenAI rate limited globalmente (aguardar ${Math.round(waitTime / 1000)}s)`,
+            waitTime
+        };
+    }
+
+    /**
+     * Reserva no orçamento global do Claude (escolha estratégica e fallback do OpenAI)
+     * Se o store falhar, libera: o Claude ainda responde 429 se estiver no limite
+     * @returns {Promise<{ allowed: boolean, waitTime: number }>}
+     */
+    async admitClaude(estimatedTokens = 10000) {
+        let reservation;
+        try {
+            reservation = await this.store.take(this.buckets('claude', this.claudeLimits, estimatedTokens));
+        } catch (error) {
+            this.admission.storeErrors += 1;
+            console.error('[Rate Monitor] Erro no orçamento compartilhado do Claude, liberando:', error.message);
+            return { allowed: true, waitTime: 0 };
+        }
+
+        if (reservation.allowed) {
+            this.admission.claude.admitted += 1;
+            return { allowed: true, waitTime: 0 };
+        }
+
+        this.admission.claude.rejected += 1;
+        return {
+            allowed: false,
+            waitTime: Number.isFinite(reservation.retryAfterMs) ? reservation.retryAfterMs : BUDGET_WINDOW_MS
+        };
+    }
+
+    // Restaura os baldes globais (endpoint de debug)
+    async resetBudgets() {
+        const keys = ['openai', 'claude'].flatMap(service => [`llm:${service}:requests`, `llm:${service}:tokens`]);
+        await Promise.all(keys.map(key => this.store.reset(key)));
+    }
+
     // Log dos limites atuais
     logLimits(service) {
         const limits = service === 'OpenAI' ? this.openaiLimits : this.claudeLimits;
@@ -114,7 +227,9 @@ class RateLimitMonitor {
                 tokensUsage: `${this.claudeLimits.tokens.used}/${this.claudeLimits.tokens.limit}`,
                 requestsPercentage: Math.round((this.claudeLimits.requests.used / this.claudeLimits.requests.limit) * 100),
                 tokensPercentage: Math.round((this.claudeLimits.tokens.used / this.claudeLimits.tokens.limit) * 100)
-            }
+            },
+            cache: { ...this.cacheUsage },
+            admission: { backend: this.store.name, ...this.admission, claude: { ...this.admission.claude } }
         };
     }
 }
@@ -122,4 +237,5 @@ class RateLimitMonitor {
 // Instância singleton
 const rateLimitMonitor = new RateLimitMonitor();
 
-module.exports = rateLimitMonitor; 
\ No newline at end of file
+module.exports = rateLimitMonitor;
+module.exports.RateLimitMonitor = RateLimitMonitor;
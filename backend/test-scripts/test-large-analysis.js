@@ -10,7 +10,7 @@
  */
 
 require('dotenv').config();
-const openaiService = require('./services/openaiService');
+const openaiService = require('../services/openaiService');
 
 // Cores para output no terminal
 const colors = {
@@ -531,4 +531,4 @@ if (require.main === module) {
     });
 }
 
-module.exports = { testLargeAnalysis }; 
\ No newline at end of file
+module.exports = { testLargeAnalysis, largeCVText, sevenJobsText }; 
\ No newline at end of file
@@ -0,0 +1,97 @@
+const crypto = require('crypto');
+const { Op } = require('sequelize');
+
+/**
+ * Modelo AnalysisJob em memória para testes da fila
+ * Implementa apenas o subconjunto de consultas usado por services/analysisQueue
+ * (igualdade, Op.in, Op.lt, Op.or e update condicional com contagem de linhas)
+ */
+
+function matches(row, where = {}) {
+    if (where[Op.or] && !where[Op.or].some(condition => matches(row, condition))) {
+        return false;
+    }
+
+    return Object.keys(where).every(field => {
+        const expected = where[field];
+        const value = row[field];
+        if (expected && typeof expected === 'object' && !(expected instanceof Date)) {
+            if (expected[Op.in]) return expected[Op.in].includes(value);
+            if (expected[Op.lt]) return value < expected[Op.lt];
+            return false;
+        }
+        return value === expected;
+    });
+}
+
+function createFakeAnalysisJobModel() {
+    const rows = new Map();
+
+    const defaults = () => ({
+        status: 'queued',
+        priority: 0,
+        stage: null,
+        progress: 0,
+        result: null,
+        error: null,
+        attempts: 0,
+        creditCharged: false,
+        analysisResultId: null,
+        startedAt: null,
+        finishedAt: null
+    });
+
+    const clone = row => JSON.parse(JSON.stringify(row));
+
+    function applyValues(row, values) {
+        Object.keys(values).forEach(field => {
+            // sequelize.literal('attempts + 1') no sequelize-mock retorna a própria string
+            row[field] = values[field] === 'attempts + 1' ? row.attempts + 1 : values[field];
+        });
+        row.updatedAt = new Date();
+    }
+
+    function instance(row) {
+        const job = { ...clone(row), createdAt: row.createdAt, updatedAt: row.updatedAt };
+        job.update = async (values) => {
+            applyValues(rows.get(job.id), values);
+            Object.assign(job, values);
+            return job;
+        };
+        job.reload = async () => {
+            Object.assign(job, clone(rows.get(job.id)));
+            return job;
+        };
+        return job;
+    }
+
+    const model = {
+        rows,
+        toPublicJSON: (job) => ({ id: job.id, status: job.status, stage: job.stage, progress: job.progress, result: job.result }),
+        create: async (values) => {
+            const now = new Date();
+            const row = { id: crypto.randomUUID(), ...defaults(), ...values, createdAt: now, updatedAt: now };
+            rows.set(row.id, row);
+            return instance(row);
+        },
+        findByPk: async (id) => (rows.has(id) ? instance(rows.get(id)) : null),
+        findOne: async ({ where }) => {
+            const row = [...rows.values()].find(candidate => matches(candidate, where));
+            return row ? instance(row) : null;
+        },
+        findAll: async ({ where }) => [...rows.values()]
+            .filter(row => matches(row, where))
+            .sort((a, b) => b.priority - a.priority || a.createdAt - b.createdAt)
+            .map(instance),
+        count: async ({ where }) => [...rows.values()].filter(row => matches(row, where)).length,
+        update: async (values, { where }) => {
+            const affected = [...rows.values()].filter(row => matches(row, where));
+            affected.forEach(row => applyValues(row, values));
+            return [affected.length];
+        }
+    };
+
+    return model;
+}
+
+module.exports = createFakeAnalysisJobModel;
@@ -0,0 +1,195 @@
+const { Writable } = require('stream');
+const { finished } = require('stream/promises');
+const { Op, UniqueConstraintError } = require('sequelize');
+
+// Lotes pequenos para exercitar a paginação por keyset
+process.env.EXPORT_BATCH_SIZE = '2';
+
+jest.mock('../../../models/giftCodeUsage', () => ({}));
+jest.mock('../../../services/giftCodeCounters', () => ({}));
+
+const adminController = require('../../../controllers/adminController');
+const GiftCode = require('../../../models/giftCode');
+const GiftCodeUsage = require('../../../models/giftCodeUsage');
+const giftCodeCounters = require('../../../services/giftCodeCounters');
+const { mockRequest, mockResponse, mockAdmin } = require('../../helpers/testHelpers');
+
+// Resposta gravável real com buffer pequeno (força espera por 'drain')
+function streamResponse() {
+    const chunks = [];
+    const res = new Writable({
+        highWaterMark: 16,
+        write(chunk, encoding, callback) {
+            chunks.push(chunk.toString());
+            setImmediate(callback);
+        }
+    });
+    res.headers = {};
+    res.headersSent = false;
+    res.setHeader = (name, value) => { res.headers[name] = value; };
+    res.status = jest.fn(() => res);
+    res.json = jest.fn(() => res);
+    res.body = () => chunks.join('');
+    return res;
+}
+
+const codes = [
+    { id: 3, code: 'BULKAAA', isActive: 1, usedCount: 0, maxUses: 1, expiresAt: null, createdAt: '2025-01-03T00:00:00.000Z' },
+    { id: 2, code: 'BULKBBB', isActive: 0, usedCount: 1, maxUses: 1, expiresAt: '2025-02-01T00:00:00.000Z', createdAt: '2025-01-02T00:00:00.000Z' },
+    { id: 1, code: 'BULK,CCC', isActive: 1, usedCount: 0, maxUses: 5, expiresAt: null, createdAt: '2025-01-01T00:00:00.000Z' }
+];
+
+// findAll paginado: respeita id < cursor e o limite do lote
+function paginate(rows) {
+    return jest.fn(async ({ where, limit }) => {
+        const cursor = where[Op.and] ? where[Op.and][1].id[Op.lt] : Infinity;
+        return rows.filter(row => row.id < cursor).slice(0, limit);
+    });
+}
+
+describe('AdminController', () => {
+    beforeEach(() => {
+        jest.spyOn(console, 'error').mockImplementation();
+        jest.spyOn(console, 'warn').mockImplementation();
+    });
+
+    describe('exportCodes', () => {
+        it('deve enviar o CSV em lotes sem carregar todos os códigos', async () => {
+            GiftCode.findAll = paginate(codes);
+            const res = streamResponse();
+
+            await adminController.exportCodes(mockRequest({}, {}, {}, {}), res);
+            await finished(res);
+
+            expect(GiftCode.findAll).toHaveBeenCalledTimes(2);
+            expect(GiftCode.findAll.mock.calls[0][0]).toMatchObject({ limit: 2, order: [['id', 'DESC']] });
+            expect(res.headers['Content-Type']).toBe('text/csv');
+
+            const lines = res.body().trim().split('\n');
+            expect(lines).toEqual([
+                'Código,Status,Usos,Máximo,Expira Em,Criado Em',
+                'BULKAAA,Ativo,0,1,Nunca,2025-01-03T00:00:00.000Z',
+                'BULKBBB,Inativo,1,1,2025-02-01T00:00:00.000Z,2025-01-02T00:00:00.000Z',
+                '"BULK,CCC",Ativo,0,5,Nunca,2025-01-01T00:00:00.000Z'
+            ]);
+        });
+
+        it('deve exportar em JSON com ?format=json', async () => {
+            GiftCode.findAll = paginate(codes);
+            const res = streamResponse();
+
+            await adminController.exportCodes(mockRequest({}, {}, {}, { format: 'json' }), res);
+            await finished(res);
+
+            const exported = JSON.parse(res.body());
+            expect(exported.map(code => code.code)).toEqual(['BULKAAA', 'BULKBBB', 'BULK,CCC']);
+            expect(exported[1].isActive).toBe(false);
+        });
+
+        it('deve retornar 500 se a consulta falhar antes do envio', async () => {
+            GiftCode.findAll = jest.fn().mockRejectedValue(new Error('db offline'));
+            const res = mockResponse();
+            res.setHeader = jest.fn();
+            res.write = jest.fn(() => true);
+
+            await adminController.exportCodes(mockRequest(), res);
+
+            expect(res.status).toHaveBeenCalledWith(500);
+            expect(res.json).toHaveBeenCalledWith({ error: 'Erro ao exportar códigos.' });
+        });
+    });
+
+    describe('getUsageReport', () => {
+        it('deve calcular as estatísticas no banco e enviar os usos em lotes', async () => {
+            const usages = [3, 2, 1].map(id => ({ id, userId: id, giftCodeId: 1, giftCode: { code: 'GIFT' } }));
+            const findUsages = paginate(usages);
+            GiftCodeUsage.findAll = jest.fn(options => (options.raw
+                ? Promise.resolve([{ totalUsages: '3', uniqueUsers: '3', uniqueCodes: '1' }])
+                : findUsages(options)));
+            const res = streamResponse();
+
+            await adminController.getUsageReport(mockRequest({}, {}, {}, { codeId: '1' }), res);
+            await finished(res);
+
+            const report = JSON.parse(res.body());
+            expect(report.stats).toEqual({ totalUsages: 3, uniqueUsers: 3, uniqueCodes: 1 });
+            expect(report.usages.map(usage => usage.id)).toEqual([3, 2, 1]);
+            expect(findUsages.mock.calls[0][0].where).toEqual({ giftCodeId: '1' });
+        });
+    });
+
+    describe('createBulkCodes', () => {
+        let inserted;
+
+        beforeEach(() => {
+            inserted = [];
+            GiftCode.bulkCreate = jest.fn(async rows => { inserted.push(...rows); });
+            GiftCode.findAll = jest.fn(async ({ attributes, where }) => (attributes
+                ? [] // nenhum código existente
+                : where.code[Op.in].map(code => ({ code }))));
+        });
+
+        it('deve verificar unicidade uma vez por lote e inserir com bulkCreate', async () => {
+            const res = mockResponse();
+            await adminController.createBulkCodes(mockRequest({ prefix: 'PROMO', quantity: 25 }, {}, {}, {}, mockAdmin), res);
+
+            expect(res.status).toHaveBeenCalledWith(201);
+            expect(GiftCode.bulkCreate).toHaveBeenCalledTimes(1);
+            expect(GiftCode.findAll.mock.calls.filter(([options]) => options.attributes)).toHaveLength(1);
+            expect(new Set(inserted.map(row => row.code)).size).toBe(25);
+            expect(inserted.every(row => row.code.startsWith('PROMO') && row.createdById === mockAdmin.id)).toBe(true);
+            expect(res.json.mock.calls[0][0].codes).toHaveLength(25);
+        });
+
+        it('deve descartar candidatos que já existem no banco', async () => {
+            let checks = 0;
+            GiftCode.findAll = jest.fn(async ({ attributes, where }) => {
+                if (!attributes) return where.code[Op.in].map(code => ({ code }));
+                // Primeira verificação: um candidato já existe
+                return checks++ === 0 ? [{ code: where.code[Op.in][0] }] : [];
+            });
+            const res = mockResponse();
+
+            await adminController.createBulkCodes(mockRequest({ quantity: 5 }), res);
+
+            const taken = GiftCode.findAll.mock.calls[0][0].where.code[Op.in][0];
+            expect(res.status).toHaveBeenCalledWith(201);
+            expect(GiftCode.bulkCreate.mock.calls[0][0]).toHaveLength(5);
+            expect(GiftCode.bulkCreate.mock.calls[0][0].map(row => row.code)).not.toContain(taken);
+            expect(GiftCode.findAll.mock.calls[1][0].where.code[Op.in]).toHaveLength(1);
+        });
+
+        it('deve gerar o lote novamente em caso de conflito de unicidade', async () => {
+            GiftCode.bulkCreate
+                .mockRejectedValueOnce(new UniqueConstraintError({}))
+                .mockImplementation(async rows => { inserted.push(...rows); });
+            const res = mockResponse();
+
+            await adminController.createBulkCodes(mockRequest({ quantity: 3 }), res);
+
+            expect(GiftCode.bulkCreate).toHaveBeenCalledTimes(2);
+            expect(res.status).toHaveBeenCalledWith(201);
+            expect(inserted).toHaveLength(3);
+        });
+
+        it('deve rejeitar quantidade inválida', async () => {
+            const res = mockResponse();
+            await adminController.createBulkCodes(mockRequest({ quantity: 0 }), res);
+
+            expect(res.status).toHaveBeenCalledWith(400);
+            expect(GiftCode.bulkCreate).not.toHaveBeenCalled();
+        });
+    });
+
+    describe('getDashboard', () => {
+        it('deve retornar os contadores mantidos incrementalmente', async () => {
+            const stats = { totalCodes: 10, activeCodes: 7, exhaustedCodes: 2, usagesToday: 4, expiringCodes: 1 };
+            giftCodeCounters.getDashboard = jest.fn().mockResolvedValue(stats);
+            const res = mockResponse();
+
+            await adminController.getDashboard(mockRequest(), res);
+
+            expect(res.json).toHaveBeenCalledWith(stats);
+        });
+    });
+});
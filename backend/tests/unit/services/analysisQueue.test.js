@@ -0,0 +1,266 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+// Estado durável dos jobs em memória (mesmo padrão dos demais modelos mockados)
+jest.mock('../../../models/AnalysisJob', () => require('../../helpers/fakeAnalysisJobModel')());
+jest.mock('../../../services/analysisPipeline', () => ({
+  runAnalysis: jest.fn(),
+  saveAnalysis: jest.fn()
+}));
+
+const User = require('../../../models/user');
+const AnalysisJob = require('../../../models/AnalysisJob');
+const analysisPipeline = require('../../../services/analysisPipeline');
+const analysisProgress = require('../../../utils/analysisProgress');
+const { AnalysisQueue } = require('../../../services/analysisQueue');
+
+const JOB_LINKS = ['https://a.com/1', 'https://a.com/2', 'https://a.com/3'];
+
+function waitIdle(queue) {
+  return new Promise(resolve => queue.once('idle', resolve));
+}
+
+describe('Analysis Queue', () => {
+  let tmpDir;
+  let credits;
+
+  beforeEach(() => {
+    AnalysisJob.rows.clear();
+    tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'analysis-queue-'));
+
+    credits = 3;
+    // Reserva condicional (credits > 0) no enfileiramento e devolução em falhas
+    User.update.mockImplementation(async () => {
+      if (credits <= 0) return [0];
+      credits--;
+      return [1];
+    });
+    User.increment = jest.fn(async () => { credits++; });
+    User.decrement = jest.fn(async () => { credits--; });
+    User.findByPk.mockImplementation(async () => ({ id: 1, credits }));
+
+    analysisPipeline.runAnalysis.mockImplementation(async () => {
+      ['extract', 'scrape', 'llm', 'verify'].forEach(stage => analysisProgress.stage(stage));
+      return { result: { conclusion: 'ok' }, resumeText: 'cv' };
+    });
+    analysisPipeline.saveAnalysis.mockImplementation(async () => {
+      analysisProgress.stage('save');
+      return { id: '00000000-0000-4000-8000-000000000001' };
+    });
+  });
+
+  afterEach(() => {
+    fs.rmSync(tmpDir, { recursive: true, force: true });
+  });
+
+  function upload(name = 'cv.pdf') {
+    const file = path.join(tmpDir, name);
+    fs.writeFileSync(file, 'pdf');
+    return file;
+  }
+
+  it('deve enfileirar, emitir todas as etapas e concluir debitando um crédito', async () => {
+    const queue = new AnalysisQueue({ concurrency: 1 });
+    const events = [];
+    queue.on('job', event => events.push(event));
+
+    const resumePath = upload();
+    const job = await queue.enqueue({ userId: 1, resumePath, fileName: 'cv.pdf', jobLinks: JOB_LINKS });
+    expect(job.status).toBe('queued');
+
+    await waitIdle(queue);
+
+    const stored = await AnalysisJob.findByPk(job.id);
+    expect(stored.status).toBe('completed');
+    expect(stored.progress).toBe(100);
+    expect(stored.creditCharged).toBe(true);
+    expect(stored.result).toMatchObject({ conclusion: 'ok', credits_remaining: 2 });
+    expect(credits).toBe(2);
+    expect(User.decrement).not.toHaveBeenCalled();
+    expect(fs.existsSync(resumePath)).toBe(false);
+
+    const stages = events.filter(event => event.status === 'running').map(event => event.stage);
+    expect(stages).toEqual(expect.arrayContaining(['extract', 'scrape', 'llm', 'verify', 'save']));
+    expect(events[events.length - 1].status).toBe('completed');
+  });
+
+  it('deve respeitar a concorrência e a prioridade', async () => {
+    const queue = new AnalysisQueue({ concurrency: 1 });
+    const order = [];
+    analysisPipeline.runAnalysis.mockImplementation(async ({ resumePath }) => {
+      order.push(path.basename(resumePath));
+      return { result: {}, resumeText: '' };
+    });
+
+    await queue.enqueue({ userId: 1, resumePath: upload('primeiro.pdf'), jobLinks: JOB_LINKS });
+    await queue.enqueue({ userId: 1, resumePath: upload('baixa.pdf'), jobLinks: JOB_LINKS, priority: 0 });
+    await queue.enqueue({ userId: 1, resumePath: upload('alta.pdf'), jobLinks: JOB_LINKS, priority: 5 });
+    expect(queue.getStats().running).toBeLessThanOrEqual(1);
+
+    await waitIdle(queue);
+    expect(order).toEqual(['primeiro.pdf', 'alta.pdf', 'baixa.pdf']);
+  });
+
+  it('não deve debitar crédito quando a análise falha', async () => {
+    const queue = new AnalysisQueue();
+    analysisPipeline.runAnalysis.mockRejectedValue(new Error('LLM indisponível'));
+
+    const job = await queue.enqueue({ userId: 1, resumePath: upload(), jobLinks: JOB_LINKS });
+    await waitIdle(queue);
+
+    const stored = await AnalysisJob.findByPk(job.id);
+    expect(stored.status).toBe('failed');
+    expect(stored.error).toBe('LLM indisponível');
+    expect(stored.creditCharged).toBe(false);
+    expect(credits).toBe(3);
+    expect(User.decrement).not.toHaveBeenCalled();
+
+    await queue.refund(stored);
+    expect(User.increment).toHaveBeenCalledTimes(1);
+  });
+
+  it('deve debitar uma única vez mesmo se a conclusão for repetida', async () => {
+    const queue = new AnalysisQueue();
+    const job = await queue.enqueue({ userId: 1, resumePath: upload(), jobLinks: JOB_LINKS });
+    await waitIdle(queue);
+
+    await queue.complete(await AnalysisJob.findByPk(job.id));
+    expect(credits).toBe(2);
+    expect(User.decrement).not.toHaveBeenCalled();
+  });
+
+  it('deve aceitar apenas um de dois enfileiramentos simultâneos com um crédito', async () => {
+    credits = 1;
+    const queue = new AnalysisQueue();
+    queue.running.set('ocupado', null); // mantém os jobs na fila
+
+    const outcomes = await Promise.allSettled([
+      queue.enqueue({ userId: 1, resumePath: upload('a.pdf'), jobLinks: JOB_LINKS }),
+      queue.enqueue({ userId: 1, resumePath: upload('b.pdf'), jobLinks: JOB_LINKS })
+    ]);
+
+    expect(outcomes.map(outcome => outcome.status).sort()).toEqual(['fulfilled', 'rejected']);
+    expect(outcomes.find(outcome => outcome.status === 'rejected').reason).toMatchObject({ statusCode: 403 });
+    expect(AnalysisJob.rows.size).toBe(1);
+    expect(credits).toBe(0);
+  });
+
+  it('deve devolver a reserva se o job não puder ser criado', async () => {
+    const queue = new AnalysisQueue();
+    jest.spyOn(AnalysisJob, 'create').mockRejectedValueOnce(new Error('db offline'));
+
+    await expect(queue.enqueue({ userId: 1, resumePath: upload(), jobLinks: JOB_LINKS })).rejects.toThrow('db offline');
+    expect(credits).toBe(3);
+  });
+
+  it('deve manter o job recuperável quando a conclusão falha depois de salvar', async () => {
+    const queue = new AnalysisQueue({ maxAttempts: 1 });
+    jest.spyOn(queue, 'complete').mockRejectedValueOnce(new Error('db offline'));
+
+    const idle = waitIdle(queue);
+    const job = await queue.enqueue({ userId: 1, resumePath: upload(), fileName: 'cv.pdf', jobLinks: JOB_LINKS });
+    await idle;
+
+    const stored = await AnalysisJob.findByPk(job.id);
+    expect(stored.status).toBe('running');
+    expect(stored.analysisResultId).toBe('00000000-0000-4000-8000-000000000001');
+
+    AnalysisJob.rows.get(job.id).updatedAt = new Date(Date.now() - 10 * 60 * 1000);
+    const recovered = waitIdle(queue);
+    expect(await queue.recover()).toBe(1);
+    await recovered;
+
+    expect((await AnalysisJob.findByPk(job.id)).status).toBe('completed');
+    expect(analysisPipeline.runAnalysis).toHaveBeenCalledTimes(1);
+    expect(credits).toBe(2);
+  });
+
+  it('deve parar de despachar a fila no encerramento e aguardar só os jobs em execução', async () => {
+    const queue = new AnalysisQueue({ concurrency: 1 });
+    const running = await queue.enqueue({ userId: 1, resumePath: upload('a.pdf'), fileName: 'a.pdf', jobLinks: JOB_LINKS });
+    const waiting = await queue.enqueue({ userId: 1, resumePath: upload('b.pdf'), fileName: 'b.pdf', jobLinks: JOB_LINKS });
+    const onStop = jest.fn();
+    queue.on('stop', onStop);
+
+    const idle = waitIdle(queue);
+    queue.stop();
+    await idle;
+
+    expect(onStop).toHaveBeenCalledTimes(1);
+    expect((await AnalysisJob.findByPk(running.id)).status).toBe('completed');
+    expect((await AnalysisJob.findByPk(waiting.id)).status).toBe('queued');
+    expect(queue.getStats()).toMatchObject({ running: 0, queued: 0 });
+  });
+
+  it('deve recusar novos jobs quando a fila estiver cheia', async () => {
+    const queue = new AnalysisQueue({ concurrency: 1, maxQueued: 1 });
+    queue.running.set('ocupado', null); // simula execução em andamento
+
+    await queue.enqueue({ userId: 1, resumePath: upload('a.pdf'), jobLinks: JOB_LINKS });
+    await expect(queue.enqueue({ userId: 1, resumePath: upload('b.pdf'), jobLinks: JOB_LINKS }))
+      .rejects.toMatchObject({ statusCode: 503 });
+  });
+
+  describe('recover', () => {
+    it('deve retomar jobs órfãos sem repetir a análise já salva', async () => {
+      const staleDate = new Date(Date.now() - 10 * 60 * 1000);
+      const orphan = await AnalysisJob.create({
+        userId: 1, resumePath: upload(), jobUrls: JOB_LINKS, status: 'running', attempts: 1
+      });
+      const saved = await AnalysisJob.create({
+        userId: 1, resumePath: '/nao/existe.pdf', jobUrls: JOB_LINKS, status: 'running', attempts: 1,
+        analysisResultId: '00000000-0000-4000-8000-000000000002', result: { conclusion: 'salvo' }
+      });
+      AnalysisJob.rows.forEach(row => { row.updatedAt = staleDate; });
+
+      const queue = new AnalysisQueue({ maxAttempts: 3 });
+      const idle = waitIdle(queue);
+      expect(await queue.recover()).toBe(2);
+      await idle;
+
+      expect((await AnalysisJob.findByPk(orphan.id)).status).toBe('completed');
+      expect((await AnalysisJob.findByPk(saved.id)).status).toBe('completed');
+      expect(analysisPipeline.runAnalysis).toHaveBeenCalledTimes(1);
+      expect(User.decrement).toHaveBeenCalledTimes(2);
+    });
+
+    it('não deve retomar job vivo cuja etapa demora mais que staleMs', async () => {
+      let finishLlm;
+      analysisPipeline.runAnalysis.mockImplementation(async () => {
+        analysisProgress.stage('llm');
+        await new Promise(resolve => { finishLlm = resolve; });
+        return { result: { conclusion: 'ok' }, resumeText: 'cv' };
+      });
+
+      const worker = new AnalysisQueue({ staleMs: 200, heartbeatMs: 20 });
+      const job = await worker.enqueue({ userId: 1, resumePath: upload(), fileName: 'cv.pdf', jobLinks: JOB_LINKS });
+      await new Promise(resolve => setTimeout(resolve, 300));
+
+      // Outro processo do cluster procurando órfãos
+      const other = new AnalysisQueue({ staleMs: 200 });
+      expect(await other.recover()).toBe(0);
+      expect((await AnalysisJob.findByPk(job.id)).status).toBe('running');
+
+      const idle = waitIdle(worker);
+      finishLlm();
+      await idle;
+      expect((await AnalysisJob.findByPk(job.id)).status).toBe('completed');
+      expect(analysisPipeline.runAnalysis).toHaveBeenCalledTimes(1);
+    });
+
+    it('deve marcar como falha jobs sem arquivo ou que excederam as tentativas', async () => {
+      const missing = await AnalysisJob.create({ userId: 1, resumePath: '/nao/existe.pdf', jobUrls: JOB_LINKS, creditCharged: true });
+      const exhausted = await AnalysisJob.create({ userId: 1, resumePath: upload(), jobUrls: JOB_LINKS, attempts: 2 });
+
+      const queue = new AnalysisQueue({ maxAttempts: 2 });
+      expect(await queue.recover()).toBe(0);
+
+      expect((await AnalysisJob.findByPk(missing.id)).status).toBe('failed');
+      expect((await AnalysisJob.findByPk(exhausted.id)).status).toBe('failed');
+      // Só o job com crédito reservado recebe devolução
+      expect(User.increment).toHaveBeenCalledTimes(1);
+      expect(credits).toBe(4);
+    });
+  });
+});
@@ -0,0 +1,99 @@
+const {
+  countKeywordOccurrences,
+  filterPresentKeywords,
+  keywordInResume
+} = require('../../../services/atsKeywordVerifier');
+const { compileKeywordMatcher } = require('../../../services/keywordMatcher');
+const legacy = require('../../helpers/legacyKeywordVerifier');
+const { largeCVText, sevenJobsText } = require('../../../test-scripts/test-large-analysis');
+
+// Palavras-chave no formato extraído pelo LLM (simples, compostas, idiomas, variações)
+const SAMPLE_KEYWORDS = [
+  'JavaScript', 'React', 'Node.js', 'Python', 'TypeScript', 'APIs', 'API RESTful',
+  'GraphQL', 'Docker', 'Kubernetes', 'AWS', 'microserviços', 'arquitetura de software',
+  'arquitetura de sistemas', 'metodologias ágeis', 'Scrum', 'Kanban', 'liderança técnica',
+  'code reviews', 'testes automatizados', 'Jest', 'Cypress', 'CI/CD', 'DevOps',
+  'bancos de dados', 'banco de dados', 'PostgreSQL', 'MongoDB', 'Redis', 'inglês',
+  'inglês avançado', 'inglês intermediário', 'espanhol básico', 'comunicação',
+  'comunicação efetiva', 'gestão de equipes', 'gestão do backlog', 'mentoria',
+  'experiência com React', 'desenvolvimento de aplicações web', 'Product Owner',
+  'design patterns', 'pair programming', 'performance', 'otimização de performance',
+  'cloud', 'segurança', 'LGPD', 'Git', 'HTML5', 'CSS3', 'Next.js', 'C++', 'C#',
+  'trabalho em equipe', 'trabalho no time', 'relacionado ao produto', 'integração com APIs',
+  'as APIs', 'a arquitetura', 'dados', 'análise de dados', 'machine learning'
+];
+
+function seededRandom(seed) {
+  let state = seed;
+  return () => {
+    state = (state * 1103515245 + 12345) % 2147483648;
+    return state / 2147483648;
+  };
+}
+
+describe('ATS Keyword Verifier', () => {
+  describe('countKeywordOccurrences', () => {
+    it('deve produzir contagens idênticas à implementação por regex nas vagas de exemplo', () => {
+      expect(countKeywordOccurrences(SAMPLE_KEYWORDS, sevenJobsText))
+        .toEqual(legacy.countKeywordOccurrences(SAMPLE_KEYWORDS, sevenJobsText));
+    });
+
+    it('deve contar expressões compostas com palavras intermediárias e sem sobreposição', () => {
+      const text = 'Gestão ágil do backlog. Gestão do produto e do backlog; backlog gestão backlog';
+      const keywords = ['gestão de backlog', 'gestão do produto'];
+
+      expect(countKeywordOccurrences(keywords, text))
+        .toEqual(legacy.countKeywordOccurrences(keywords, text));
+    });
+
+    it('deve preservar casos de borda (termos vazios, pontuação e espaços)', () => {
+      const text = 'C++ e C# com   Node.js\n\tinglês avançado, React-Native e  APIs';
+      const keywords = ['++', 'C++', ' react', 'node.js', 'inglês\tavançado', 'react native', 'apis'];
+
+      expect(countKeywordOccurrences(keywords, text))
+        .toEqual(legacy.countKeywordOccurrences(keywords, text));
+    });
+
+    it('deve manter equivalência em textos e palavras-chave aleatórios', () => {
+      const random = seededRandom(42);
+      const vocabulary = ['dados', 'dado', 'gestao', 'gestão', 'de', 'do', 'backlog', 'backlogs',
+        'analise', 'análise', 'sistemas', 'sistema', 'em', 'na', 'com', 'a', 'o', 'produto'];
+      const pick = () => vocabulary[Math.floor(random() * vocabulary.length)];
+
+      for (let round = 0; round < 50; round++) {
+        const words = Array.from({ length: 200 }, pick);
+        const text = words.map(word => word + (random() < 0.1 ? '.\n' : ' ')).join('');
+        const keywords = Array.from({ length: 10 }, () =>
+          Array.from({ length: 1 + Math.floor(random() * 3) }, pick).join(' '));
+
+        expect(countKeywordOccurrences(keywords, text))
+          .toEqual(legacy.countKeywordOccurrences(keywords, text));
+      }
+    });
+  });
+
+  describe('filterPresentKeywords', () => {
+    it('deve produzir presentes idênticos à implementação por regex no currículo de exemplo', () => {
+      expect(filterPresentKeywords(SAMPLE_KEYWORDS, largeCVText))
+        .toEqual(legacy.filterPresentKeywords(SAMPLE_KEYWORDS, largeCVText));
+    });
+
+    it('deve respeitar o nível de idioma exigido', () => {
+      const resume = 'Idiomas: Inglês intermediário\nEspanhol fluente';
+
+      expect(keywordInResume('inglês avançado', resume)).toBe(false);
+      expect(keywordInResume('inglês básico', resume)).toBe(true);
+      expect(keywordInResume('espanhol avançado', resume)).toBe(true);
+      ['inglês avançado', 'inglês básico', 'espanhol avançado', 'francês'].forEach(keyword => {
+        expect(keywordInResume(keyword, resume)).toBe(legacy.keywordInResume(keyword, resume));
+      });
+    });
+  });
+
+  describe('compileKeywordMatcher', () => {
+    it('deve reutilizar o automato compilado para o mesmo conjunto de palavras-chave', () => {
+      expect(compileKeywordMatcher(['React', 'Node.js']))
+        .toBe(compileKeywordMatcher(['React', 'Node.js']));
+    });
+  });
+});
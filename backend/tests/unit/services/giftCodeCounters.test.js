@@ -0,0 +1,117 @@
+// Tabela de contadores em memória (UPDATE value = value + n via literal do sequelize-mock)
+jest.mock('../../../models/giftCodeCounter', () => {
+  const { Op } = require('sequelize');
+  const rows = new Map();
+  const names = where => (where.name[Op.in] ? where.name[Op.in] : [where.name]);
+
+  return {
+    rows,
+    update: async ({ value }, { where }) => {
+      if (!rows.has(where.name)) return [0];
+      rows.set(where.name, rows.get(where.name) + parseInt(String(value).replace('value + ', '')));
+      return [1];
+    },
+    create: async ({ name, value }) => rows.set(name, value),
+    upsert: async ({ name, value }) => rows.set(name, value),
+    destroy: async () => 0,
+    findAll: async ({ where }) => names(where)
+      .filter(name => rows.has(name))
+      .map(name => ({ name, value: rows.get(name) }))
+  };
+});
+jest.mock('../../../models/giftCodeUsage', () => ({}));
+
+const GiftCode = require('../../../models/giftCode');
+const GiftCodeUsage = require('../../../models/giftCodeUsage');
+const GiftCodeCounter = require('../../../models/giftCodeCounter');
+const { GiftCodeCounters, dayKey } = require('../../../services/giftCodeCounters');
+
+function instance(values, previous = {}) {
+  return { ...values, get: () => values, previous: () => previous };
+}
+
+function hook(model, name) {
+  return model.addHook.mock.calls.find(call => call[0] === name)[2];
+}
+
+describe('Gift Code Counters', () => {
+  let counters;
+
+  beforeEach(() => {
+    GiftCodeCounter.rows.clear();
+    GiftCode.addHook = jest.fn();
+    GiftCode.count = jest.fn().mockResolvedValue(0);
+    GiftCodeUsage.addHook = jest.fn();
+    GiftCodeUsage.count = jest.fn().mockResolvedValue(0);
+
+    counters = new GiftCodeCounters({ expiringTtlMs: 60 * 1000 });
+  });
+
+  it('deve reconstruir os contadores a partir das tabelas na primeira leitura', async () => {
+    GiftCode.count
+      .mockResolvedValueOnce(10) // total
+      .mockResolvedValueOnce(7) // ativos
+      .mockResolvedValueOnce(2) // esgotados
+      .mockResolvedValueOnce(3); // expirando
+    GiftCodeUsage.count.mockResolvedValueOnce(4);
+
+    const dashboard = await counters.getDashboard();
+
+    expect(dashboard).toEqual({
+      totalCodes: 10,
+      activeCodes: 7,
+      exhaustedCodes: 2,
+      usagesToday: 4,
+      expiringCodes: 3
+    });
+    expect(GiftCodeCounter.rows.get(dayKey())).toBe(4);
+  });
+
+  it('deve manter os contadores pelos hooks sem novas contagens', async () => {
+    await counters.rebuild();
+    counters.attach();
+    GiftCode.count.mockClear();
+
+    await hook(GiftCode, 'afterCreate')(instance({ isActive: true, usedCount: 0, maxUses: 1 }), {});
+    await hook(GiftCode, 'afterBulkCreate')([
+      instance({ isActive: true, usedCount: 0, maxUses: 2 }),
+      instance({ isActive: true, usedCount: 0, maxUses: 2 })
+    ], {});
+    // Código usado pela última vez: passa a esgotado
+    await hook(GiftCode, 'afterUpdate')(instance({ isActive: true, usedCount: 1, maxUses: 1 }, { usedCount: 0 }), {});
+    // Código desativado
+    await hook(GiftCode, 'afterUpdate')(instance({ isActive: false, usedCount: 0, maxUses: 2 }, { isActive: true }), {});
+    await hook(GiftCodeUsage, 'afterCreate')({ createdAt: new Date() }, {});
+
+    const dashboard = await counters.getDashboard();
+
+    expect(dashboard).toMatchObject({
+      totalCodes: 3,
+      activeCodes: 2,
+      exhaustedCodes: 1,
+      usagesToday: 1
+    });
+    // Apenas a contagem de expiração (janela móvel) consulta gift_codes
+    expect(GiftCode.count).toHaveBeenCalledTimes(1);
+  });
+
+  it('deve criar o contador do dia quando ainda não existir', async () => {
+    counters.attach();
+
+    const createdAt = new Date('2025-01-02T12:00:00');
+    await hook(GiftCodeUsage, 'afterCreate')({ createdAt }, {});
+    await hook(GiftCodeUsage, 'afterCreate')({ createdAt }, {});
+
+    expect(GiftCodeCounter.rows.get(dayKey(createdAt))).toBe(2);
+  });
+
+  it('deve manter a contagem de expiração em cache pelo TTL', async () => {
+    await counters.rebuild();
+    GiftCode.count.mockClear();
+
+    await counters.getDashboard();
+    await counters.getDashboard();
+
+    expect(GiftCode.count).toHaveBeenCalledTimes(1);
+  });
+});
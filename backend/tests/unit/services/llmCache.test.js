@@ -0,0 +1,195 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const http = require('http');
+const { LlmCache, buildKey } = require('../../../utils/llmCache');
+
+const ANALYSIS = {
+  job_keywords: ['React', 'Node.js'],
+  found_keywords: ['React'],
+  missing_keywords: ['Node.js'],
+  conclusion: 'Boa aderência'
+};
+
+// Servidor local que responde como as APIs da OpenAI (/openai) e do Claude (/claude)
+function startStubServer() {
+  const state = { openai: 0, claude: 0, openaiStatus: 200, delayMs: 0 };
+
+  const server = http.createServer((req, res) => {
+    let body = '';
+    req.on('data', chunk => { body += chunk; });
+    req.on('end', () => {
+      setTimeout(() => {
+        res.setHeader('Content-Type', 'application/json');
+        if (req.url === '/openai') {
+          state.openai++;
+          if (state.openaiStatus !== 200) {
+            res.statusCode = state.openaiStatus;
+            return res.end(JSON.stringify({ error: { message: 'erro simulado' } }));
+          }
+          return res.end(JSON.stringify({
+            choices: [{ message: { content: '```json\n' + JSON.stringify(ANALYSIS) + '\n```' } }]
+          }));
+        }
+        state.claude++;
+        res.end(JSON.stringify({ content: [{ text: JSON.stringify(ANALYSIS) }] }));
+      }, state.delayMs);
+    });
+  });
+
+  return new Promise(resolve => {
+    server.listen(0, '127.0.0.1', () => resolve({ server, state, port: server.address().port }));
+  });
+}
+
+describe('LLM Cache', () => {
+  let stub;
+  let tmpDir;
+  let openaiService;
+  let rateLimitMonitor;
+  let llmCache;
+
+  beforeAll(async () => {
+    stub = await startStubServer();
+  });
+
+  afterAll(done => {
+    stub.server.close(done);
+  });
+
+  beforeEach(() => {
+    tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'llm-cache-'));
+    stub.state.openai = 0;
+    stub.state.claude = 0;
+    stub.state.openaiStatus = 200;
+    stub.state.delayMs = 0;
+
+    process.env.OPENAI_API_URL = `http://127.0.0.1:${stub.port}/openai`;
+    process.env.CLAUDE_API_URL = `http://127.0.0.1:${stub.port}/claude`;
+    process.env.LLM_CACHE_ENABLED = 'true';
+    process.env.LLM_CACHE_DIR = tmpDir;
+
+    jest.isolateModules(() => {
+      openaiService = require('../../../services/openaiService');
+      rateLimitMonitor = require('../../../services/rateLimitMonitor');
+      llmCache = require('../../../utils/llmCache');
+    });
+  });
+
+  afterEach(() => {
+    delete process.env.OPENAI_API_URL;
+    delete process.env.CLAUDE_API_URL;
+    delete process.env.LLM_CACHE_ENABLED;
+    delete process.env.LLM_CACHE_DIR;
+    fs.rmSync(tmpDir, { recursive: true, force: true });
+  });
+
+  it('deve servir a segunda análise idêntica do cache sem chamar a API', async () => {
+    const first = await openaiService.extractATSData('Vaga React', 'Currículo React');
+    const second = await openaiService.extractATSData('Vaga React', 'Currículo React');
+
+    expect(first).toEqual(ANALYSIS);
+    expect(second).toEqual(ANALYSIS);
+    expect(stub.state.openai).toBe(1);
+    expect(llmCache.getStats()).toMatchObject({ hits: 1, misses: 1, stores: 1 });
+
+    const usage = rateLimitMonitor.getUsageStats();
+    expect(usage.cache.hits).toBe(1);
+    expect(usage.cache.tokensSaved).toBeGreaterThan(0);
+  });
+
+  it('deve ignorar diferenças de espaçamento nas entradas e retornar cópias independentes', async () => {
+    const first = await openaiService.extractATSData('Vaga  React\r\n', 'Currículo React');
+    first.job_keywords.push('alterado');
+    const second = await openaiService.extractATSData('Vaga React', '  Currículo\nReact');
+
+    expect(second).toEqual(ANALYSIS);
+    expect(stub.state.openai).toBe(1);
+  });
+
+  it('deve agrupar requisições idênticas simultâneas em uma única chamada', async () => {
+    stub.state.delayMs = 100;
+
+    const results = await Promise.all([
+      openaiService.extractATSData('Vaga Node', 'Currículo Node'),
+      openaiService.extractATSData('Vaga Node', 'Currículo Node'),
+      openaiService.extractATSData('Vaga Node', 'Currículo Node')
+    ]);
+
+    results.forEach(result => expect(result).toEqual(ANALYSIS));
+    expect(stub.state.openai).toBe(1);
+    expect(llmCache.getStats().coalesced).toBe(2);
+    expect(rateLimitMonitor.getUsageStats().cache.coalesced).toBe(2);
+  });
+
+  it('deve armazenar a resposta do fallback Claude', async () => {
+    stub.state.openaiStatus = 400;
+
+    await openaiService.extractATSData('Vaga Java', 'Currículo Java');
+    const cached = await openaiService.extractATSData('Vaga Java', 'Currículo Java');
+
+    expect(cached).toEqual(ANALYSIS);
+    expect(stub.state.openai).toBe(1);
+    expect(stub.state.claude).toBe(1);
+  });
+
+  it('não deve armazenar falhas', async () => {
+    stub.state.openaiStatus = 400;
+    process.env.CLAUDE_API_URL = 'http://127.0.0.1:1/claude';
+    jest.isolateModules(() => {
+      openaiService = require('../../../services/openaiService');
+      llmCache = require('../../../utils/llmCache');
+    });
+
+    await expect(openaiService.extractATSData('Vaga Go', 'Currículo Go')).rejects.toThrow('Ambos os serviços falharam');
+    expect(llmCache.getStats().stores).toBe(0);
+  });
+
+  describe('LlmCache', () => {
+    it('deve gerar chaves diferentes para modelo, versão do prompt e entradas', () => {
+      const base = { model: 'gpt-4o', promptVersion: 'v1', inputs: ['vaga', 'cv'] };
+
+      expect(buildKey(base)).toBe(buildKey({ ...base, inputs: [' vaga ', 'cv\n'] }));
+      expect(buildKey(base)).not.toBe(buildKey({ ...base, model: 'gpt-4o-mini' }));
+      expect(buildKey(base)).not.toBe(buildKey({ ...base, promptVersion: 'v2' }));
+      expect(buildKey(base)).not.toBe(buildKey({ ...base, inputs: ['vaga', 'cv2'] }));
+      expect(buildKey(base)).not.toBe(buildKey({ ...base, inputs: ['vagacv', ''] }));
+    });
+
+    it('deve persistir entradas em disco entre instâncias', async () => {
+      const compute = jest.fn().mockResolvedValue({ ok: true });
+
+      await new LlmCache({ enabled: true, dir: tmpDir }).getOrCompute('k1', compute);
+      const result = await new LlmCache({ enabled: true, dir: tmpDir }).getOrCompute('k1', compute);
+
+      expect(result).toEqual({ value: { ok: true }, source: 'cache' });
+      expect(compute).toHaveBeenCalledTimes(1);
+    });
+
+    it('deve remover as entradas menos usadas ao exceder o limite de bytes', async () => {
+      const cache = new LlmCache({ enabled: true, dir: tmpDir, maxBytes: 600 });
+      const value = { text: 'x'.repeat(200) };
+
+      await cache.getOrCompute('a', async () => value);
+      await cache.getOrCompute('b', async () => value);
+      await cache.getOrCompute('a', async () => value); // 'a' passa a ser o mais recente
+      await cache.getOrCompute('c', async () => value);
+
+      expect(cache.getStats().evictions).toBe(1);
+      expect(cache.getStats().bytes).toBeLessThanOrEqual(600);
+      expect(fs.existsSync(path.join(tmpDir, 'a.json'))).toBe(true);
+      expect(fs.existsSync(path.join(tmpDir, 'b.json'))).toBe(false);
+    });
+
+    it('deve expirar entradas após o TTL', async () => {
+      const cache = new LlmCache({ enabled: true, dir: tmpDir, ttlMs: 1 });
+      const compute = jest.fn().mockResolvedValue({ ok: true });
+
+      await cache.getOrCompute('k', compute);
+      await new Promise(resolve => setTimeout(resolve, 5));
+      await cache.getOrCompute('k', compute);
+
+      expect(compute).toHaveBeenCalledTimes(2);
+    });
+  });
+});
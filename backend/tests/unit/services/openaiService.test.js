@@ -9,8 +9,11 @@ jest.mock('../../../services/claudeService', () => ({
   extractATSDataClaude: jest.fn()
 }));
 jest.mock('../../../services/rateLimitMonitor', () => ({
+  admit: jest.fn(),
+  admitClaude: jest.fn(),
   getRecommendedService: jest.fn(),
   recordOpenAIUsage: jest.fn(),
+  recordClaudeUsage: jest.fn(),
   updateOpenAILimits: jest.fn(),
   getOpenAIWaitTime: jest.fn().mockReturnValue(1000),
   getUsageStats: jest.fn().mockReturnValue({
@@ -21,6 +24,9 @@ jest.mock('../../../services/rateLimitMonitor', () => ({
 describe('OpenAI Service', () => {
   beforeEach(() => {
     jest.clearAllMocks();
+    // admit() parte da recomendação local antes de reservar o orçamento global
+    rateLimitMonitor.admit.mockImplementation(async (tokens) => rateLimitMonitor.getRecommendedService(tokens));
+    rateLimitMonitor.admitClaude.mockResolvedValue({ allowed: true, waitTime: 0 });
     // Silenciar console.log para os testes
     jest.spyOn(console, 'log').mockImplementation();
     jest.spyOn(console, 'error').mockImplementation();
@@ -74,6 +80,32 @@ describe('OpenAI Service', () => {
       // Assert
       expect(rateLimitMonitor.getRecommendedService).toHaveBeenCalled();
       expect(claudeService.extractATSDataClaude).toHaveBeenCalled();
+      expect(rateLimitMonitor.admitClaude).toHaveBeenCalledWith(expect.any(Number));
+      expect(rateLimitMonitor.recordClaudeUsage).toHaveBeenCalledWith(expect.any(Number));
+      expect(result).toEqual(mockAnalysisResponse);
+    });
+
+    it('não deve chamar OpenAI quando os orçamentos globais dos dois provedores estão esgotados', async () => {
+      rateLimitMonitor.admit.mockResolvedValue({ service: 'claude', reason: 'OpenAI rate limited globalmente', waitTime: 20000 });
+      rateLimitMonitor.admitClaude.mockResolvedValue({ allowed: false, waitTime: 30000 });
+
+      await expect(openaiService.extractATSData(mockJobsText, mockResumeText))
+        .rejects.toMatchObject({ statusCode: 429, retryAfterMs: 20000 });
+
+      expect(claudeService.extractATSDataClaude).not.toHaveBeenCalled();
+      expect(axios.post).not.toHaveBeenCalled();
+    });
+
+    it('deve tentar OpenAI quando o Claude falha por outro motivo na escolha estratégica', async () => {
+      rateLimitMonitor.getRecommendedService.mockReturnValue({ service: 'claude', reason: 'OpenAI rate limit atingido' });
+      claudeService.extractATSDataClaude.mockRejectedValue(new Error('Claude indisponível'));
+      axios.post.mockResolvedValue({
+        data: { choices: [{ message: { content: JSON.stringify(mockAnalysisResponse) } }] }
+      });
+
+      const result = await openaiService.extractATSData(mockJobsText, mockResumeText);
+
+      expect(axios.post).toHaveBeenCalled();
       expect(result).toEqual(mockAnalysisResponse);
     });
 
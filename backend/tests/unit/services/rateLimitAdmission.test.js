@@ -0,0 +1,67 @@
+const { RateLimitMonitor } = require('../../../services/rateLimitMonitor');
+const { MemoryStore } = require('../../../utils/sharedStore');
+
+describe('Rate Limit Monitor - admissão global', () => {
+  beforeEach(() => {
+    jest.spyOn(console, 'error').mockImplementation();
+  });
+
+  it('deve dividir o mesmo orçamento entre instâncias (workers)', async () => {
+    const store = new MemoryStore();
+    const workers = [new RateLimitMonitor({ store }), new RateLimitMonitor({ store })];
+    // 90% de 150000 tokens/min = 135000: cabem 13 requisições de 10000 tokens
+    const decisions = [];
+    for (let i = 0; i < 10; i++) {
+      for (const monitor of workers) {
+        decisions.push(await monitor.admit(10000));
+      }
+    }
+
+    expect(decisions.filter(decision => decision.service === 'openai')).toHaveLength(13);
+    const rejected = decisions.find(decision => decision.service === 'claude');
+    expect(rejected.reason).toContain('rate limited');
+    expect(rejected.waitTime).toBeGreaterThan(0);
+  });
+
+  it('deve respeitar limites informados pelos headers sem reservar orçamento', async () => {
+    const store = new MemoryStore();
+    const take = jest.spyOn(store, 'take');
+    const monitor = new RateLimitMonitor({ store });
+    monitor.openaiLimits.requests = { used: 2990, limit: 3000, resetTime: Date.now() + 60000 };
+
+    const decision = await monitor.admit(1000);
+
+    expect(decision.service).toBe('claude');
+    expect(take).not.toHaveBeenCalled();
+  });
+
+  it('deve debitar o Claude em baldes globais próprios e restaurá-los no reset', async () => {
+    const store = new MemoryStore();
+    const workers = [new RateLimitMonitor({ store }), new RateLimitMonitor({ store })];
+    // 90% de 100000 tokens/min = 90000: cabem 9 requisições de 10000 tokens
+    const decisions = [];
+    for (let i = 0; i < 6; i++) {
+      for (const monitor of workers) {
+        decisions.push(await monitor.admitClaude(10000));
+      }
+    }
+
+    expect(decisions.filter(decision => decision.allowed)).toHaveLength(9);
+    expect(decisions[decisions.length - 1].waitTime).toBeGreaterThan(0);
+    expect((await workers[0].admit(10000)).service).toBe('openai');
+    expect(workers[0].getUsageStats().admission.claude).toEqual({ admitted: 5, rejected: 1 });
+
+    await workers[0].resetBudgets();
+    expect((await workers[1].admitClaude(10000)).allowed).toBe(true);
+  });
+
+  it('deve decidir localmente se o store compartilhado falhar', async () => {
+    const store = { name: 'redis', take: jest.fn().mockRejectedValue(new Error('ECONNREFUSED')) };
+    const monitor = new RateLimitMonitor({ store });
+
+    const decision = await monitor.admit(1000);
+
+    expect(decision.service).toBe('openai');
+    expect(monitor.getUsageStats().admission).toMatchObject({ backend: 'redis', storeErrors: 1 });
+  });
+});
@@ -0,0 +1,63 @@
+const zlib = require('zlib');
+const analysisStorage = require('../../../utils/analysisStorage');
+
+describe('Analysis Storage', () => {
+  describe('summarize', () => {
+    it('deve calcular o resumo com os mesmos critérios da listagem', () => {
+      const summary = analysisStorage.summarize(
+        { jobs: [], job_keywords: {}, idiomas: { nota: 6 } },
+        ['https://a.com/1', 'https://a.com/2']
+      );
+
+      expect(summary).toEqual({
+        jobCount: 2,
+        hasCompatibilityScores: true,
+        hasKeywords: true,
+        hasEvaluations: true
+      });
+    });
+
+    it('deve tolerar resultado e links ausentes', () => {
+      expect(analysisStorage.summarize(null, undefined)).toEqual({
+        jobCount: 0,
+        hasCompatibilityScores: false,
+        hasKeywords: false,
+        hasEvaluations: false
+      });
+    });
+  });
+
+  describe('compressão', () => {
+    it('deve comprimir e restaurar o resultado JSON', async () => {
+      const result = {
+        jobs: Array.from({ length: 5 }, (_, i) => ({ name: `Vaga ${i}`, descricao: 'Requisitos da vaga. '.repeat(50) })),
+        conclusion: 'Análise concluída com acentuação'
+      };
+
+      const buffer = await analysisStorage.compressJSON(result);
+
+      expect(Buffer.isBuffer(buffer)).toBe(true);
+      expect(buffer.length).toBeLessThan(Buffer.byteLength(JSON.stringify(result)) / 4);
+      expect(await analysisStorage.decompressJSON(buffer)).toEqual(result);
+    });
+
+    it('deve restaurar texto do currículo', async () => {
+      const text = 'Experiência profissional em São Paulo. '.repeat(100);
+      const buffer = await analysisStorage.compressText(text);
+
+      expect(await analysisStorage.decompressText(buffer, analysisStorage.COMPRESSION)).toBe(text);
+    });
+
+    it('deve ler conteúdo gravado com gzip', async () => {
+      const buffer = zlib.gzipSync(Buffer.from(JSON.stringify({ ok: true })));
+
+      expect(await analysisStorage.decompressJSON(buffer, 'gzip')).toEqual({ ok: true });
+    });
+
+    it('deve manter valores vazios como null', async () => {
+      expect(await analysisStorage.compressJSON(null)).toBeNull();
+      expect(await analysisStorage.compressText(undefined)).toBeNull();
+      expect(await analysisStorage.decompressJSON(null)).toBeNull();
+    });
+  });
+});
@@ -0,0 +1,61 @@
+const jwt = require('jsonwebtoken');
+const authMiddleware = require('../../../utils/authMiddleware');
+const { redactUrl } = require('../../../utils/logger');
+
+const JOB_ID = '00000000-0000-4000-8000-000000000001';
+
+function run(middleware, req) {
+  const res = { status: jest.fn().mockReturnThis(), json: jest.fn().mockReturnThis() };
+  const next = jest.fn();
+  middleware(Object.assign(req, { headers: {}, query: {}, params: {}, url: '/', ...req }), res, next);
+  return { res, next };
+}
+
+describe('Auth Middleware', () => {
+  describe('jobEventsAuth', () => {
+    it('deve aceitar o token do SSE apenas para o próprio job', () => {
+      const token = authMiddleware.signJobEventsToken(7, JOB_ID);
+      const req = { params: { id: JOB_ID }, query: { token } };
+
+      const { next } = run(authMiddleware.jobEventsAuth, req);
+      expect(next).toHaveBeenCalled();
+      expect(req.user).toEqual({ id: 7 });
+
+      const other = run(authMiddleware.jobEventsAuth, { params: { id: 'outro-job' }, query: { token } });
+      expect(other.next).not.toHaveBeenCalled();
+      expect(other.res.status).toHaveBeenCalledWith(401);
+    });
+
+    it('não deve aceitar o JWT de sessão na query string', () => {
+      const session = jwt.sign({ id: 7 }, process.env.JWT_SECRET);
+
+      const { next, res } = run(authMiddleware.jobEventsAuth, { params: { id: JOB_ID }, query: { token: session } });
+
+      expect(next).not.toHaveBeenCalled();
+      expect(res.status).toHaveBeenCalledWith(401);
+    });
+
+    it('deve manter a autenticação por cabeçalho', () => {
+      const session = jwt.sign({ id: 7 }, process.env.JWT_SECRET);
+      const req = { params: { id: JOB_ID }, headers: { authorization: `Bearer ${session}` } };
+
+      expect(run(authMiddleware.jobEventsAuth, req).next).toHaveBeenCalled();
+      expect(req.user.id).toBe(7);
+    });
+  });
+
+  it('não deve aceitar o token do SSE nas demais rotas', () => {
+    const token = authMiddleware.signJobEventsToken(7, JOB_ID);
+
+    const { next, res } = run(authMiddleware, { headers: { authorization: `Bearer ${token}` } });
+
+    expect(next).not.toHaveBeenCalled();
+    expect(res.status).toHaveBeenCalledWith(401);
+  });
+
+  it('deve remover o token da URL registrada em log', () => {
+    expect(redactUrl(`/api/ats/jobs/${JOB_ID}/events?token=abc.def.ghi&x=1`))
+      .toBe(`/api/ats/jobs/${JOB_ID}/events?token=[REDACTED]&x=1`);
+    expect(redactUrl('/api/ats/history?page=2')).toBe('/api/ats/history?page=2');
+  });
+});
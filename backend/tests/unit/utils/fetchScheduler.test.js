@@ -0,0 +1,108 @@
+const { FetchScheduler } = require('../../../utils/fetchScheduler');
+
+const baseConfig = {
+  concurrency: 5,
+  perHostConcurrency: 2,
+  perHostIntervalMs: 0,
+  urlTimeoutMs: 1000,
+  deadlineMs: 5000
+};
+
+const delay = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+describe('Fetch Scheduler', () => {
+  it('deve retornar resultados na ordem de entrada', async () => {
+    const scheduler = new FetchScheduler(baseConfig);
+    const urls = ['https://a.com/1', 'https://b.com/2', 'https://c.com/3'];
+
+    const { results, timedOut } = await scheduler.run(urls, async (url) => {
+      await delay(url.endsWith('1') ? 30 : 5);
+      return url;
+    });
+
+    expect(timedOut).toBe(false);
+    expect(results.map(r => r.value)).toEqual(urls);
+  });
+
+  it('deve respeitar o limite de concorrência por host', async () => {
+    const scheduler = new FetchScheduler(baseConfig);
+    const urls = Array.from({ length: 6 }, (_, i) => `https://gupy.io/vaga/${i}`);
+    let active = 0;
+    let maxActive = 0;
+
+    await scheduler.run(urls, async () => {
+      active++;
+      maxActive = Math.max(maxActive, active);
+      await delay(10);
+      active--;
+    });
+
+    expect(maxActive).toBe(2);
+  });
+
+  it('não deve bloquear hosts livres atrás de um host saturado', async () => {
+    const scheduler = new FetchScheduler({ ...baseConfig, perHostConcurrency: 1 });
+    const urls = ['https://lento.com/1', 'https://lento.com/2', 'https://rapido.com/1'];
+    const finishedAt = {};
+    const start = Date.now();
+
+    await scheduler.run(urls, async (url) => {
+      await delay(url.includes('lento') ? 50 : 5);
+      finishedAt[url] = Date.now() - start;
+    });
+
+    expect(finishedAt['https://rapido.com/1']).toBeLessThan(finishedAt['https://lento.com/1']);
+  });
+
+  it('deve aplicar intervalo de cortesia entre inícios no mesmo host', async () => {
+    const scheduler = new FetchScheduler({ ...baseConfig, perHostIntervalMs: 40 });
+    const startedAt = [];
+
+    await scheduler.run(['https://a.com/1', 'https://a.com/2'], async () => {
+      startedAt.push(Date.now());
+    });
+
+    expect(startedAt[1] - startedAt[0]).toBeGreaterThanOrEqual(35);
+  });
+
+  it('deve abortar URLs que excedem o timeout individual', async () => {
+    const scheduler = new FetchScheduler({ ...baseConfig, urlTimeoutMs: 20 });
+    let aborted = false;
+
+    const { results } = await scheduler.run(['https://a.com/lenta'], (url, { signal }) =>
+      new Promise(resolve => {
+        signal.addEventListener('abort', () => { aborted = true; });
+        setTimeout(resolve, 200);
+      })
+    );
+
+    expect(results[0].status).toBe('rejected');
+    expect(results[0].reason.message).toContain('Timeout');
+    expect(aborted).toBe(true);
+  });
+
+  it('deve retornar resultados parciais ao atingir o prazo total', async () => {
+    const scheduler = new FetchScheduler({ ...baseConfig, deadlineMs: 50 });
+
+    const { results, timedOut } = await scheduler.run(
+      ['https://a.com/rapida', 'https://b.com/lenta'],
+      async (url) => {
+        await delay(url.endsWith('rapida') ? 5 : 500);
+        return url;
+      }
+    );
+
+    expect(timedOut).toBe(true);
+    expect(results[0]).toEqual({ status: 'fulfilled', value: 'https://a.com/rapida' });
+    expect(results[1].status).toBe('timeout');
+  });
+
+  it('deve concluir imediatamente sem URLs', async () => {
+    const scheduler = new FetchScheduler(baseConfig);
+
+    const { results, timedOut } = await scheduler.run([], jest.fn());
+
+    expect(results).toEqual([]);
+    expect(timedOut).toBe(false);
+  });
+});
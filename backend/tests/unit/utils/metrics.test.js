@@ -0,0 +1,188 @@
+const EventEmitter = require('events');
+const express = require('express');
+const request = require('supertest');
+const { Metrics, Histogram, mergeExpositions, servePrimary } = require('../../../utils/metrics');
+
+describe('Metrics', () => {
+    let metrics;
+
+    beforeEach(() => {
+        metrics = new Metrics();
+    });
+
+    afterEach(() => {
+        metrics.loopDelay.disable();
+    });
+
+    describe('span', () => {
+        it('deve medir funções síncronas e assíncronas e emitir o evento span', async () => {
+            const spans = [];
+            metrics.on('span', span => spans.push(span));
+
+            expect(metrics.span('verify', () => 42)).toBe(42);
+            await expect(metrics.span('llm_request', async () => 'ok', { provider: 'openai' })).resolves.toBe('ok');
+
+            expect(spans.map(span => [span.stage, span.outcome])).toEqual([['verify', 'ok'], ['llm_request', 'ok']]);
+            expect(spans[1].labels).toEqual({ provider: 'openai' });
+            expect(spans.every(span => span.durationMs >= 0)).toBe(true);
+        });
+
+        it('deve registrar outcome error e repassar a exceção', async () => {
+            await expect(metrics.span('save', async () => { throw new Error('db offline'); })).rejects.toThrow('db offline');
+            expect(() => metrics.span('gupy', () => { throw new Error('falhou'); })).toThrow('falhou');
+
+            const output = metrics.render();
+            expect(output).toContain('cvsf_stage_duration_seconds_count{stage="save",outcome="error"} 1');
+            expect(output).toContain('cvsf_stage_duration_seconds_count{stage="gupy",outcome="error"} 1');
+        });
+
+        it('deve encerrar cada span uma única vez', () => {
+            const end = metrics.startSpan('scrape_url');
+            end('ok');
+            end('error');
+
+            expect(metrics.stageDuration.series.size).toBe(1);
+        });
+    });
+
+    describe('timed', () => {
+        it('deve medir o middleware até ele chamar next', () => {
+            const next = jest.fn();
+            const failingUpload = (req, res, callback) => callback(new Error('arquivo inválido'));
+
+            metrics.timed('upload', (req, res, callback) => callback())({}, {}, next);
+            metrics.timed('upload', failingUpload)({}, {}, next);
+
+            expect(next).toHaveBeenNthCalledWith(1, undefined);
+            expect(next.mock.calls[1][0].message).toBe('arquivo inválido');
+            const output = metrics.render();
+            expect(output).toContain('cvsf_stage_duration_seconds_count{stage="upload",outcome="ok"} 1');
+            expect(output).toContain('cvsf_stage_duration_seconds_count{stage="upload",outcome="error"} 1');
+        });
+    });
+
+    describe('render', () => {
+        it('deve gerar buckets cumulativos no formato Prometheus', () => {
+            const histogram = new Histogram('duracao_seconds', 'Duração', [0.1, 1]);
+            histogram.observe({ stage: 'llm' }, 0.05);
+            histogram.observe({ stage: 'llm' }, 0.5);
+            histogram.observe({ stage: 'llm' }, 3);
+
+            expect(histogram.render()).toEqual([
+                '# HELP duracao_seconds Duração',
+                '# TYPE duracao_seconds histogram',
+                'duracao_seconds_bucket{stage="llm",le="0.1"} 1',
+                'duracao_seconds_bucket{stage="llm",le="1"} 2',
+                'duracao_seconds_bucket{stage="llm",le="+Inf"} 3',
+                'duracao_seconds_sum{stage="llm"} 3.55',
+                'duracao_seconds_count{stage="llm"} 3'
+            ]);
+        });
+
+        it('deve expor contadores, atraso do event loop e memória', () => {
+            const retries = metrics.counter('llm_retries_total', 'Retentativas');
+            retries.inc({ provider: 'openai' });
+            metrics.counter('llm_retries_total').inc({ provider: 'openai' }, 2);
+
+            const output = metrics.render();
+
+            expect(output).toContain('# TYPE cvsf_llm_retries_total counter');
+            expect(output).toContain('cvsf_llm_retries_total{provider="openai"} 3');
+            expect(output).toMatch(/cvsf_event_loop_lag_seconds\{quantile="0.99"\} [\d.e-]+/);
+            expect(output).toMatch(/cvsf_heap_used_bytes \d+/);
+            expect(output.endsWith('\n')).toBe(true);
+        });
+
+        it('deve acrescentar labels constantes a todas as séries', () => {
+            metrics.startSpan('llm', { provider: 'openai' })();
+
+            const samples = metrics.render({ worker: '2' }).split('\n').filter(line => line && !line.startsWith('#'));
+
+            expect(samples.every(line => line.includes('worker="2"'))).toBe(true);
+            expect(samples).toContainEqual(expect.stringMatching(/^cvsf_heap_used_bytes\{worker="2"\} \d+$/));
+            expect(samples).toContain('cvsf_stage_duration_seconds_count{worker="2",stage="llm",provider="openai",outcome="ok"} 1');
+        });
+
+        it('deve escapar valores de labels', () => {
+            metrics.startSpan('scrape_url', { host: 'a"b\\c' })();
+
+            expect(metrics.render()).toContain('host="a\\"b\\\\c"');
+        });
+    });
+
+    describe('cluster', () => {
+        it('deve juntar exposições de workers agrupando cada métrica', () => {
+            const a = new Metrics();
+            const b = new Metrics();
+            a.counter('llm_retries_total', 'Retentativas').inc({ provider: 'openai' });
+            b.counter('llm_retries_total', 'Retentativas').inc({ provider: 'openai' }, 2);
+
+            const merged = mergeExpositions([a.render({ worker: '1' }), b.render({ worker: '2' })]);
+            a.loopDelay.disable();
+            b.loopDelay.disable();
+
+            const lines = merged.split('\n');
+            expect(lines.filter(line => line === '# TYPE cvsf_llm_retries_total counter')).toHaveLength(1);
+            const start = lines.indexOf('# TYPE cvsf_llm_retries_total counter');
+            expect(lines.slice(start + 1, start + 3)).toEqual([
+                'cvsf_llm_retries_total{worker="1",provider="openai"} 1',
+                'cvsf_llm_retries_total{worker="2",provider="openai"} 2'
+            ]);
+        });
+
+        it('deve responder ao scrape com os workers que responderem a tempo', async () => {
+            const primary = new EventEmitter();
+            let resolveReply;
+            const collected = new Promise(resolve => { resolveReply = resolve; });
+            // Worker sem texto não responde (travado)
+            const worker = (text) => {
+                const target = {
+                    isConnected: () => true,
+                    send: (message) => {
+                        if (message.type === 'metrics:collect:reply') resolveReply(message);
+                        if (message.type === 'metrics:render' && text) {
+                            setImmediate(() => primary.emit('message', target, { type: 'metrics:render:reply', id: message.id, text }));
+                        }
+                    }
+                };
+                return target;
+            };
+            primary.workers = {
+                1: worker('# TYPE cvsf_up gauge\ncvsf_up{worker="1"} 1\n'),
+                2: worker('# TYPE cvsf_up gauge\ncvsf_up{worker="2"} 1\n'),
+                3: worker(null)
+            };
+            servePrimary(primary, 50);
+
+            primary.emit('message', primary.workers[1], { type: 'metrics:collect', id: 'x' });
+            const reply = await collected;
+
+            expect(reply.id).toBe('x');
+            expect(reply.text).toBe('# TYPE cvsf_up gauge\ncvsf_up{worker="1"} 1\ncvsf_up{worker="2"} 1\n');
+        });
+    });
+
+    describe('rota /metrics', () => {
+        const env = { ...process.env };
+        const app = express().use('/metrics', require('../../../routes/metrics'));
+
+        afterEach(() => {
+            process.env = { ...env };
+        });
+
+        it('deve exigir METRICS_TOKEN em produção', async () => {
+            process.env.NODE_ENV = 'production';
+            delete process.env.METRICS_TOKEN;
+
+            await request(app).get('/metrics').expect(403);
+        });
+
+        it('deve validar o token Bearer', async () => {
+            process.env.METRICS_TOKEN = 'segredo';
+
+            await request(app).get('/metrics').expect(401);
+            const response = await request(app).get('/metrics').set('Authorization', 'Bearer segredo').expect(200);
+            expect(response.text).toContain('# TYPE cvsf_stage_duration_seconds histogram');
+        });
+    });
+});
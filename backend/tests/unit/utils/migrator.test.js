@@ -0,0 +1,81 @@
+const migrator = require('../../../utils/migrator');
+
+jest.mock('../../../migrations/20251018_slim_analysis_results', () => ({
+  up: jest.fn(),
+  down: jest.fn()
+}));
+const slimMigration = require('../../../migrations/20251018_slim_analysis_results');
+
+// QueryInterface em memória: tabelas existentes e linhas da SequelizeMeta
+function fakeSequelize({ tables = [], applied = [], columns = {} } = {}) {
+  const meta = [...applied];
+  const queryInterface = {
+    createTable: jest.fn(async () => { }),
+    select: jest.fn(async () => meta.map(name => ({ name }))),
+    showAllTables: jest.fn(async () => tables),
+    describeTable: jest.fn(async table => columns[table] || {}),
+    bulkInsert: jest.fn(async (table, rows) => meta.push(...rows.map(row => row.name))),
+    bulkDelete: jest.fn(async (table, { name }) => meta.splice(meta.indexOf(name), 1))
+  };
+  return { meta, queryInterface, getQueryInterface: () => queryInterface };
+}
+
+describe('Migrator', () => {
+  beforeEach(() => {
+    jest.spyOn(console, 'log').mockImplementation();
+  });
+
+  it('deve registrar todas as migrações como aplicadas em banco novo', async () => {
+    const sequelize = fakeSequelize();
+
+    const { pending } = await migrator.status(sequelize);
+
+    expect(pending).toEqual([]);
+    expect(sequelize.meta).toEqual(migrator.MIGRATIONS);
+    await migrator.up(sequelize);
+    expect(slimMigration.up).not.toHaveBeenCalled();
+  });
+
+  it('deve aplicar as pendentes de um banco existente uma única vez', async () => {
+    const sequelize = fakeSequelize({ tables: ['users', 'AnalysisResults'] });
+
+    expect((await migrator.status(sequelize)).pending).toEqual(migrator.MIGRATIONS);
+    expect(await migrator.up(sequelize)).toEqual(migrator.MIGRATIONS);
+    expect(await migrator.up(sequelize)).toEqual([]);
+    expect(slimMigration.up).toHaveBeenCalledTimes(1);
+  });
+
+  it('deve reverter a última migração aplicada', async () => {
+    const sequelize = fakeSequelize({ tables: ['AnalysisResults'], applied: [...migrator.MIGRATIONS] });
+
+    expect(await migrator.down(sequelize)).toBe('20251018_slim_analysis_results');
+    expect(slimMigration.down).toHaveBeenCalledTimes(1);
+    expect((await migrator.status(sequelize)).pending).toEqual(migrator.MIGRATIONS);
+  });
+
+  describe('assertSchema', () => {
+    const model = {
+      getTableName: () => 'AnalysisResults',
+      rawAttributes: { id: { field: 'id' }, resultCompressed: { field: 'resultCompressed' } }
+    };
+
+    it('deve falhar com PENDING_MIGRATIONS quando faltam colunas', async () => {
+      const sequelize = fakeSequelize({ tables: ['AnalysisResults'], columns: { AnalysisResults: { id: {} } } });
+
+      await expect(migrator.assertSchema(sequelize, [model])).rejects.toMatchObject({
+        code: 'PENDING_MIGRATIONS',
+        message: expect.stringContaining('AnalysisResults.resultCompressed')
+      });
+    });
+
+    it('deve aceitar tabela atualizada ou ainda inexistente', async () => {
+      const updated = fakeSequelize({
+        tables: ['AnalysisResults'],
+        columns: { AnalysisResults: { id: {}, resultCompressed: {} } }
+      });
+
+      await expect(migrator.assertSchema(updated, [model])).resolves.toBeUndefined();
+      await expect(migrator.assertSchema(fakeSequelize(), [model])).resolves.toBeUndefined();
+    });
+  });
+});
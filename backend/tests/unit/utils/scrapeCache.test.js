@@ -0,0 +1,275 @@
+const http = require('http');
+const net = require('net');
+const { ScrapeCache, normalizeUrl } = require('../../../utils/scrapeCache');
+
+const baseConfig = {
+  enabled: true,
+  backend: 'memory',
+  keyPrefix: 'test:',
+  ttlMs: 60 * 1000,
+  staleTtlMs: 60 * 1000,
+  negativeTtlMs: 60 * 1000,
+  maxBytes: 1024
+};
+
+describe('Scrape Cache', () => {
+  describe('normalizeUrl', () => {
+    it('deve ignorar fragmento, barra final e parâmetros de rastreamento', () => {
+      const a = normalizeUrl('https://Empresa.Gupy.io/jobs/123/?utm_source=linkedin&b=2&a=1#apply');
+      const b = normalizeUrl('https://empresa.gupy.io/jobs/123?a=1&b=2');
+
+      expect(a).toBe(b);
+    });
+
+    it('deve manter parâmetros que identificam a vaga', () => {
+      expect(normalizeUrl('https://site.com/vaga?id=1'))
+        .not.toBe(normalizeUrl('https://site.com/vaga?id=2'));
+    });
+  });
+
+  describe('lookup/store', () => {
+    it('deve registrar miss e depois hit com contagem de bytes', async () => {
+      const cache = new ScrapeCache(baseConfig);
+
+      expect(await cache.lookup('https://site.com/vaga')).toBeNull();
+      await cache.store('https://site.com/vaga', { content: 'Requisitos: Node.js', etag: '"v1"' });
+
+      const cached = await cache.lookup('https://site.com/vaga/');
+      const stats = cache.getStats();
+
+      expect(cached.fresh).toBe(true);
+      expect(cached.entry.content).toBe('Requisitos: Node.js');
+      expect(cached.entry.etag).toBe('"v1"');
+      expect(stats.hits).toBe(1);
+      expect(stats.misses).toBe(1);
+      expect(stats.bytes).toBe(Buffer.byteLength('Requisitos: Node.js'));
+    });
+
+    it('deve marcar entrada como vencida após o TTL', async () => {
+      const cache = new ScrapeCache({ ...baseConfig, ttlMs: 0 });
+      await cache.store('https://site.com/vaga', { content: 'texto' });
+
+      const cached = await cache.lookup('https://site.com/vaga');
+
+      expect(cached.fresh).toBe(false);
+      expect(cache.getStats().staleHits).toBe(1);
+    });
+
+    it('deve evictar as entradas menos usadas ao exceder o limite de bytes', async () => {
+      const cache = new ScrapeCache({ ...baseConfig, maxBytes: 10 });
+      await cache.store('https://site.com/1', { content: '12345' });
+      await cache.store('https://site.com/2', { content: '12345' });
+      await cache.lookup('https://site.com/1'); // 1 passa a ser o mais recente
+      await cache.store('https://site.com/3', { content: '12345' });
+
+      expect(await cache.lookup('https://site.com/2')).toBeNull();
+      expect(await cache.lookup('https://site.com/1')).not.toBeNull();
+      expect(cache.getStats().evictions).toBe(1);
+      expect(cache.getStats().bytes).toBe(10);
+    });
+
+    it('deve guardar links mortos como cache negativo', async () => {
+      const cache = new ScrapeCache(baseConfig);
+      await cache.storeDead('https://site.com/removida', 'HTTP 404');
+
+      const cached = await cache.lookup('https://site.com/removida');
+
+      expect(cached.fresh).toBe(true);
+      expect(cached.entry.dead).toBe(true);
+      expect(cache.getStats().negativeHits).toBe(1);
+    });
+  });
+
+  describe('Redis indisponível', () => {
+    // Porta que acabou de ser liberada: conexão recusada
+    const closedPort = () => new Promise(resolve => {
+      const server = net.createServer().listen(0, '127.0.0.1', () => {
+        const { port } = server.address();
+        server.close(() => resolve(port));
+      });
+    });
+
+    beforeEach(() => {
+      jest.spyOn(console, 'warn').mockImplementation();
+      jest.spyOn(console, 'error').mockImplementation();
+    });
+
+    it('deve cair para memória quando a conexão é recusada', async () => {
+      const port = await closedPort();
+      const cache = new ScrapeCache({ ...baseConfig, backend: 'redis', redisUrl: `redis://127.0.0.1:${port}` });
+
+      const start = Date.now();
+      expect(await cache.lookup('https://site.com/vaga')).toBeNull();
+      expect(Date.now() - start).toBeLessThan(3000);
+
+      await cache.store('https://site.com/vaga', { content: 'texto' });
+      expect((await cache.lookup('https://site.com/vaga')).fresh).toBe(true);
+      await cache.shared.close();
+    });
+
+    it('deve cair para memória se o Redis aceitar a conexão mas não responder', async () => {
+      // Aceita a conexão TCP mas nunca responde aos comandos
+      const sockets = [];
+      const server = net.createServer(socket => sockets.push(socket));
+      await new Promise(resolve => server.listen(0, '127.0.0.1', resolve));
+      const cache = new ScrapeCache({ ...baseConfig, backend: 'redis', redisUrl: `redis://127.0.0.1:${server.address().port}` });
+
+      try {
+        const start = Date.now();
+        expect(await cache.lookup('https://site.com/vaga')).toBeNull();
+        expect(Date.now() - start).toBeLessThan(3000);
+      } finally {
+        await cache.shared.close();
+        sockets.forEach(socket => socket.destroy());
+        server.close();
+      }
+    });
+  });
+
+  describe('integração com hybridJobScraper', () => {
+    let server, baseUrl, requests;
+    let hybridJobScraper, scrapeCache;
+
+    const html = '<html><body><h2>Requisitos</h2><ul><li>Node.js</li><li>React</li></ul></body></html>';
+
+    beforeAll(async () => {
+      server = http.createServer((req, res) => {
+        requests.push({ url: req.url, ifNoneMatch: req.headers['if-none-match'] });
+
+        if (req.url.startsWith('/removida')) {
+          res.writeHead(404);
+          return res.end();
+        }
+        if (req.url.startsWith('/vazia')) {
+          res.writeHead(200, { 'Content-Type': 'text/html' });
+          return res.end('<html><body></body></html>');
+        }
+        if (req.url.startsWith('/instavel') && requests.length > 1) {
+          res.writeHead(503);
+          return res.end();
+        }
+        if (req.headers['if-none-match'] === '"v1"') {
+          res.writeHead(304, { ETag: '"v1"' });
+          return res.end();
+        }
+        res.writeHead(200, { 'Content-Type': 'text/html', ETag: '"v1"' });
+        res.end(html);
+      });
+      await new Promise(resolve => server.listen(0, '127.0.0.1', resolve));
+      baseUrl = `http://127.0.0.1:${server.address().port}`;
+
+      hybridJobScraper = require('../../../utils/hybridJobScraper');
+      scrapeCache = require('../../../utils/scrapeCache');
+    });
+
+    afterAll(async () => {
+      await new Promise(resolve => server.close(resolve));
+    });
+
+    beforeEach(async () => {
+      requests = [];
+      await scrapeCache.clear();
+    });
+
+    it('deve pular a rede em uma análise repetida', async () => {
+      const first = await hybridJobScraper.scrapeJobUrl(`${baseUrl}/vaga/1`);
+      const second = await hybridJobScraper.scrapeJobUrl(`${baseUrl}/vaga/1?utm_source=email`);
+
+      expect(second.content).toBe(first.content);
+      expect(first.content).toContain('Node.js');
+      expect(requests).toHaveLength(1);
+      expect(scrapeCache.getStats().hits).toBe(1);
+    });
+
+    it('deve revalidar entrada vencida com If-None-Match', async () => {
+      const originalTtl = scrapeCache.config.ttlMs;
+      scrapeCache.config.ttlMs = 0;
+
+      try {
+        await hybridJobScraper.scrapeJobUrl(`${baseUrl}/vaga/2`);
+        const revalidated = await hybridJobScraper.scrapeJobUrl(`${baseUrl}/vaga/2`);
+
+        expect(requests).toHaveLength(2);
+        expect(requests[1].ifNoneMatch).toBe('"v1"');
+        expect(revalidated.content).toContain('React');
+        expect(scrapeCache.getStats().revalidations).toBe(1);
+      } finally {
+        scrapeCache.config.ttlMs = originalTtl;
+      }
+    });
+
+    it('deve servir a entrada vencida se a revalidação falhar', async () => {
+      const originalTtl = scrapeCache.config.ttlMs;
+      scrapeCache.config.ttlMs = 0;
+      jest.spyOn(console, 'warn').mockImplementation();
+
+      try {
+        const first = await hybridJobScraper.scrapeJobUrl(`${baseUrl}/instavel/1`);
+        const second = await hybridJobScraper.scrapeJobUrl(`${baseUrl}/instavel/1`);
+
+        expect(requests).toHaveLength(2);
+        expect(first.content).toContain('Node.js');
+        expect(second.content).toBe(first.content);
+      } finally {
+        scrapeCache.config.ttlMs = originalTtl;
+      }
+    });
+
+    it('não deve guardar extração vazia no cache', async () => {
+      await hybridJobScraper.scrapeJobUrl(`${baseUrl}/vazia`);
+      await hybridJobScraper.scrapeJobUrl(`${baseUrl}/vazia`);
+
+      expect(requests).toHaveLength(2);
+      expect(scrapeCache.getStats().stores).toBe(0);
+    });
+
+    it('deve aplicar cache negativo para links mortos', async () => {
+      const first = await hybridJobScraper.scrapeJobUrl(`${baseUrl}/removida`);
+      const second = await hybridJobScraper.scrapeJobUrl(`${baseUrl}/removida`);
+
+      expect(first.content).toBe('');
+      expect(second.content).toBe('');
+      expect(requests).toHaveLength(1);
+      expect(scrapeCache.getStats().negativeHits).toBe(1);
+    });
+
+    it('deve servir o lote em cache sem passar pelo agendador', async () => {
+      const fetchScheduler = require('../../../utils/fetchScheduler');
+      const urls = Array.from({ length: 7 }, (_, i) => `${baseUrl}/lote/${i}`);
+
+      const cold = await hybridJobScraper.extractMultiple(urls);
+      const run = jest.spyOn(fetchScheduler, 'run');
+      const warm = await hybridJobScraper.extractMultiple(urls);
+
+      expect(cold.successful).toBe(7);
+      expect(warm.successful).toBe(7);
+      expect(warm.results.map(r => r.url)).toEqual(urls);
+      expect(requests).toHaveLength(7);
+      expect(run).not.toHaveBeenCalled();
+      // Sem o intervalo de cortesia por host (250ms entre inícios)
+      expect(warm.elapsedMs).toBeLessThan(250);
+    });
+
+    it('deve agendar apenas as URLs fora do cache', async () => {
+      const fetchScheduler = require('../../../utils/fetchScheduler');
+      await hybridJobScraper.scrapeJobUrl(`${baseUrl}/misto/0`);
+      const run = jest.spyOn(fetchScheduler, 'run');
+
+      const batch = await hybridJobScraper.extractMultiple([`${baseUrl}/misto/0`, `${baseUrl}/misto/1`]);
+
+      expect(run.mock.calls[0][0]).toEqual([`${baseUrl}/misto/1`]);
+      expect(batch.results.map(r => r.index)).toEqual([1, 2]);
+      expect(requests).toHaveLength(2);
+    });
+
+    it('deve expor contadores do cache no healthCheck', async () => {
+      const health = await hybridJobScraper.healthCheck();
+
+      expect(health.cache).toEqual(expect.objectContaining({
+        hits: expect.any(Number),
+        misses: expect.any(Number),
+        bytes: expect.any(Number)
+      }));
+    });
+  });
+});
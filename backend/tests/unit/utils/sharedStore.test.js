@@ -0,0 +1,147 @@
+const EventEmitter = require('events');
+const net = require('net');
+const { MemoryStore, ClusterStore, RedisStore, servePrimary } = require('../../../utils/sharedStore');
+const SharedRateLimitStore = require('../../../utils/rateLimitStore');
+
+// Primário e worker ligados em memória, no lugar do canal IPC do cluster
+function connectedCluster() {
+  const primary = new EventEmitter();
+  const workerProcess = new EventEmitter();
+  const worker = { send: message => setImmediate(() => workerProcess.emit('message', message)) };
+  workerProcess.send = message => setImmediate(() => primary.emit('message', worker, message));
+
+  const backing = servePrimary(primary, new MemoryStore());
+  return { backing, createWorkerStore: () => new ClusterStore(workerProcess) };
+}
+
+describe('Shared Store', () => {
+  describe('MemoryStore', () => {
+    it('deve contar hits na janela e reiniciar após expirar', async () => {
+      const store = new MemoryStore();
+
+      await store.hit('ip', 1000);
+      const second = await store.hit('ip', 1000);
+      expect(second.total).toBe(2);
+
+      store.counters.get('ip').resetTime = Date.now() - 1;
+      expect((await store.hit('ip', 1000)).total).toBe(1);
+    });
+
+    it('deve debitar todos os baldes ou nenhum', async () => {
+      const store = new MemoryStore();
+      const buckets = cost => [
+        { key: 'req', capacity: 10, refillPerMs: 0, cost: 1 },
+        { key: 'tok', capacity: 100, refillPerMs: 0, cost }
+      ];
+
+      expect((await store.take(buckets(80))).allowed).toBe(true);
+      const denied = await store.take(buckets(50));
+
+      expect(denied.allowed).toBe(false);
+      expect(denied.remaining).toEqual([9, 20]);
+    });
+
+    it('deve recarregar o balde com o tempo e informar a espera', async () => {
+      const store = new MemoryStore();
+      const bucket = [{ key: 'b', capacity: 2, refillPerMs: 1 / 1000, cost: 2 }];
+
+      await store.take(bucket);
+      const denied = await store.take(bucket);
+      expect(denied.allowed).toBe(false);
+      expect(denied.retryAfterMs).toBeGreaterThan(1900);
+
+      store.buckets.get('b').ts -= 2000;
+      expect((await store.take(bucket)).allowed).toBe(true);
+    });
+  });
+
+  describe('ClusterStore', () => {
+    it('deve compartilhar contadores e baldes entre workers via primário', async () => {
+      const { backing, createWorkerStore } = connectedCluster();
+      const workers = [createWorkerStore(), createWorkerStore(), createWorkerStore()];
+      const bucket = [{ key: 'llm', capacity: 5, refillPerMs: 0, cost: 1 }];
+
+      await Promise.all(workers.map(store => store.hit('ip', 60000)));
+      const results = await Promise.all(
+        workers.flatMap(store => [1, 2, 3].map(() => store.take(bucket)))
+      );
+
+      expect(backing.counters.get('ip').total).toBe(3);
+      expect(results.filter(result => result.allowed)).toHaveLength(5);
+    });
+  });
+
+  describe('RedisStore', () => {
+    beforeEach(() => {
+      jest.spyOn(console, 'warn').mockImplementation();
+      jest.spyOn(console, 'error').mockImplementation();
+      jest.spyOn(console, 'log').mockImplementation();
+    });
+
+    it('deve cair para memória quando o Redis recusa a conexão', async () => {
+      const port = await new Promise(resolve => {
+        const server = net.createServer().listen(0, '127.0.0.1', () => {
+          const { port } = server.address();
+          server.close(() => resolve(port));
+        });
+      });
+      const store = new SharedRateLimitStore('global', new RedisStore(`redis://127.0.0.1:${port}`));
+      store.init({ windowMs: 60000 });
+
+      const start = Date.now();
+      await store.increment('1.2.3.4');
+      const info = await store.increment('1.2.3.4');
+
+      expect(Date.now() - start).toBeLessThan(3000);
+      expect(info.totalHits).toBe(2);
+      await store.store.close();
+    });
+
+    it('deve usar o fallback local se um comando travar depois de conectado', async () => {
+      // Responde +OK aos comandos de conexão e nunca responde ao EVAL
+      const sockets = [];
+      const server = net.createServer(socket => {
+        sockets.push(socket);
+        socket.on('data', chunk => {
+          const text = chunk.toString();
+          if (text.includes('EVAL')) return;
+          socket.write('+OK\r\n'.repeat((text.match(/^\*\d+\r$/gm) || []).length));
+        });
+      });
+      await new Promise(resolve => server.listen(0, '127.0.0.1', resolve));
+      const store = new RedisStore(`redis://127.0.0.1:${server.address().port}`);
+
+      try {
+        const start = Date.now();
+        const result = await store.take([{ key: 'llm', capacity: 1, refillPerMs: 0, cost: 1 }]);
+
+        expect(Date.now() - start).toBeLessThan(2000);
+        expect(store.client).not.toBeNull();
+        expect(result.allowed).toBe(true);
+      } finally {
+        await store.close();
+        sockets.forEach(socket => socket.destroy());
+        server.close();
+      }
+    });
+  });
+
+  describe('SharedRateLimitStore', () => {
+    it('deve implementar a interface de store do express-rate-limit', async () => {
+      const backing = new MemoryStore();
+      const store = new SharedRateLimitStore('ats', backing);
+      store.init({ windowMs: 60000 });
+
+      await store.increment('1.2.3.4');
+      const info = await store.increment('1.2.3.4');
+      expect(info.totalHits).toBe(2);
+      expect(info.resetTime).toBeInstanceOf(Date);
+
+      await store.decrement('1.2.3.4');
+      expect(backing.counters.get('rl:ats:1.2.3.4').total).toBe(1);
+
+      await store.resetKey('1.2.3.4');
+      expect((await store.increment('1.2.3.4')).totalHits).toBe(1);
+    });
+  });
+});
@@ -0,0 +1,114 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const textExtractor = require('../../../utils/textExtractor');
+const TextExtractionPool = require('../../../utils/textExtractionPool');
+
+const UPLOADS_DIR = path.join(__dirname, '../../../uploads');
+const samplePdf = fs.readdirSync(UPLOADS_DIR).find(file => file.endsWith('.pdf'));
+const samplePath = path.join(UPLOADS_DIR, samplePdf);
+
+describe('Text Extractor', () => {
+  let tmpDir;
+
+  beforeAll(() => {
+    tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), 'text-extractor-'));
+  });
+
+  afterAll(async () => {
+    fs.rmSync(tmpDir, { recursive: true, force: true });
+    await textExtractor.pool.close();
+  });
+
+  beforeEach(() => {
+    textExtractor.clearCache();
+  });
+
+  it('deve extrair o texto de um PDF em worker', async () => {
+    const text = await textExtractor.extract(samplePath);
+
+    expect(typeof text).toBe('string');
+    expect(text.trim().length).toBeGreaterThan(0);
+    expect(textExtractor.getStats().pool.completed).toBeGreaterThan(0);
+  });
+
+  it('deve reutilizar o texto extraído para arquivos com o mesmo conteúdo', async () => {
+    const copy = path.join(tmpDir, 'copia.pdf');
+    fs.copyFileSync(samplePath, copy);
+
+    const first = await textExtractor.extract(samplePath);
+    const second = await textExtractor.extract(copy);
+
+    expect(second).toBe(first);
+    expect(textExtractor.getStats().cache).toMatchObject({ hits: 1, misses: 1 });
+  });
+
+  it('deve agrupar extrações simultâneas do mesmo arquivo', async () => {
+    const [a, b] = await Promise.all([
+      textExtractor.extract(samplePath),
+      textExtractor.extract(samplePath)
+    ]);
+
+    expect(a).toBe(b);
+    expect(textExtractor.getStats().cache).toMatchObject({ misses: 1, coalesced: 1 });
+  });
+
+  it('deve manter as mensagens de formato não suportado', async () => {
+    await expect(textExtractor.extract('/tmp/cv.doc'))
+      .rejects.toThrow('Formato DOC não suportado no momento. Converta para PDF ou DOCX.');
+    await expect(textExtractor.extract('/tmp/cv.txt'))
+      .rejects.toThrow('Formato de arquivo não suportado.');
+  });
+
+  describe('TextExtractionPool', () => {
+    it('deve recusar extrações quando a fila estiver cheia', async () => {
+      const pool = new TextExtractionPool({ size: 1, maxQueue: 0 });
+      const buffer = fs.readFileSync(samplePath);
+
+      const first = pool.run(buffer, '.pdf');
+      await expect(pool.run(buffer, '.pdf')).rejects.toThrow('Servidor ocupado');
+      await expect(first).resolves.toEqual(expect.any(String));
+      expect(pool.getStats().rejected).toBe(1);
+
+      await pool.close();
+    });
+
+    it('deve encerrar o worker que exceder o tempo limite e continuar atendendo', async () => {
+      const pool = new TextExtractionPool({ size: 1, timeoutMs: 1 });
+      const buffer = fs.readFileSync(samplePath);
+
+      await expect(pool.run(buffer, '.pdf')).rejects.toThrow('Tempo limite excedido');
+      expect(pool.getStats()).toMatchObject({ timeouts: 1, workers: 0 });
+
+      pool.timeoutMs = 20000;
+      await expect(pool.run(buffer, '.pdf')).resolves.toEqual(expect.any(String));
+
+      await pool.close();
+    });
+
+    it('deve substituir o worker que encerra sem erro e atender a fila', async () => {
+      const pool = new TextExtractionPool({ size: 1 });
+      const buffer = fs.readFileSync(samplePath);
+
+      const first = pool.run(buffer, '.pdf');
+      const second = pool.run(buffer, '.pdf');
+      // Saída abrupta (como OOM ou process.exit no parser), sem evento 'error'
+      await pool.workers[0].terminate();
+
+      await expect(first).rejects.toThrow('Falha ao extrair texto');
+      await expect(second).resolves.toEqual(expect.any(String));
+      expect(pool.getStats()).toMatchObject({ failed: 1, completed: 1, workers: 1 });
+
+      await pool.close();
+    });
+
+    it('deve propagar erros de parsing do worker', async () => {
+      const pool = new TextExtractionPool({ size: 1 });
+
+      await expect(pool.run(Buffer.from('não é um pdf'), '.pdf')).rejects.toThrow();
+      expect(pool.getStats().failed).toBe(1);
+
+      await pool.close();
+    });
+  });
+});
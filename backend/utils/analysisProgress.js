@@ -0,0 +1,37 @@
+const { AsyncLocalStorage } = require('async_hooks');
+
+/**
+ * Contexto de progresso da análise ATS
+ *
+ * O executor de jobs roda a análise dentro de `run(listener, fn)`; os serviços
+ * chamam `stage(nome)` ao iniciar cada etapa sem precisar receber callbacks.
+ * Fora de um contexto (rota síncrona /analyze), `stage` não faz nada.
+ */
+
+const storage = new AsyncLocalStorage();
+
+// Etapas da análise e percentual aproximado ao iniciar cada uma
+const STAGES = {
+  extract: 5,
+  scrape: 15,
+  llm: 40,
+  verify: 80,
+  save: 90
+};
+
+function run(listener, fn) {
+  return storage.run(listener, fn);
+}
+
+function stage(name, details = {}) {
+  const listener = storage.getStore();
+  if (listener) {
+    listener(name, details);
+  }
+}
+
+module.exports = {
+  STAGES,
+  run,
+  stage
+};
@@ -0,0 +1,66 @@
+const zlib = require('zlib');
+const { promisify } = require('util');
+
+/**
+ * Armazenamento compacto das análises (AnalysisResults)
+ *
+ * - Colunas de resumo calculadas no salvamento (listagem sem ler o resultado)
+ * - Resultado e texto do currículo comprimidos com brotli em colunas BLOB,
+ *   descomprimidos apenas ao abrir uma análise específica
+ */
+
+const brotliCompress = promisify(zlib.brotliCompress);
+const brotliDecompress = promisify(zlib.brotliDecompress);
+const gunzip = promisify(zlib.gunzip);
+
+const COMPRESSION = 'br';
+
+// Qualidade 5: boa taxa para JSON/texto sem o custo da qualidade máxima (11)
+const BROTLI_OPTIONS = {
+    params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: 5,
+        [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT
+    }
+};
+
+/**
+ * Resumo exibido no histórico (mesmos critérios usados antes na listagem)
+ */
+function summarize(result, jobUrls) {
+    return {
+        jobCount: Array.isArray(jobUrls) ? jobUrls.length : 0,
+        hasCompatibilityScores: !!(result && result.jobs),
+        hasKeywords: !!(result && result.job_keywords),
+        hasEvaluations: !!(result && (result.resumo || result.idiomas))
+    };
+}
+
+async function compressText(text) {
+    if (text === null || text === undefined) return null;
+    return brotliCompress(Buffer.from(String(text)), BROTLI_OPTIONS);
+}
+
+async function decompressText(buffer, compression = COMPRESSION) {
+    if (!buffer) return null;
+    const data = compression === 'gzip' ? await gunzip(buffer) : await brotliDecompress(buffer);
+    return data.toString();
+}
+
+async function compressJSON(value) {
+    if (value === null || value === undefined) return null;
+    return compressText(JSON.stringify(value));
+}
+
+async function decompressJSON(buffer, compression = COMPRESSION) {
+    const text = await decompressText(buffer, compression);
+    return text === null ? null : JSON.parse(text);
+}
+
+module.exports = {
+    COMPRESSION,
+    summarize,
+    compressText,
+    decompressText,
+    compressJSON,
+    decompressJSON
+};
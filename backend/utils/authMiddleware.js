@@ -1,4 +1,6 @@
+const crypto = require('crypto');
 const jwt = require('jsonwebtoken');
+const { redactUrl } = require('./logger');
 
 // JWT_SECRET é obrigatório - sem fallback inseguro
 let JWT_SECRET = process.env.JWT_SECRET;
@@ -15,16 +17,16 @@ if (!JWT_SECRET) {
   process.exit(1);
 }
 
-module.exports = (req, res, next) => {
+const authMiddleware = (req, res, next) => {
   const authHeader = req.headers.authorization;
   if (!authHeader) {
-    console.log('[AUTH] ❌ Token não fornecido para:', req.url);
+    console.log('[AUTH] ❌ Token não fornecido para:', redactUrl(req.url));
     return res.status(401).json({ error: 'Token não fornecido.' });
   }
 
   const token = authHeader.split(' ')[1];
   if (!token) {
-    console.log('[AUTH] ❌ Token inválido ou não extraído para:', req.url);
+    console.log('[AUTH] ❌ Token inválido ou não extraído para:', redactUrl(req.url));
     return res.status(401).json({ error: 'Token inválido.' });
   }
 
@@ -33,7 +35,38 @@ module.exports = (req, res, next) => {
     req.user = decoded;
     next();
   } catch (err) {
-    console.log('[AUTH] ❌ Erro na verificação do token para:', req.url, '- Erro:', err.message);
+    console.log('[AUTH] ❌ Erro na verificação do token para:', redactUrl(req.url), '- Erro:', err.message);
     res.status(401).json({ error: 'Token inválido.' });
   }
 };
+
+// EventSource não envia cabeçalhos: o SSE de um job recebe na query string um
+// token curto e restrito àquele job, nunca o JWT de sessão. Assinado com chave
+// derivada, não é aceito pelo authMiddleware nas demais rotas.
+const JOB_EVENTS_SECRET = crypto.createHmac('sha256', JWT_SECRET).update('job-events').digest();
+const JOB_EVENTS_TOKEN_TTL = process.env.JOB_EVENTS_TOKEN_TTL || '30m';
+
+const signJobEventsToken = (userId, jobId) =>
+  jwt.sign({ id: userId, jobId }, JOB_EVENTS_SECRET, { expiresIn: JOB_EVENTS_TOKEN_TTL });
+
+const jobEventsAuth = (req, res, next) => {
+  if (req.headers.authorization) {
+    return authMiddleware(req, res, next);
+  }
+
+  try {
+    const decoded = jwt.verify(String(req.query.token || ''), JOB_EVENTS_SECRET);
+    if (decoded.jobId !== req.params.id) {
+      return res.status(401).json({ error: 'Token inválido.' });
+    }
+    req.user = { id: decoded.id };
+    next();
+  } catch (err) {
+    console.log('[AUTH] ❌ Token do SSE rejeitado para o job', req.params.id, '- Erro:', err.message);
+    res.status(401).json({ error: 'Token inválido.' });
+  }
+};
+
+module.exports = authMiddleware;
+module.exports.signJobEventsToken = signJobEventsToken;
+module.exports.jobEventsAuth = jobEventsAuth;
@@ -0,0 +1,90 @@
+const { Op } = require('sequelize');
+
+/**
+ * Utilitários para exportações grandes (CSV/JSON) enviadas direto na resposta
+ *
+ * - Leitura em lotes por keyset (id decrescente), sem carregar a tabela inteira
+ * - Escrita respeitando backpressure: aguarda 'drain' quando o buffer do socket enche
+ * - Interrompe a leitura se o cliente encerrar a conexão
+ */
+
+const DEFAULT_BATCH_SIZE = parseInt(process.env.EXPORT_BATCH_SIZE) || 500;
+
+/**
+ * Escreve um pedaço na resposta, aguardando 'drain' se necessário
+ */
+function write(res, chunk) {
+    if (res.destroyed || res.writableEnded) {
+        return Promise.reject(new Error('Conexão encerrada pelo cliente'));
+    }
+    if (res.write(chunk)) return Promise.resolve();
+
+    return new Promise((resolve, reject) => {
+        const cleanup = () => {
+            res.off('drain', onDrain);
+            res.off('close', onClose);
+        };
+        const onDrain = () => {
+            cleanup();
+            resolve();
+        };
+        const onClose = () => {
+            cleanup();
+            reject(new Error('Conexão encerrada pelo cliente'));
+        };
+        res.on('drain', onDrain);
+        res.on('close', onClose);
+    });
+}
+
+/**
+ * Itera um modelo em lotes, do id mais recente para o mais antigo
+ * @param {Model} model - Modelo Sequelize com chave primária inteira `id`
+ * @param {Object} options - Opções do findAll (where, attributes, include...)
+ */
+async function* batches(model, { where = {}, batchSize = DEFAULT_BATCH_SIZE, ...options } = {}) {
+    let lastId = null;
+
+    for (; ;) {
+        const rows = await model.findAll({
+            ...options,
+            where: lastId === null ? where : { [Op.and]: [where, { id: { [Op.lt]: lastId } }] },
+            order: [['id', 'DESC']],
+            limit: batchSize
+        });
+
+        if (rows.length > 0) yield rows;
+        if (rows.length < batchSize) return;
+
+        lastId = rows[rows.length - 1].id;
+    }
+}
+
+/**
+ * Linha CSV com escape de vírgulas, aspas e quebras de linha
+ */
+function csvLine(fields) {
+    return fields.map(field => {
+        const value = field === null || field === undefined ? '' : String(field);
+        return /[",\r\n]/.test(value) ? `"${value.replace(/"/g, '""')}"` : value;
+    }).join(',') + '\n';
+}
+
+/**
+ * Tratamento de erro: JSON 500 se nada foi enviado, senão aborta a conexão
+ */
+function fail(res, error, message) {
+    if (!res.headersSent) {
+        res.status(500).json({ error: message });
+    } else if (!res.destroyed) {
+        res.destroy(error);
+    }
+}
+
+module.exports = {
+    DEFAULT_BATCH_SIZE,
+    write,
+    batches,
+    csvLine,
+    fail
+};
@@ -0,0 +1,184 @@
+const EventEmitter = require('events');
+const Agent = require('agentkeepalive');
+const scrapingConfig = require('../config/scraping');
+
+/**
+ * Agendador de downloads de vagas
+ *
+ * - Fila compartilhada: qualquer slot livre "rouba" o próximo item cujo host
+ *   esteja liberado (sem lotes fixos nem bloqueio pela URL mais lenta)
+ * - Limite de concorrência e intervalo de cortesia por host no lugar da pausa global
+ * - Timeout por URL (AbortSignal) e prazo total que devolve resultados parciais
+ * - Agentes HTTP keep-alive reutilizados entre requisições
+ */
+
+const httpAgent = new Agent(scrapingConfig.scheduler.keepAlive);
+const httpsAgent = new Agent.HttpsAgent(scrapingConfig.scheduler.keepAlive);
+
+function hostOf(url) {
+    try {
+        return new URL(url).host.toLowerCase();
+    } catch (error) {
+        return 'invalid';
+    }
+}
+
+class FetchScheduler extends EventEmitter {
+    constructor(config = scrapingConfig.scheduler) {
+        super();
+        this.setMaxListeners(0);
+        this.config = config;
+        // Estado por host compartilhado entre análises simultâneas do processo
+        this.hosts = new Map();
+    }
+
+    hostState(host) {
+        if (!this.hosts.has(host)) {
+            this.hosts.set(host, { active: 0, lastStart: 0 });
+        }
+        return this.hosts.get(host);
+    }
+
+    /**
+     * Tempo (ms) até o host aceitar um novo download; Infinity se sem slot livre
+     */
+    hostWait(host, now) {
+        const state = this.hostState(host);
+        if (state.active >= this.config.perHostConcurrency) return Infinity;
+        return Math.max(0, state.lastStart + this.config.perHostIntervalMs - now);
+    }
+
+    acquireHost(host) {
+        const state = this.hostState(host);
+        state.active++;
+        state.lastStart = Date.now();
+    }
+
+    releaseHost(host) {
+        const state = this.hostState(host);
+        state.active = Math.max(0, state.active - 1);
+        if (state.active === 0 && Date.now() - state.lastStart > this.config.perHostIntervalMs) {
+            this.hosts.delete(host);
+        }
+        this.emit('release', host);
+    }
+
+    /**
+     * Executa worker(url, { signal, timeoutMs, index }) para cada URL
+     * @param {string[]} urls
+     * @param {Function} worker
+     * @param {{concurrency?: number, urlTimeoutMs?: number, deadlineMs?: number}} options
+     * @returns {Promise<{results: Object[], timedOut: boolean, elapsedMs: number}>}
+     *   results[i] = { status: 'fulfilled'|'rejected'|'timeout', value?, reason? } na ordem de entrada
+     */
+    run(urls, worker, options = {}) {
+        const concurrency = options.concurrency || this.config.concurrency;
+        const urlTimeoutMs = options.urlTimeoutMs || this.config.urlTimeoutMs;
+        const deadlineMs = options.deadlineMs || this.config.deadlineMs;
+
+        const startedAt = Date.now();
+        const queue = urls.map((url, index) => ({ url, index, host: hostOf(url) }));
+        const results = new Array(urls.length);
+        const controllers = new Set();
+
+        return new Promise(resolve => {
+            let active = 0;
+            let finished = false;
+            let wakeTimer = null;
+
+            const finish = (timedOut) => {
+                if (finished) return;
+                finished = true;
+                clearTimeout(deadlineTimer);
+                clearTimeout(wakeTimer);
+                this.removeListener('release', pump);
+                controllers.forEach(controller => controller.abort());
+
+                for (let i = 0; i < results.length; i++) {
+                    if (!results[i]) {
+                        results[i] = {
+                            status: 'timeout',
+                            reason: new Error(`Prazo total de ${deadlineMs}ms excedido`)
+                        };
+                    }
+                }
+
+                resolve({ results, timedOut, elapsedMs: Date.now() - startedAt });
+            };
+
+            const start = (item) => {
+                active++;
+                this.acquireHost(item.host);
+
+                const controller = new AbortController();
+                controllers.add(controller);
+
+                let urlTimer;
+                const timeout = new Promise((_, reject) => {
+                    urlTimer = setTimeout(() => {
+                        controller.abort();
+                        reject(new Error(`Timeout de ${urlTimeoutMs}ms excedido`));
+                    }, urlTimeoutMs);
+                });
+
+                const task = Promise.resolve()
+                    .then(() => worker(item.url, { signal: controller.signal, timeoutMs: urlTimeoutMs, index: item.index }));
+
+                Promise.race([task, timeout])
+                    .then(
+                        value => { if (!finished) results[item.index] = { status: 'fulfilled', value }; },
+                        reason => { if (!finished) results[item.index] = { status: 'rejected', reason }; }
+                    )
+                    .finally(() => {
+                        clearTimeout(urlTimer);
+                        controllers.delete(controller);
+                        active--;
+                        // releaseHost dispara 'release', que chama pump desta e de outras execuções
+                        this.releaseHost(item.host);
+                    });
+            };
+
+            const pump = () => {
+                if (finished) return;
+                if (queue.length === 0 && active === 0) return finish(false);
+
+                clearTimeout(wakeTimer);
+                wakeTimer = null;
+
+                let nextWake = Infinity;
+                while (active < concurrency && queue.length > 0) {
+                    const now = Date.now();
+                    let picked = -1;
+
+                    for (let i = 0; i < queue.length; i++) {
+                        const wait = this.hostWait(queue[i].host, now);
+                        if (wait === 0) {
+                            picked = i;
+                            break;
+                        }
+                        nextWake = Math.min(nextWake, wait);
+                    }
+
+                    if (picked === -1) break;
+                    start(queue.splice(picked, 1)[0]);
+                }
+
+                // Host em intervalo de cortesia: acordar quando liberar
+                if (queue.length > 0 && active < concurrency && nextWake !== Infinity) {
+                    wakeTimer = setTimeout(pump, nextWake);
+                }
+            };
+
+            const deadlineTimer = setTimeout(() => finish(true), deadlineMs);
+            this.on('release', pump);
+            pump();
+        });
+    }
+}
+
+const fetchScheduler = new FetchScheduler();
+
+module.exports = fetchScheduler;
+module.exports.FetchScheduler = FetchScheduler;
+module.exports.httpAgent = httpAgent;
+module.exports.httpsAgent = httpsAgent;
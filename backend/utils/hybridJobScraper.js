@@ -1,5 +1,8 @@
 const relevantJobScraper = require('./relevantJobScraper');
+const scrapeCache = require('./scrapeCache');
+const fetchScheduler = require('./fetchScheduler');
 const scrapingConfig = require('../config/scraping');
+const metrics = require('./metrics');
 
 /**
  * Scraper Híbrido Simplificado - Apenas Legacy
@@ -27,6 +30,7 @@ class HybridJobScraper {
      */
     async scrapeJobUrl(url, options = {}) {
         const startTime = Date.now();
+        const endSpan = metrics.startSpan('scrape_url');
         this.stats.totalRequests++;
 
         try {
@@ -61,6 +65,7 @@ class HybridJobScraper {
             // Processar e retornar resultado final
             const duration = Date.now() - startTime;
             this.updateStats(duration);
+            endSpan('ok');
 
             const finalResult = {
                 ...result,
@@ -79,6 +84,7 @@ class HybridJobScraper {
         } catch (error) {
             const duration = Date.now() - startTime;
             this.updateStats(duration);
+            endSpan('error');
 
             console.error(`[HybridScraper] 💥 Erro completo para ${url}:`, error.message);
             throw error;
@@ -87,52 +93,77 @@ class HybridJobScraper {
 
     /**
      * Processar múltiplas URLs
+     * Cache fresco é servido direto; só as demais passam pelo fetchScheduler
+     * (pool com limites por host, timeout por URL e prazo total: URLs não
+     * concluídas no prazo entram como erro, resultado parcial)
      */
     async extractMultiple(urls, options = {}) {
         try {
             console.log(`[HybridScraper] 🚀 Processamento em lote: ${urls.length} URLs`);
-
-            const results = [];
-            const concurrency = options.concurrency || 3;
-
-            // Processar URLs em lotes com controle de concorrência
-            for (let i = 0; i < urls.length; i += concurrency) {
-                const batch = urls.slice(i, i + concurrency);
-                console.log(`[HybridScraper] Processando lote ${Math.floor(i / concurrency) + 1}: ${batch.length} URLs`);
-
-                const batchPromises = batch.map(async (url, index) => {
-                    try {
-                        const globalIndex = i + index + 1;
-                        console.log(`[HybridScraper] ${globalIndex}/${urls.length}: ${url}`);
-
-                        const result = await this.scrapeJobUrl(url, options);
-                        return {
-                            ...result,
-                            url: url,
-                            index: globalIndex,
-                            success: true
-                        };
-                    } catch (error) {
-                        console.error(`[HybridScraper] Erro na URL ${url}:`, error.message);
-                        return {
-                            url: url,
-                            error: error.message,
-                            success: false,
-                            index: i + index + 1
-                        };
-                    }
-                });
-
-                const batchResults = await Promise.all(batchPromises);
-                results.push(...batchResults);
-
-                // Pausa entre lotes
-                if (i + concurrency < urls.length) {
-                    await new Promise(resolve => setTimeout(resolve, 1000));
+            const startedAt = Date.now();
+
+            // Consulta o cache antes de agendar: hits não ocupam slot nem intervalo do host
+            const lookups = await Promise.all(urls.map(url => scrapeCache.lookup(url).catch(() => null)));
+            const outcomes = new Array(urls.length);
+            const isFresh = (i) => Boolean(lookups[i] && lookups[i].fresh);
+            const pending = urls.map((url, i) => i).filter(i => !isFresh(i));
+
+            const serveCached = Promise.all(urls.map(async (url, i) => {
+                if (!isFresh(i)) return;
+                try {
+                    outcomes[i] = { status: 'fulfilled', value: await this.scrapeJobUrl(url, { ...options, cached: lookups[i] }) };
+                } catch (reason) {
+                    outcomes[i] = { status: 'rejected', reason };
+                }
+            }));
+
+            const scheduled = pending.length === 0 ? { results: [], timedOut: false } : fetchScheduler.run(
+                pending.map(i => urls[i]),
+                (url, { signal, timeoutMs, index }) => {
+                    const i = pending[index];
+                    console.log(`[HybridScraper] ${i + 1}/${urls.length}: ${url}`);
+                    return this.scrapeJobUrl(url, { ...options, signal, timeoutMs, cached: lookups[i] });
+                },
+                {
+                    concurrency: options.concurrency,
+                    urlTimeoutMs: options.urlTimeoutMs,
+                    deadlineMs: options.deadlineMs
                 }
+            );
+
+            const [, { results: fetched, timedOut }] = await Promise.all([serveCached, scheduled]);
+            fetched.forEach((outcome, index) => { outcomes[pending[index]] = outcome; });
+            const elapsedMs = Date.now() - startedAt;
+
+            const results = outcomes.map((outcome, i) => {
+                if (outcome.status === 'fulfilled') {
+                    return {
+                        ...outcome.value,
+                        url: urls[i],
+                        index: i + 1,
+                        success: true
+                    };
+                }
+
+                console.error(`[HybridScraper] Erro na URL ${urls[i]}:`, outcome.reason.message);
+                return {
+                    url: urls[i],
+                    error: outcome.reason.message,
+                    success: false,
+                    timedOut: outcome.status === 'timeout',
+                    index: i + 1
+                };
+            });
+
+            if (timedOut) {
+                console.warn(`[HybridScraper] ⏱️ Prazo total excedido após ${elapsedMs}ms, retornando resultados parciais`);
             }
 
-            return this.formatBatchResults(results);
+            return {
+                ...this.formatBatchResults(results),
+                partial: timedOut,
+                elapsedMs
+            };
 
         } catch (error) {
             console.error('[HybridScraper] Erro no processamento em lote:', error);
@@ -142,10 +173,12 @@ class HybridJobScraper {
 
     /**
      * Scraping com sistema legacy
+     * Consulta o cache antes da rede; entradas vencidas são revalidadas
+     * com ETag/Last-Modified e links mortos ficam em cache negativo
      */
     async scrapeWithLegacy(url, options = {}) {
         try {
-            const extractedText = await relevantJobScraper.extractRelevantSections(url);
+            const extractedText = await this.fetchLegacyText(url, options);
 
             if (typeof extractedText !== 'string') {
                 throw new Error('Resultado inválido do scraper legacy');
@@ -170,6 +203,61 @@ class HybridJobScraper {
         }
     }
 
+    /**
+     * Obter texto da vaga via cache ou rede
+     * Falhas transitórias (timeout, 5xx) servem a entrada vencida se houver;
+     * sem cache retornam '' (mesmo comportamento do extractRelevantSections)
+     */
+    async fetchLegacyText(url, options = {}) {
+        // options.cached: consulta já feita pelo extractMultiple (null = miss)
+        const cached = options.cached !== undefined ? options.cached : await scrapeCache.lookup(url);
+
+        if (cached && cached.fresh) {
+            console.log(`[HybridScraper] 💾 Cache hit${cached.entry.dead ? ' (link morto)' : ''}: ${url}`);
+            return cached.entry.content;
+        }
+
+        const validators = cached && !cached.entry.dead
+            ? { etag: cached.entry.etag, lastModified: cached.entry.lastModified }
+            : {};
+
+        try {
+            const page = await relevantJobScraper.fetchRelevantSections(url, validators, {
+                signal: options.signal,
+                timeoutMs: options.timeoutMs
+            });
+
+            if (page.notModified) {
+                console.log(`[HybridScraper] 💾 Revalidado (304): ${url}`);
+                await scrapeCache.revalidated(url, cached.entry);
+                return cached.entry.content;
+            }
+
+            // Extração vazia (página fora do ar, layout novo) não vira entrada fresca
+            if (!page.text || !page.text.trim()) {
+                if (cached && !cached.entry.dead) return cached.entry.content;
+                return '';
+            }
+
+            await scrapeCache.store(url, {
+                content: page.text,
+                etag: page.etag,
+                lastModified: page.lastModified
+            });
+            return page.text;
+
+        } catch (error) {
+            if (error.isDeadLink) {
+                await scrapeCache.storeDead(url, error.response ? `HTTP ${error.response.status}` : error.code);
+            } else if (cached && !cached.entry.dead) {
+                console.warn(`[HybridScraper] ⚠️ Falha ao revalidar ${url} (${error.message}), usando cache vencido`);
+                return cached.entry.content;
+            }
+            console.error(`[HybridScraper] Falha ao baixar ${url}:`, error.message);
+            return '';
+        }
+    }
+
     /**
      * Validar se o resultado legacy tem informações essenciais
      */
@@ -286,9 +374,11 @@ class HybridJobScraper {
                 status: 'ready',
                 strategy: 'legacy_only',
                 components: {
-                    legacy: true
+                    legacy: true,
+                    cache: scrapeCache.config.enabled
                 },
                 stats: stats,
+                cache: scrapeCache.getStats(),
                 timestamp: new Date().toISOString()
             };
 
@@ -0,0 +1,244 @@
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+
+/**
+ * Cache de respostas dos LLMs (OpenAI/Claude) para a análise ATS
+ *
+ * - Chave determinística: hash de modelo + versão do prompt + entradas normalizadas
+ * - Armazenamento em disco (um arquivo JSON por chave, escrita atômica via rename),
+ *   com LRU limitado por bytes e TTL
+ * - Single-flight: requisições idênticas simultâneas compartilham uma única chamada
+ */
+
+const DEFAULT_DIR = path.join(__dirname, '..', 'database', 'llm-cache');
+
+/**
+ * Normaliza texto de entrada para a chave (espaços, quebras de linha, Unicode)
+ */
+function normalizeInput(text) {
+    return String(text || '')
+        .normalize('NFC')
+        .replace(/\s+/g, ' ')
+        .trim();
+}
+
+/**
+ * Gera a chave de cache
+ * @param {Object} parts - { model, promptVersion, inputs: [] }
+ */
+function buildKey({ model, promptVersion, inputs = [] }) {
+    const hash = crypto.createHash('sha256');
+    hash.update(String(model));
+    hash.update('\u0000');
+    hash.update(String(promptVersion));
+    inputs.forEach(input => {
+        hash.update('\u0000');
+        hash.update(normalizeInput(input));
+    });
+    return hash.digest('hex');
+}
+
+class LlmCache {
+    constructor(options = {}) {
+        this.enabled = options.enabled !== undefined
+            ? options.enabled
+            : (process.env.LLM_CACHE_ENABLED
+                ? process.env.LLM_CACHE_ENABLED === 'true'
+                : process.env.NODE_ENV !== 'test');
+        this.dir = options.dir || process.env.LLM_CACHE_DIR || DEFAULT_DIR;
+        this.maxBytes = options.maxBytes || parseInt(process.env.LLM_CACHE_MAX_BYTES) || 50 * 1024 * 1024;
+        this.ttlMs = options.ttlMs || parseInt(process.env.LLM_CACHE_TTL_MS) || 7 * 24 * 60 * 60 * 1000;
+
+        // Índice em memória (ordem de inserção = LRU): key -> { size, accessedAt }
+        this.index = new Map();
+        this.bytes = 0;
+        this.loading = null;
+        this.inFlight = new Map();
+        this.stats = { hits: 0, misses: 0, coalesced: 0, stores: 0, evictions: 0, errors: 0 };
+    }
+
+    filePath(key) {
+        return path.join(this.dir, `${key}.json`);
+    }
+
+    /**
+     * Carrega o índice a partir do diretório (uma vez por processo)
+     */
+    load() {
+        if (!this.loading) {
+            this.loading = (async () => {
+                await fs.promises.mkdir(this.dir, { recursive: true });
+                const files = (await fs.promises.readdir(this.dir)).filter(file => file.endsWith('.json'));
+                const entries = await Promise.all(files.map(async file => {
+                    try {
+                        const stat = await fs.promises.stat(path.join(this.dir, file));
+                        return { key: file.slice(0, -5), size: stat.size, accessedAt: stat.mtimeMs };
+                    } catch (error) {
+                        return null;
+                    }
+                }));
+
+                entries
+                    .filter(Boolean)
+                    .sort((a, b) => a.accessedAt - b.accessedAt)
+                    .forEach(({ key, size, accessedAt }) => {
+                        this.index.set(key, { size, accessedAt });
+                        this.bytes += size;
+                    });
+
+                await this.evict();
+            })().catch(error => {
+                console.error('[LLMCache] Erro ao carregar índice:', error.message);
+                this.stats.errors++;
+            });
+        }
+        return this.loading;
+    }
+
+    async get(key) {
+        await this.load();
+        const meta = this.index.get(key);
+        if (!meta) return null;
+
+        try {
+            const entry = JSON.parse(await fs.promises.readFile(this.filePath(key), 'utf8'));
+            if (Date.now() - entry.createdAt > this.ttlMs) {
+                await this.remove(key);
+                return null;
+            }
+
+            // LRU: mover para o final e registrar o acesso no arquivo (sobrevive a restart)
+            const now = Date.now();
+            this.index.delete(key);
+            this.index.set(key, { size: meta.size, accessedAt: now });
+            fs.promises.utimes(this.filePath(key), new Date(now), new Date(now)).catch(() => { });
+
+            return entry;
+        } catch (error) {
+            // Arquivo removido por outro processo ou corrompido
+            await this.remove(key);
+            return null;
+        }
+    }
+
+    async set(key, entry) {
+        await this.load();
+        const data = JSON.stringify({ ...entry, createdAt: Date.now() });
+        const size = Buffer.byteLength(data);
+        if (size > this.maxBytes) return;
+
+        const target = this.filePath(key);
+        const tmp = `${target}.${process.pid}.${Date.now()}.tmp`;
+        try {
+            await fs.promises.writeFile(tmp, data);
+            await fs.promises.rename(tmp, target);
+        } catch (error) {
+            console.error('[LLMCache] Erro ao gravar entrada:', error.message);
+            this.stats.errors++;
+            fs.promises.unlink(tmp).catch(() => { });
+            return;
+        }
+
+        const previous = this.index.get(key);
+        if (previous) {
+            this.bytes -= previous.size;
+            this.index.delete(key);
+        }
+        this.index.set(key, { size, accessedAt: Date.now() });
+        this.bytes += size;
+        this.stats.stores++;
+
+        await this.evict();
+    }
+
+    async remove(key) {
+        const meta = this.index.get(key);
+        if (meta) {
+            this.index.delete(key);
+            this.bytes -= meta.size;
+        }
+        await fs.promises.unlink(this.filePath(key)).catch(() => { });
+    }
+
+    async evict() {
+        while (this.bytes > this.maxBytes && this.index.size > 0) {
+            const oldest = this.index.keys().next().value;
+            await this.remove(oldest);
+            this.stats.evictions++;
+        }
+    }
+
+    /**
+     * Retorna a resposta em cache ou executa `compute` uma única vez por chave
+     * @param {string} key
+     * @param {Function} compute - async () => value (serializável em JSON)
+     * @param {Object} meta - metadados gravados junto (modelo, tokens estimados...)
+     * @returns {Promise<{value: *, source: 'cache'|'coalesced'|'upstream'}>}
+     */
+    async getOrCompute(key, compute, meta = {}) {
+        if (!this.enabled) {
+            return { value: await compute(), source: 'upstream' };
+        }
+
+        if (this.inFlight.has(key)) {
+            this.stats.coalesced++;
+            const value = await this.inFlight.get(key);
+            return { value: clone(value), source: 'coalesced' };
+        }
+
+        const promise = (async () => {
+            const cached = await this.get(key);
+            if (cached) {
+                this.stats.hits++;
+                return { value: cached.value, source: 'cache' };
+            }
+
+            this.stats.misses++;
+            const value = await compute();
+            await this.set(key, { ...meta, value });
+            return { value, source: 'upstream' };
+        })();
+
+        // Os demais aguardam apenas o valor; cada chamador recebe sua própria cópia
+        const valuePromise = promise.then(result => result.value);
+        valuePromise.catch(() => { });
+        this.inFlight.set(key, valuePromise);
+
+        try {
+            const result = await promise;
+            return { value: clone(result.value), source: result.source };
+        } finally {
+            this.inFlight.delete(key);
+        }
+    }
+
+    getStats() {
+        const lookups = this.stats.hits + this.stats.misses;
+        return {
+            enabled: this.enabled,
+            ...this.stats,
+            hitRate: lookups > 0 ? Math.round((this.stats.hits / lookups) * 100) : 0,
+            entries: this.index.size,
+            bytes: this.bytes,
+            maxBytes: this.maxBytes
+        };
+    }
+
+    async clear() {
+        await this.load();
+        await Promise.all([...this.index.keys()].map(key => this.remove(key)));
+        this.bytes = 0;
+    }
+}
+
+function clone(value) {
+    return value === undefined ? value : JSON.parse(JSON.stringify(value));
+}
+
+const llmCache = new LlmCache();
+
+module.exports = llmCache;
+module.exports.LlmCache = LlmCache;
+module.exports.buildKey = buildKey;
+module.exports.normalizeInput = normalizeInput;
@@ -69,6 +69,9 @@ if (process.env.NODE_ENV === 'production') {
     }));
 }
 
+// Remove tokens da query string (ex.: ?token= do SSE) antes de logar a URL
+const redactUrl = (url = '') => url.replace(/([?&]token=)[^&]*/gi, '$1[REDACTED]');
+
 // Middleware para logar requests HTTP
 const logRequest = (req, res, next) => {
     const start = Date.now();
@@ -77,7 +80,7 @@ const logRequest = (req, res, next) => {
         const duration = Date.now() - start;
         logger.info('HTTP Request', {
             method: req.method,
-            url: req.url,
+            url: redactUrl(req.url),
             status: res.statusCode,
             duration: `${duration}ms`,
             ip: req.ip,
@@ -94,7 +97,7 @@ const logError = (err, req, res, next) => {
         error: err.message,
         stack: err.stack,
         method: req.method,
-        url: req.url,
+        url: redactUrl(req.url),
         ip: req.ip,
         userAgent: req.get('User-Agent')
     });
@@ -105,5 +108,6 @@ const logError = (err, req, res, next) => {
 module.exports = {
     logger,
     logRequest,
-    logError
+    logError,
+    redactUrl
 }; 
\ No newline at end of file
@@ -0,0 +1,356 @@
+const EventEmitter = require('events');
+const cluster = require('cluster');
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+/**
+ * Métricas do processo no formato de exposição do Prometheus (GET /metrics)
+ *
+ * - span(etapa, fn): duração das etapas da análise ATS, histograma por etapa e resultado
+ * - counter(nome): contadores simples (ex.: retentativas do LLM)
+ * - gauges de runtime lidos a cada coleta: atraso do event loop e memória
+ *
+ * Cada span concluído também é emitido como evento 'span' (o benchmark usa
+ * para calcular percentis exatos). As métricas são por processo: no modo
+ * cluster, collect() pede ao primário a exposição de todos os workers
+ * (label worker), já que o scrape cai em um worker qualquer.
+ */
+
+const PREFIX = 'cvsf_';
+const LOOP_RESOLUTION_MS = 10;
+const DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120];
+const COLLECT_TIMEOUT_MS = 2000;
+
+function escapeLabel(value) {
+    return String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+}
+
+function formatLabels(labels) {
+    const entries = Object.entries(labels);
+    if (!entries.length) return '';
+    return `{${entries.map(([name, value]) => `${name}="${escapeLabel(value)}"`).join(',')}}`;
+}
+
+function header(name, help, type) {
+    return [`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`];
+}
+
+class Histogram {
+    constructor(name, help, buckets = DURATION_BUCKETS) {
+        this.name = name;
+        this.help = help;
+        this.buckets = buckets;
+        this.series = new Map();
+    }
+
+    observe(labels, value) {
+        const key = formatLabels(labels);
+        let series = this.series.get(key);
+        if (!series) {
+            series = { labels, counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0 };
+            this.series.set(key, series);
+        }
+
+        const index = this.buckets.findIndex(bound => value <= bound);
+        if (index !== -1) series.counts[index]++;
+        series.sum += value;
+        series.count++;
+    }
+
+    render(constLabels = {}) {
+        const lines = header(this.name, this.help, 'histogram');
+        for (const series of this.series.values()) {
+            const labels = { ...constLabels, ...series.labels };
+            let cumulative = 0;
+            this.buckets.forEach((bound, i) => {
+                cumulative += series.counts[i];
+                lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: bound })} ${cumulative}`);
+            });
+            lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${series.count}`);
+            lines.push(`${this.name}_sum${formatLabels(labels)} ${series.sum}`);
+            lines.push(`${this.name}_count${formatLabels(labels)} ${series.count}`);
+        }
+        return lines;
+    }
+}
+
+class Counter {
+    constructor(name, help) {
+        this.name = name;
+        this.help = help;
+        this.series = new Map();
+    }
+
+    inc(labels = {}, amount = 1) {
+        const key = formatLabels(labels);
+        const series = this.series.get(key) || { labels, value: 0 };
+        series.value += amount;
+        this.series.set(key, series);
+    }
+
+    render(constLabels = {}) {
+        const lines = header(this.name, this.help, 'counter');
+        for (const series of this.series.values()) {
+            lines.push(`${this.name}${formatLabels({ ...constLabels, ...series.labels })} ${series.value}`);
+        }
+        return lines;
+    }
+}
+
+class Metrics extends EventEmitter {
+    constructor() {
+        super();
+        this.stageDuration = new Histogram(`${PREFIX}stage_duration_seconds`, 'Duração das etapas da análise ATS');
+        this.counters = new Map();
+        this.collectSequence = 0;
+
+        // Amostragem nativa do atraso do event loop (sem timers no event loop)
+        this.loopDelay = monitorEventLoopDelay({ resolution: LOOP_RESOLUTION_MS });
+        this.loopDelay.enable();
+    }
+
+    counter(name, help) {
+        const fullName = PREFIX + name;
+        if (!this.counters.has(fullName)) {
+            this.counters.set(fullName, new Counter(fullName, help));
+        }
+        return this.counters.get(fullName);
+    }
+
+    /**
+     * Inicia a medição de uma etapa
+     * @returns {(outcome?: string) => number} encerra o span (uma vez) e retorna a duração em ms
+     */
+    startSpan(stage, labels = {}) {
+        const start = process.hrtime.bigint();
+        let ended = false;
+
+        return (outcome = 'ok') => {
+            if (ended) return 0;
+            ended = true;
+
+            const durationMs = Number(process.hrtime.bigint() - start) / 1e6;
+            this.stageDuration.observe({ stage, ...labels, outcome }, durationMs / 1000);
+            this.emit('span', { stage, labels, outcome, durationMs });
+            return durationMs;
+        };
+    }
+
+    /**
+     * Mede `fn` (síncrona ou assíncrona); erros são registrados com outcome "error"
+     */
+    span(stage, fn, labels) {
+        const end = this.startSpan(stage, labels);
+        let result;
+        try {
+            result = fn();
+        } catch (error) {
+            end('error');
+            throw error;
+        }
+
+        if (result && typeof result.then === 'function') {
+            return result.then(
+                value => { end('ok'); return value; },
+                error => { end('error'); throw error; }
+            );
+        }
+        end('ok');
+        return result;
+    }
+
+    /**
+     * Envolve um middleware Express (ex.: upload do multer) medindo até ele chamar next
+     */
+    timed(stage, middleware) {
+        return (req, res, next) => {
+            const end = this.startSpan(stage);
+            middleware(req, res, (error) => {
+                end(error ? 'error' : 'ok');
+                next(error);
+            });
+        };
+    }
+
+    /**
+     * Atraso do event loop (ms, desde o último reset) e memória do processo
+     */
+    runtime() {
+        const delay = this.loopDelay;
+        // O histograma mede o intervalo entre amostras: desconta a resolução
+        const toMs = ns => Math.max(0, ns / 1e6 - LOOP_RESOLUTION_MS);
+        const memory = process.memoryUsage();
+
+        return {
+            eventLoopLag: delay.count
+                ? { p50: toMs(delay.percentile(50)), p90: toMs(delay.percentile(90)), p99: toMs(delay.percentile(99)), max: toMs(delay.max) }
+                : { p50: 0, p90: 0, p99: 0, max: 0 },
+            memory: {
+                heapUsed: memory.heapUsed,
+                heapTotal: memory.heapTotal,
+                external: memory.external,
+                rss: memory.rss
+            }
+        };
+    }
+
+    /**
+     * Texto no formato de exposição do Prometheus
+     * O atraso do event loop é reiniciado a cada coleta (janela = intervalo de scrape)
+     * @param {object} constLabels - labels adicionados a todas as séries (ex.: worker)
+     */
+    render(constLabels = {}) {
+        const { eventLoopLag, memory } = this.runtime();
+        this.loopDelay.reset();
+
+        const lagName = `${PREFIX}event_loop_lag_seconds`;
+        const lines = [
+            ...header(lagName, 'Atraso do event loop desde a última coleta', 'gauge'),
+            ...[['0.5', eventLoopLag.p50], ['0.9', eventLoopLag.p90], ['0.99', eventLoopLag.p99]]
+                .map(([quantile, ms]) => `${lagName}${formatLabels({ ...constLabels, quantile })} ${ms / 1000}`),
+            ...header(`${PREFIX}event_loop_lag_max_seconds`, 'Maior atraso do event loop desde a última coleta', 'gauge'),
+            `${PREFIX}event_loop_lag_max_seconds${formatLabels(constLabels)} ${eventLoopLag.max / 1000}`
+        ];
+
+        const gauges = [
+            ['heap_used_bytes', 'Heap V8 em uso', memory.heapUsed],
+            ['heap_total_bytes', 'Heap V8 reservado', memory.heapTotal],
+            ['external_memory_bytes', 'Memória externa (Buffers)', memory.external],
+            ['resident_memory_bytes', 'Memória residente do processo', memory.rss],
+            ['uptime_seconds', 'Tempo desde o início do processo', process.uptime()]
+        ];
+        for (const [name, help, value] of gauges) {
+            lines.push(...header(PREFIX + name, help, 'gauge'), `${PREFIX}${name}${formatLabels(constLabels)} ${value}`);
+        }
+
+        lines.push(...this.stageDuration.render(constLabels));
+        for (const counter of this.counters.values()) {
+            lines.push(...counter.render(constLabels));
+        }
+        return lines.join('\n') + '\n';
+    }
+
+    /**
+     * Exposição para o scrape: no worker do cluster, a de todos os workers
+     * (via primário); se o primário não responder, apenas a deste worker
+     */
+    collect(timeoutMs = COLLECT_TIMEOUT_MS + 1000) {
+        if (!cluster.isWorker || !process.send) {
+            return Promise.resolve(this.render());
+        }
+
+        const id = `${process.pid}:${++this.collectSequence}`;
+        return new Promise(resolve => {
+            const onMessage = (message) => {
+                if (!message || message.type !== 'metrics:collect:reply' || message.id !== id) return;
+                finish(message.text);
+            };
+            const finish = (text) => {
+                clearTimeout(timer);
+                process.off('message', onMessage);
+                resolve(text || this.render(workerLabels()));
+            };
+            const timer = setTimeout(() => finish(null), timeoutMs);
+
+            process.on('message', onMessage);
+            process.send({ type: 'metrics:collect', id });
+        });
+    }
+
+    reset() {
+        this.stageDuration.series.clear();
+        this.counters.forEach(counter => counter.series.clear());
+        this.loopDelay.reset();
+    }
+}
+
+function workerLabels() {
+    return { worker: String(cluster.worker.id) };
+}
+
+/**
+ * Junta exposições de vários processos agrupando as séries por métrica
+ * (o formato exige HELP/TYPE uma vez e as amostras de cada métrica juntas)
+ */
+function mergeExpositions(texts) {
+    const families = new Map();
+
+    for (const text of texts) {
+        let family = null;
+        for (const line of text.split('\n')) {
+            if (!line) continue;
+
+            const meta = line.match(/^# (HELP|TYPE) (\S+)/);
+            if (meta) {
+                if (!families.has(meta[2])) families.set(meta[2], { HELP: null, TYPE: null, samples: [] });
+                family = families.get(meta[2]);
+                family[meta[1]] = family[meta[1]] || line;
+            } else if (family) {
+                family.samples.push(line);
+            }
+        }
+    }
+
+    const lines = [];
+    for (const family of families.values()) {
+        lines.push(...[family.HELP, family.TYPE].filter(Boolean), ...family.samples);
+    }
+    return lines.join('\n') + '\n';
+}
+
+/**
+ * No primário (cluster.js): atende 'metrics:collect' pedindo a exposição de cada
+ * worker e devolvendo a junção ao worker que recebeu o scrape
+ */
+function servePrimary(clusterModule = cluster, timeoutMs = COLLECT_TIMEOUT_MS) {
+    const pending = new Map();
+    let sequence = 0;
+
+    clusterModule.on('message', (worker, message) => {
+        if (!message) return;
+
+        if (message.type === 'metrics:render:reply') {
+            const collection = pending.get(message.id);
+            if (!collection) return;
+            collection.texts.push(message.text);
+            if (collection.texts.length === collection.expected) collection.finish();
+            return;
+        }
+
+        if (message.type !== 'metrics:collect') return;
+
+        const workers = Object.values(clusterModule.workers).filter(target => target.isConnected());
+        const id = ++sequence;
+        const collection = { texts: [], expected: workers.length };
+        collection.finish = () => {
+            clearTimeout(collection.timer);
+            pending.delete(id);
+            if (worker.isConnected()) {
+                worker.send({ type: 'metrics:collect:reply', id: message.id, text: mergeExpositions(collection.texts) });
+            }
+        };
+        // Worker travado não segura o scrape: responde com os que chegaram
+        collection.timer = setTimeout(collection.finish, timeoutMs);
+        pending.set(id, collection);
+
+        workers.forEach(target => target.send({ type: 'metrics:render', id }));
+    });
+}
+
+const metrics = new Metrics();
+
+// Worker do cluster: responde aos pedidos de exposição do primário
+if (cluster.isWorker && process.send) {
+    process.on('message', (message) => {
+        if (message && message.type === 'metrics:render') {
+            process.send({ type: 'metrics:render:reply', id: message.id, text: metrics.render(workerLabels()) });
+        }
+    });
+}
+
+module.exports = metrics;
+module.exports.Metrics = Metrics;
+module.exports.Histogram = Histogram;
+module.exports.Counter = Counter;
+module.exports.DURATION_BUCKETS = DURATION_BUCKETS;
+module.exports.mergeExpositions = mergeExpositions;
+module.exports.servePrimary = servePrimary;
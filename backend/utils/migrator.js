@@ -0,0 +1,134 @@
+const path = require('path');
+const Sequelize = require('sequelize');
+
+/**
+ * Migrações versionadas do banco (scripts/migrate.js e verificação na inicialização)
+ *
+ * - As migrações aplicadas ficam registradas na tabela SequelizeMeta
+ * - Banco novo (sem AnalysisResults): o sync() cria o schema atual, então
+ *   todas as migrações são registradas como aplicadas sem executar
+ * - sync({ force: false }) não adiciona colunas: o servidor chama
+ *   assertSchema antes de subir e recusa iniciar com colunas faltando
+ */
+
+const META_TABLE = 'SequelizeMeta';
+const BASELINE_TABLE = 'AnalysisResults';
+
+// Em ordem de aplicação (arquivos em backend/migrations)
+const MIGRATIONS = [
+    '20251018_slim_analysis_results'
+];
+
+function loadMigration(name) {
+    return require(path.join(__dirname, '..', 'migrations', name));
+}
+
+function tableName(table) {
+    return typeof table === 'string' ? table : table.tableName;
+}
+
+async function ensureMetaTable(queryInterface) {
+    await queryInterface.createTable(META_TABLE, {
+        name: {
+            type: Sequelize.STRING,
+            allowNull: false,
+            primaryKey: true
+        }
+    });
+}
+
+/**
+ * @returns {Promise<{ applied: string[], pending: string[] }>}
+ */
+async function status(sequelize) {
+    const queryInterface = sequelize.getQueryInterface();
+    await ensureMetaTable(queryInterface);
+
+    const rows = await queryInterface.select(null, META_TABLE, {});
+    let applied = rows.map(row => row.name);
+
+    if (applied.length === 0) {
+        const tables = (await queryInterface.showAllTables()).map(tableName);
+        if (!tables.includes(BASELINE_TABLE)) {
+            await queryInterface.bulkInsert(META_TABLE, MIGRATIONS.map(name => ({ name })), { ignoreDuplicates: true });
+            console.log(`[Migrator] Banco novo: ${MIGRATIONS.length} migrações registradas como aplicadas`);
+            applied = [...MIGRATIONS];
+        }
+    }
+
+    return {
+        applied: MIGRATIONS.filter(name => applied.includes(name)),
+        pending: MIGRATIONS.filter(name => !applied.includes(name))
+    };
+}
+
+/**
+ * Aplica as migrações pendentes, em ordem
+ * @returns {Promise<string[]>} migrações aplicadas nesta execução
+ */
+async function up(sequelize) {
+    const queryInterface = sequelize.getQueryInterface();
+    const { pending } = await status(sequelize);
+
+    for (const name of pending) {
+        console.log(`[Migrator] ⏩ Aplicando ${name}...`);
+        await loadMigration(name).up(queryInterface, Sequelize);
+        await queryInterface.bulkInsert(META_TABLE, [{ name }]);
+        console.log(`[Migrator] ✅ ${name} aplicada`);
+    }
+
+    return pending;
+}
+
+/**
+ * Reverte a última migração aplicada
+ * @returns {Promise<string|null>}
+ */
+async function down(sequelize) {
+    const queryInterface = sequelize.getQueryInterface();
+    const { applied } = await status(sequelize);
+    const name = applied[applied.length - 1];
+    if (!name) return null;
+
+    console.log(`[Migrator] ⏪ Revertendo ${name}...`);
+    await loadMigration(name).down(queryInterface, Sequelize);
+    await queryInterface.bulkDelete(META_TABLE, { name });
+    console.log(`[Migrator] ✅ ${name} revertida`);
+    return name;
+}
+
+/**
+ * Falha se alguma tabela existente não tiver as colunas declaradas no modelo.
+ * Tabelas ausentes são ignoradas (o sync() as cria).
+ * @param {import('sequelize').ModelStatic<any>[]} models
+ */
+async function assertSchema(sequelize, models) {
+    const queryInterface = sequelize.getQueryInterface();
+    const tables = (await queryInterface.showAllTables()).map(tableName);
+    const missing = [];
+
+    for (const model of models) {
+        const table = model.getTableName();
+        if (!tables.includes(table)) continue;
+
+        const columns = await queryInterface.describeTable(table);
+        Object.values(model.rawAttributes)
+            .filter(attribute => !columns[attribute.field])
+            .forEach(attribute => missing.push(`${table}.${attribute.field}`));
+    }
+
+    if (missing.length) {
+        const error = new Error(`Colunas ausentes no banco: ${missing.join(', ')}. Execute "npm run migrate".`);
+        error.code = 'PENDING_MIGRATIONS';
+        throw error;
+    }
+}
+
+module.exports = {
+    MIGRATIONS,
+    META_TABLE,
+    status,
+    up,
+    down,
+    assertSchema
+};
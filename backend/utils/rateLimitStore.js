@@ -0,0 +1,36 @@
+const sharedStore = require('./sharedStore');
+
+/**
+ * Store do express-rate-limit sobre o sharedStore
+ *
+ * Com Redis ou no modo cluster, o limite vale para todos os processos,
+ * em vez de cada worker contar as requisições separadamente.
+ * Cada limitador precisa de uma instância própria com prefixo distinto.
+ */
+class SharedRateLimitStore {
+    constructor(prefix, store = sharedStore) {
+        this.prefix = `rl:${prefix}:`;
+        this.store = store;
+        this.localKeys = false;
+        this.windowMs = 60 * 1000;
+    }
+
+    init(options) {
+        this.windowMs = options.windowMs;
+    }
+
+    async increment(key) {
+        const { total, resetTime } = await this.store.hit(this.prefix + key, this.windowMs);
+        return { totalHits: total, resetTime: new Date(resetTime) };
+    }
+
+    async decrement(key) {
+        await this.store.hit(this.prefix + key, this.windowMs, -1);
+    }
+
+    async resetKey(key) {
+        await this.store.reset(this.prefix + key);
+    }
+}
+
+module.exports = SharedRateLimitStore;
@@ -0,0 +1,73 @@
+/**
+ * Conexão Redis tolerante a falhas (cache de scraping e contadores compartilhados)
+ *
+ * - A primeira conexão falha rápido: quem chama cai para o backend em memória
+ * - Depois de conectado, reconecta com backoff; sem fila offline, os comandos
+ *   falham na hora em vez de esperar o Redis voltar
+ * - withTimeout limita cada operação (socket travado não segura a requisição)
+ */
+
+const CONNECT_TIMEOUT_MS = parseInt(process.env.REDIS_CONNECT_TIMEOUT_MS) || 2000;
+const OPERATION_TIMEOUT_MS = parseInt(process.env.REDIS_OPERATION_TIMEOUT_MS) || 500;
+
+/**
+ * @param {string} url
+ * @param {string} tag - prefixo dos logs (ex.: 'ScrapeCache')
+ * @returns {Promise<import('redis').RedisClientType>} rejeita se o Redis não responder
+ */
+async function connect(url, tag, options = {}) {
+    const { createClient } = require('redis');
+    const connectTimeout = options.connectTimeoutMs || CONNECT_TIMEOUT_MS;
+    let connected = false;
+
+    const client = createClient({
+        url,
+        disableOfflineQueue: true,
+        socket: {
+            connectTimeout,
+            // false: desiste e connect() rejeita com o erro original
+            reconnectStrategy: (retries) => (connected ? Math.min(100 * 2 ** retries, 5000) : false)
+        }
+    });
+    client.on('error', (err) => {
+        if (connected) console.error(`[${tag}] Erro no Redis:`, err.message);
+    });
+
+    try {
+        await withTimeout(client.connect(), connectTimeout + 500, 'connect');
+    } catch (error) {
+        client.disconnect().catch(() => { });
+        throw error;
+    }
+    connected = true;
+    return client;
+}
+
+/**
+ * Rejeita se `promise` não resolver em `ms`
+ */
+function withTimeout(promise, ms = OPERATION_TIMEOUT_MS, label = 'operação') {
+    let timer;
+    const timeout = new Promise((resolve, reject) => {
+        timer = setTimeout(() => reject(new Error(`Redis sem resposta em ${ms}ms (${label})`)), ms);
+    });
+    return Promise.race([promise, timeout]).finally(() => clearTimeout(timer));
+}
+
+/**
+ * Encerra a conexão sem esperar comandos pendentes de um Redis travado
+ */
+async function close(client) {
+    try {
+        await withTimeout(client.quit(), OPERATION_TIMEOUT_MS, 'quit');
+    } catch (error) {
+        await client.disconnect().catch(() => { });
+    }
+}
+
+module.exports = {
+    connect,
+    close,
+    withTimeout,
+    OPERATION_TIMEOUT_MS
+};
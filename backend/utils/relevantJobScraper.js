@@ -1,5 +1,7 @@
 const axios = require('axios');
 const cheerio = require('cheerio');
+const scrapingConfig = require('../config/scraping');
+const { httpAgent, httpsAgent } = require('./fetchScheduler');
 
 const SECTION_TITLES = [
   'atribuições', 'responsabilidades', 'atividades', 'requisitos',
@@ -13,38 +15,99 @@ function isRelevantTitle(text) {
   );
 }
 
-exports.extractRelevantSections = async (url) => {
-  try {
-    const { data } = await axios.get(url);
-    const $ = cheerio.load(data);
-    let result = [];
-    let foundSection = false;
-
-    $('h1, h2, h3, h4, b, strong').each((_, elem) => {
-      const title = $(elem).text();
-      if (isRelevantTitle(title)) {
-        foundSection = true;
-        let sectionText = '';
-        let next = $(elem).next();
-        let count = 0;
-        // Captura listas, parágrafos e divs após o título
-        while (next.length && !/h1|h2|h3|h4|b|strong/i.test(next[0].tagName) && count < 20) {
-          if (['ul', 'ol'].includes(next[0].tagName)) {
-            sectionText += next.text() + ' ';
-          } else if (['p', 'div', 'span', 'li'].includes(next[0].tagName)) {
-            sectionText += next.text() + ' ';
-          }
-          next = next.next();
-          count++;
+// Status HTTP / códigos de erro que indicam link morto (candidatos a cache negativo)
+const DEAD_LINK_STATUSES = [404, 410];
+const DEAD_LINK_CODES = ['ENOTFOUND', 'ERR_INVALID_URL'];
+
+function isDeadLinkError(error) {
+  if (error.response && DEAD_LINK_STATUSES.includes(error.response.status)) return true;
+  return DEAD_LINK_CODES.includes(error.code);
+}
+
+/**
+ * Extrai as seções relevantes de um HTML de vaga
+ */
+function parseRelevantSections(html) {
+  const $ = cheerio.load(html);
+  let result = [];
+  let foundSection = false;
+
+  $('h1, h2, h3, h4, b, strong').each((_, elem) => {
+    const title = $(elem).text();
+    if (isRelevantTitle(title)) {
+      foundSection = true;
+      let sectionText = '';
+      let next = $(elem).next();
+      let count = 0;
+      // Captura listas, parágrafos e divs após o título
+      while (next.length && !/h1|h2|h3|h4|b|strong/i.test(next[0].tagName) && count < 20) {
+        if (['ul', 'ol'].includes(next[0].tagName)) {
+          sectionText += next.text() + ' ';
+        } else if (['p', 'div', 'span', 'li'].includes(next[0].tagName)) {
+          sectionText += next.text() + ' ';
         }
-        result.push(`${title}: ${sectionText.trim()}`);
+        next = next.next();
+        count++;
       }
+      result.push(`${title}: ${sectionText.trim()}`);
+    }
+  });
+  // Fallback: se não encontrou nenhuma seção, retorna todo o texto visível do body
+  if (!foundSection) {
+    result.push($('body').text().replace(/\s+/g, ' ').trim());
+  }
+  return result.join('\n\n');
+}
+
+/**
+ * Baixa a vaga com suporte a requisição condicional (ETag/Last-Modified)
+ * @param {string} url
+ * @param {{etag?: string, lastModified?: string}} validators
+ * @param {{signal?: AbortSignal, timeoutMs?: number}} options
+ * @returns {Promise<{notModified: boolean, text?: string, etag: string|null, lastModified: string|null}>}
+ */
+async function fetchRelevantSections(url, validators = {}, options = {}) {
+  const headers = {};
+  if (validators.etag) headers['If-None-Match'] = validators.etag;
+  if (validators.lastModified) headers['If-Modified-Since'] = validators.lastModified;
+
+  try {
+    const response = await axios.get(url, {
+      headers,
+      timeout: options.timeoutMs || scrapingConfig.scheduler.urlTimeoutMs,
+      signal: options.signal,
+      httpAgent,
+      httpsAgent,
+      validateStatus: status => (status >= 200 && status < 300) || status === 304
     });
-    // Fallback: se não encontrou nenhuma seção, retorna todo o texto visível do body
-    if (!foundSection) {
-      result.push($('body').text().replace(/\s+/g, ' ').trim());
+
+    const etag = response.headers?.etag || validators.etag || null;
+    const lastModified = response.headers?.['last-modified'] || validators.lastModified || null;
+
+    if (response.status === 304) {
+      return { notModified: true, etag, lastModified };
     }
-    return result.join('\n\n');
+
+    return {
+      notModified: false,
+      text: parseRelevantSections(response.data),
+      etag: response.headers?.etag || null,
+      lastModified: response.headers?.['last-modified'] || null
+    };
+  } catch (error) {
+    error.isDeadLink = isDeadLinkError(error);
+    throw error;
+  }
+}
+
+exports.parseRelevantSections = parseRelevantSections;
+exports.fetchRelevantSections = fetchRelevantSections;
+exports.isDeadLinkError = isDeadLinkError;
+
+exports.extractRelevantSections = async (url) => {
+  try {
+    const { text } = await fetchRelevantSections(url);
+    return text;
   } catch (e) {
     return '';
   }
@@ -0,0 +1,370 @@
+const crypto = require('crypto');
+const scrapingConfig = require('../config/scraping');
+const redisClient = require('./redisClient');
+
+/**
+ * Cache de resultados de scraping de vagas
+ *
+ * - Chave: hash da URL normalizada (sem tracking params, fragmento, barra final)
+ * - TTL: entradas "frescas" dispensam rede; entradas vencidas continuam
+ *   guardadas por staleTtlMs para revalidação via ETag/Last-Modified
+ * - Cache negativo: links mortos (404/410/DNS) são lembrados por negativeTtlMs
+ * - L1 em memória com LRU por tamanho em bytes; L2 opcional em Redis (compartilhado)
+ */
+
+// Parâmetros de rastreamento que não mudam o conteúdo da vaga
+const TRACKING_PARAMS = [
+    'fbclid', 'gclid', 'msclkid', 'trk', 'trkinfo', 'refid', 'trackingid',
+    'lipi', 'jobboardsource'
+];
+
+/**
+ * Normaliza URL para uso como chave de cache
+ */
+function normalizeUrl(url) {
+    try {
+        const parsed = new URL(String(url).trim());
+        parsed.hash = '';
+        parsed.hostname = parsed.hostname.toLowerCase();
+
+        const params = [...parsed.searchParams.entries()]
+            .filter(([name]) => {
+                const lower = name.toLowerCase();
+                return !lower.startsWith('utm_') && !TRACKING_PARAMS.includes(lower);
+            })
+            .sort(([a], [b]) => a.localeCompare(b));
+        parsed.search = new URLSearchParams(params).toString();
+
+        if (parsed.pathname.length > 1 && parsed.pathname.endsWith('/')) {
+            parsed.pathname = parsed.pathname.replace(/\/+$/, '');
+        }
+
+        return parsed.toString();
+    } catch (error) {
+        return String(url).trim();
+    }
+}
+
+/**
+ * Backend em memória: LRU limitado por bytes (Map preserva ordem de inserção)
+ */
+class MemoryBackend {
+    constructor(maxBytes, onEvict) {
+        this.maxBytes = maxBytes;
+        this.onEvict = onEvict;
+        this.entries = new Map();
+        this.bytes = 0;
+    }
+
+    get(key) {
+        const item = this.entries.get(key);
+        if (!item) return null;
+
+        if (Date.now() > item.hardExpiresAt) {
+            this.delete(key);
+            return null;
+        }
+
+        // Reinserir para marcar como usado recentemente
+        this.entries.delete(key);
+        this.entries.set(key, item);
+        return item.entry;
+    }
+
+    set(key, entry, hardTtlMs) {
+        this.delete(key);
+
+        const size = entry.bytes || 0;
+        if (size > this.maxBytes) return;
+
+        this.entries.set(key, { entry, hardExpiresAt: Date.now() + hardTtlMs, size });
+        this.bytes += size;
+
+        // Evictar os menos usados até caber no limite
+        while (this.bytes > this.maxBytes && this.entries.size > 0) {
+            const oldestKey = this.entries.keys().next().value;
+            this.delete(oldestKey);
+            if (this.onEvict) this.onEvict();
+        }
+    }
+
+    delete(key) {
+        const item = this.entries.get(key);
+        if (!item) return;
+        this.bytes -= item.size;
+        this.entries.delete(key);
+    }
+
+    clear() {
+        this.entries.clear();
+        this.bytes = 0;
+    }
+
+    get size() {
+        return this.entries.size;
+    }
+}
+
+/**
+ * Backend Redis (compartilhado entre processos/réplicas)
+ * Conexão preguiçosa; em caso de falha o cache segue apenas em memória
+ */
+class RedisBackend {
+    constructor(url, keyPrefix) {
+        this.url = url;
+        this.keyPrefix = keyPrefix;
+        this.client = null;
+        this.connecting = null;
+        this.disabled = false;
+    }
+
+    async getClient() {
+        if (this.disabled) return null;
+        if (this.client) return this.client;
+
+        if (!this.connecting) {
+            this.connecting = (async () => {
+                try {
+                    const client = await redisClient.connect(this.url, 'ScrapeCache');
+                    this.client = client;
+                    console.log('[ScrapeCache] ✅ Redis conectado');
+                    return client;
+                } catch (error) {
+                    console.warn('[ScrapeCache] ⚠️ Redis indisponível, usando apenas memória:', error.message);
+                    this.disabled = true;
+                    return null;
+                }
+            })();
+        }
+
+        return this.connecting;
+    }
+
+    async get(key) {
+        const client = await this.getClient();
+        if (!client) return null;
+
+        try {
+            const raw = await redisClient.withTimeout(client.get(this.keyPrefix + key), undefined, 'get');
+            return raw ? JSON.parse(raw) : null;
+        } catch (error) {
+            console.error('[ScrapeCache] Erro ao ler do Redis:', error.message);
+            return null;
+        }
+    }
+
+    async set(key, entry, hardTtlMs) {
+        const client = await this.getClient();
+        if (!client) return;
+
+        try {
+            await redisClient.withTimeout(client.set(this.keyPrefix + key, JSON.stringify(entry), { PX: hardTtlMs }), undefined, 'set');
+        } catch (error) {
+            console.error('[ScrapeCache] Erro ao gravar no Redis:', error.message);
+        }
+    }
+
+    async delete(key) {
+        const client = await this.getClient();
+        if (!client) return;
+
+        try {
+            await redisClient.withTimeout(client.del(this.keyPrefix + key), undefined, 'del');
+        } catch (error) {
+            console.error('[ScrapeCache] Erro ao remover do Redis:', error.message);
+        }
+    }
+
+    async close() {
+        if (this.client) {
+            await redisClient.close(this.client);
+            this.client = null;
+        }
+        this.connecting = null;
+    }
+}
+
+class ScrapeCache {
+    constructor(config = scrapingConfig.cache) {
+        this.config = config;
+        this.memory = new MemoryBackend(config.maxBytes, () => { this.stats.evictions++; });
+        this.shared = config.backend === 'redis' && config.redisUrl
+            ? new RedisBackend(config.redisUrl, config.keyPrefix)
+            : null;
+        this.resetStats();
+    }
+
+    keyFor(url) {
+        return crypto.createHash('sha256').update(normalizeUrl(url)).digest('hex');
+    }
+
+    /**
+     * Busca entrada no cache
+     * @returns {Promise<{entry: Object, fresh: boolean}|null>}
+     */
+    async lookup(url) {
+        if (!this.config.enabled) return null;
+
+        const key = this.keyFor(url);
+        let entry = this.memory.get(key);
+
+        if (!entry && this.shared) {
+            entry = await this.shared.get(key);
+            if (entry) {
+                this.memory.set(key, entry, this.hardTtl(entry));
+            }
+        }
+
+        if (!entry) {
+            this.stats.misses++;
+            return null;
+        }
+
+        const fresh = Date.now() < entry.expiresAt;
+        if (fresh) {
+            this.stats.hits++;
+            if (entry.dead) this.stats.negativeHits++;
+            this.stats.bytesServed += entry.bytes || 0;
+        } else {
+            this.stats.staleHits++;
+        }
+
+        return { entry, fresh };
+    }
+
+    /**
+     * Armazena texto extraído de uma vaga com seus validadores HTTP
+     */
+    async store(url, { content, etag = null, lastModified = null }) {
+        if (!this.config.enabled) return null;
+
+        const text = content || '';
+        const entry = {
+            url: normalizeUrl(url),
+            content: text,
+            etag,
+            lastModified,
+            dead: false,
+            fetchedAt: Date.now(),
+            expiresAt: Date.now() + this.config.ttlMs,
+            bytes: Buffer.byteLength(text, 'utf8')
+        };
+
+        await this.write(url, entry);
+        this.stats.stores++;
+        return entry;
+    }
+
+    /**
+     * Registra link morto (cache negativo)
+     */
+    async storeDead(url, reason) {
+        if (!this.config.enabled) return null;
+
+        const entry = {
+            url: normalizeUrl(url),
+            content: '',
+            dead: true,
+            reason: reason || 'unavailable',
+            fetchedAt: Date.now(),
+            expiresAt: Date.now() + this.config.negativeTtlMs,
+            bytes: 0
+        };
+
+        await this.write(url, entry);
+        this.stats.negativeStores++;
+        return entry;
+    }
+
+    /**
+     * Renova a validade de uma entrada após resposta 304 Not Modified
+     */
+    async revalidated(url, entry) {
+        if (!this.config.enabled || !entry) return entry;
+
+        const renewed = {
+            ...entry,
+            fetchedAt: Date.now(),
+            expiresAt: Date.now() + this.config.ttlMs
+        };
+
+        await this.write(url, renewed);
+        this.stats.revalidations++;
+        this.stats.bytesServed += renewed.bytes || 0;
+        return renewed;
+    }
+
+    async invalidate(url) {
+        const key = this.keyFor(url);
+        this.memory.delete(key);
+        if (this.shared) await this.shared.delete(key);
+    }
+
+    async write(url, entry) {
+        const key = this.keyFor(url);
+        const hardTtlMs = this.hardTtl(entry);
+        this.memory.set(key, entry, hardTtlMs);
+        if (this.shared) await this.shared.set(key, entry, hardTtlMs);
+    }
+
+    hardTtl(entry) {
+        // Links mortos não são revalidados: expiram junto com o TTL negativo
+        const remaining = Math.max(0, entry.expiresAt - Date.now());
+        return entry.dead ? remaining : remaining + this.config.staleTtlMs;
+    }
+
+    /**
+     * Contadores de hit/miss/bytes para o healthCheck
+     */
+    getStats() {
+        const lookups = this.stats.hits + this.stats.staleHits + this.stats.misses;
+        const hitRate = lookups > 0 ? ((this.stats.hits / lookups) * 100).toFixed(1) : 0;
+
+        return {
+            enabled: this.config.enabled,
+            backend: this.shared ? 'memory+redis' : 'memory',
+            hits: this.stats.hits,
+            misses: this.stats.misses,
+            staleHits: this.stats.staleHits,
+            negativeHits: this.stats.negativeHits,
+            revalidations: this.stats.revalidations,
+            stores: this.stats.stores,
+            negativeStores: this.stats.negativeStores,
+            evictions: this.stats.evictions,
+            hitRate: `${hitRate}%`,
+            entries: this.memory.size,
+            bytes: this.memory.bytes,
+            maxBytes: this.config.maxBytes,
+            bytesServed: this.stats.bytesServed
+        };
+    }
+
+    resetStats() {
+        this.stats = {
+            hits: 0,
+            misses: 0,
+            staleHits: 0,
+            negativeHits: 0,
+            revalidations: 0,
+            stores: 0,
+            negativeStores: 0,
+            evictions: 0,
+            bytesServed: 0
+        };
+    }
+
+    async clear() {
+        this.memory.clear();
+        this.resetStats();
+    }
+
+    async close() {
+        if (this.shared) await this.shared.close();
+    }
+}
+
+const scrapeCache = new ScrapeCache();
+
+module.exports = scrapeCache;
+module.exports.ScrapeCache = ScrapeCache;
+module.exports.normalizeUrl = normalizeUrl;
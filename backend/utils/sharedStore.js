@@ -0,0 +1,337 @@
+const cluster = require('cluster');
+const crypto = require('crypto');
+const redisClient = require('./redisClient');
+
+/**
+ * Armazenamento de contadores compartilhado entre processos
+ *
+ * Usado pelos limitadores HTTP (express-rate-limit) e pelos orçamentos de
+ * requisições/tokens dos provedores de LLM (RateLimitMonitor).
+ *
+ * Operações (todas assíncronas e atômicas no backend):
+ *  - hit(key, windowMs, amount): contador de janela fixa → { total, resetTime }
+ *  - reset(key)
+ *  - take(buckets): token bucket sobre vários baldes; só debita se todos tiverem saldo
+ *
+ * Backends:
+ *  - memory: processo único (e testes)
+ *  - cluster: workers consultam o processo primário via IPC (um host, sem Redis)
+ *  - redis: compartilhado entre réplicas (scripts Lua para atomicidade)
+ */
+
+const IPC_TIMEOUT_MS = parseInt(process.env.SHARED_STORE_IPC_TIMEOUT_MS) || 2000;
+
+/**
+ * Backend em memória (também serve os workers no modo cluster)
+ */
+class MemoryStore {
+    constructor() {
+        this.name = 'memory';
+        this.counters = new Map();
+        this.buckets = new Map();
+    }
+
+    async hit(key, windowMs, amount = 1) {
+        const now = Date.now();
+        let counter = this.counters.get(key);
+        if (!counter || counter.resetTime <= now) {
+            if (amount < 0) return { total: 0, resetTime: now + windowMs };
+            counter = { total: 0, resetTime: now + windowMs };
+            this.counters.set(key, counter);
+        }
+        counter.total += amount;
+        this.prune(now);
+        return { total: counter.total, resetTime: counter.resetTime };
+    }
+
+    async reset(key) {
+        this.counters.delete(key);
+        this.buckets.delete(key);
+    }
+
+    /**
+     * @param {Array<{key, capacity, refillPerMs, cost}>} buckets
+     * @returns {Promise<{allowed: boolean, remaining: number[], retryAfterMs: number}>}
+     */
+    async take(buckets) {
+        const now = Date.now();
+        const states = buckets.map(bucket => {
+            const state = this.buckets.get(bucket.key) || { tokens: bucket.capacity, ts: now };
+            const tokens = Math.min(bucket.capacity, state.tokens + Math.max(0, now - state.ts) * bucket.refillPerMs);
+            return { tokens, ts: now };
+        });
+
+        const allowed = buckets.every((bucket, i) => states[i].tokens >= bucket.cost);
+        if (allowed) {
+            buckets.forEach((bucket, i) => { states[i].tokens -= bucket.cost; });
+        }
+        buckets.forEach((bucket, i) => this.buckets.set(bucket.key, states[i]));
+
+        return {
+            allowed,
+            remaining: states.map(state => state.tokens),
+            retryAfterMs: allowed ? 0 : retryAfter(buckets, states.map(state => state.tokens))
+        };
+    }
+
+    // Remove janelas vencidas ocasionalmente para não crescer sem limite
+    prune(now) {
+        if (this.counters.size < 10000) return;
+        for (const [key, counter] of this.counters) {
+            if (counter.resetTime <= now) this.counters.delete(key);
+        }
+    }
+
+    async close() { }
+}
+
+// Tempo até o balde mais deficitário ter saldo suficiente
+function retryAfter(buckets, remaining) {
+    return Math.max(0, ...buckets.map((bucket, i) => {
+        const missing = bucket.cost - remaining[i];
+        if (missing <= 0) return 0;
+        if (bucket.cost > bucket.capacity || bucket.refillPerMs <= 0) return Infinity;
+        return Math.ceil(missing / bucket.refillPerMs);
+    }));
+}
+
+/**
+ * Backend para workers do cluster: as operações são executadas no primário
+ */
+class ClusterStore {
+    constructor(proc = process) {
+        this.name = 'cluster';
+        this.process = proc;
+        this.pending = new Map();
+
+        this.onMessage = (message) => {
+            if (!message || message.type !== 'sharedStore:reply') return;
+            const request = this.pending.get(message.id);
+            if (!request) return;
+
+            this.pending.delete(message.id);
+            clearTimeout(request.timer);
+            if (message.error) {
+                request.reject(new Error(message.error));
+            } else {
+                request.resolve(message.result);
+            }
+        };
+        this.process.on('message', this.onMessage);
+    }
+
+    call(op, args) {
+        return new Promise((resolve, reject) => {
+            const id = crypto.randomUUID();
+            const timer = setTimeout(() => {
+                this.pending.delete(id);
+                reject(new Error(`Processo primário não respondeu (${op})`));
+            }, IPC_TIMEOUT_MS);
+            timer.unref();
+
+            this.pending.set(id, { resolve, reject, timer });
+            this.process.send({ type: 'sharedStore', id, op, args });
+        });
+    }
+
+    hit(key, windowMs, amount = 1) {
+        return this.call('hit', [key, windowMs, amount]);
+    }
+
+    reset(key) {
+        return this.call('reset', [key]);
+    }
+
+    take(buckets) {
+        return this.call('take', [buckets]);
+    }
+
+    async close() {
+        this.process.off('message', this.onMessage);
+    }
+}
+
+/**
+ * Atende as operações dos workers no processo primário
+ */
+function servePrimary(clusterModule = cluster, store = new MemoryStore()) {
+    clusterModule.on('message', async (worker, message) => {
+        if (!message || message.type !== 'sharedStore') return;
+        if (!['hit', 'reset', 'take'].includes(message.op)) return;
+
+        try {
+            const result = await store[message.op](...message.args);
+            worker.send({ type: 'sharedStore:reply', id: message.id, result });
+        } catch (error) {
+            worker.send({ type: 'sharedStore:reply', id: message.id, error: error.message });
+        }
+    });
+    return store;
+}
+
+const HIT_SCRIPT = `
+local total = redis.call('INCRBY', KEYS[1], ARGV[2])
+if total == tonumber(ARGV[2]) then redis.call('PEXPIRE', KEYS[1], ARGV[1]) end
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 then redis.call('PEXPIRE', KEYS[1], ARGV[1]); ttl = tonumber(ARGV[1]) end
+return {total, ttl}
+`;
+
+// ARGV: [capacidade, recarga/ms, custo] por balde; relógio do próprio Redis
+const TAKE_SCRIPT = `
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tokens = {}
+local allowed = 1
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 3 - 2])
+  local refill = tonumber(ARGV[i * 3 - 1])
+  local cost = tonumber(ARGV[i * 3])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local current = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  current = math.min(capacity, current + math.max(0, now - ts) * refill)
+  tokens[i] = current
+  if current < cost then allowed = 0 end
+end
+local result = {allowed}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 3 - 2])
+  local refill = tonumber(ARGV[i * 3 - 1])
+  if allowed == 1 then tokens[i] = tokens[i] - tonumber(ARGV[i * 3]) end
+  redis.call('HSET', key, 'tokens', tostring(tokens[i]), 'ts', tostring(now))
+  redis.call('PEXPIRE', key, math.ceil(capacity / refill) + 1000)
+  result[i + 1] = tostring(tokens[i])
+end
+return result
+`;
+
+/**
+ * Backend Redis (compartilhado entre réplicas)
+ * Conexão preguiçosa; se o Redis estiver fora ou lento, as operações seguem no MemoryStore local
+ */
+class RedisStore {
+    constructor(url, keyPrefix = 'cvsf:shared:') {
+        this.name = 'redis';
+        this.url = url;
+        this.keyPrefix = keyPrefix;
+        this.client = null;
+        this.connecting = null;
+        this.disabled = false;
+        this.degraded = false;
+        this.fallback = new MemoryStore();
+    }
+
+    async getClient() {
+        if (this.disabled) return null;
+        if (this.client) return this.client;
+
+        if (!this.connecting) {
+            this.connecting = (async () => {
+                try {
+                    const client = await redisClient.connect(this.url, 'SharedStore');
+                    this.client = client;
+                    console.log('[SharedStore] ✅ Redis conectado');
+                    return client;
+                } catch (error) {
+                    console.warn('[SharedStore] ⚠️ Redis indisponível, contadores apenas neste processo:', error.message);
+                    this.disabled = true;
+                    return null;
+                }
+            })();
+        }
+
+        return this.connecting;
+    }
+
+    /**
+     * Executa no Redis com tempo limite; sem conexão, erro ou demora usa o fallback local
+     */
+    async run(op, args, command) {
+        const client = await this.getClient();
+        if (!client) return this.fallback[op](...args);
+
+        try {
+            const result = await redisClient.withTimeout(command(client), undefined, op);
+            if (this.degraded) {
+                this.degraded = false;
+                console.log('[SharedStore] ✅ Redis respondendo novamente');
+            }
+            return result;
+        } catch (error) {
+            // Loga só a transição para não inundar o log durante a queda
+            if (!this.degraded) {
+                this.degraded = true;
+                console.error(`[SharedStore] Redis falhou em ${op}, usando contadores locais:`, error.message);
+            }
+            return this.fallback[op](...args);
+        }
+    }
+
+    async hit(key, windowMs, amount = 1) {
+        return this.run('hit', [key, windowMs, amount], async (client) => {
+            const [total, ttl] = await client.eval(HIT_SCRIPT, {
+                keys: [this.keyPrefix + key],
+                arguments: [String(windowMs), String(amount)]
+            });
+            return { total: Number(total), resetTime: Date.now() + Number(ttl) };
+        });
+    }
+
+    async reset(key) {
+        await this.fallback.reset(key);
+        return this.run('reset', [key], client => client.del(this.keyPrefix + key));
+    }
+
+    async take(buckets) {
+        return this.run('take', [buckets], client => this.takeScript(client, buckets));
+    }
+
+    async takeScript(client, buckets) {
+        const [allowed, ...remaining] = await client.eval(TAKE_SCRIPT, {
+            keys: buckets.map(bucket => this.keyPrefix + bucket.key),
+            arguments: buckets.flatMap(bucket => [bucket.capacity, bucket.refillPerMs, bucket.cost].map(String))
+        });
+        const tokens = remaining.map(Number);
+
+        return {
+            allowed: Number(allowed) === 1,
+            remaining: tokens,
+            retryAfterMs: Number(allowed) === 1 ? 0 : retryAfter(buckets, tokens)
+        };
+    }
+
+    async close() {
+        if (this.client) {
+            await redisClient.close(this.client);
+            this.client = null;
+        }
+        this.connecting = null;
+    }
+}
+
+/**
+ * Escolhe o backend: SHARED_STORE_BACKEND explícito, Redis se configurado,
+ * IPC com o primário dentro de um worker do cluster, senão memória
+ */
+function createStore(backend = process.env.SHARED_STORE_BACKEND) {
+    const selected = backend
+        || (process.env.REDIS_URL ? 'redis' : (cluster.isWorker ? 'cluster' : 'memory'));
+
+    if (selected === 'redis' && process.env.REDIS_URL) {
+        return new RedisStore(process.env.REDIS_URL, process.env.SHARED_STORE_PREFIX);
+    }
+    if (selected === 'cluster' && cluster.isWorker) {
+        return new ClusterStore();
+    }
+    return new MemoryStore();
+}
+
+const sharedStore = createStore();
+
+module.exports = sharedStore;
+module.exports.MemoryStore = MemoryStore;
+module.exports.ClusterStore = ClusterStore;
+module.exports.RedisStore = RedisStore;
+module.exports.createStore = createStore;
+module.exports.servePrimary = servePrimary;
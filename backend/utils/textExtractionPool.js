@@ -0,0 +1,146 @@
+const path = require('path');
+const { Worker } = require('worker_threads');
+
+const WORKER_SCRIPT = path.join(__dirname, 'textExtractionWorker.js');
+
+/**
+ * Pool de worker_threads para extração de texto (pdf-parse/mammoth)
+ *
+ * - Tira o parsing de documentos do event loop do Express
+ * - Fila com profundidade limitada: excedendo, a extração é recusada
+ * - Timeout por documento: o worker travado é encerrado e substituído
+ * - Worker que morre sem 'error' (OOM, process.exit no parser) também é substituído
+ */
+class TextExtractionPool {
+  constructor({ size = 2, maxQueue = 20, timeoutMs = 20000 } = {}) {
+    this.size = size;
+    this.maxQueue = maxQueue;
+    this.timeoutMs = timeoutMs;
+    this.workers = [];
+    this.idle = [];
+    this.queue = [];
+    this.nextId = 1;
+    this.stats = { completed: 0, failed: 0, timeouts: 0, rejected: 0 };
+  }
+
+  spawn() {
+    const worker = new Worker(WORKER_SCRIPT);
+    worker.unref(); // não manter o processo vivo só pelos workers ociosos
+    worker.current = null;
+
+    worker.on('message', (message) => {
+      const task = worker.current;
+      if (!task || task.id !== message.id) return;
+      this.settle(worker, task, message.error ? new Error(message.error) : null, message.text);
+    });
+
+    worker.on('error', (error) => {
+      console.error('[TextExtractor] Erro no worker:', error.message);
+      const task = worker.current;
+      this.replace(worker);
+      if (task) this.finish(task, error);
+    });
+
+    worker.on('exit', (code) => {
+      // Encerrado pelo próprio pool (replace/close): já fora da lista
+      if (!this.workers.includes(worker)) return;
+      console.error(`[TextExtractor] Worker encerrou inesperadamente (código ${code})`);
+      const task = worker.current;
+      this.replace(worker);
+      if (task) this.finish(task, new Error('Falha ao extrair texto do documento. Tente novamente.'));
+    });
+
+    this.workers.push(worker);
+    return worker;
+  }
+
+  replace(worker) {
+    worker.current = null;
+    this.workers = this.workers.filter(w => w !== worker);
+    this.idle = this.idle.filter(w => w !== worker);
+    worker.terminate().catch(() => { });
+    this.drain();
+  }
+
+  /**
+   * Executa a extração em um worker
+   * @param {Buffer} buffer
+   * @param {string} ext
+   * @returns {Promise<string>}
+   */
+  run(buffer, ext) {
+    const busy = this.workers.length - this.idle.length;
+    if (busy >= this.size && this.queue.length >= this.maxQueue) {
+      this.stats.rejected++;
+      return Promise.reject(new Error('Servidor ocupado processando documentos. Tente novamente em instantes.'));
+    }
+
+    return new Promise((resolve, reject) => {
+      this.queue.push({ id: this.nextId++, buffer, ext, resolve, reject });
+      this.drain();
+    });
+  }
+
+  drain() {
+    while (this.queue.length > 0) {
+      let worker = this.idle.pop();
+      if (!worker && this.workers.length < this.size) {
+        worker = this.spawn();
+      }
+      if (!worker) return;
+
+      const task = this.queue.shift();
+      worker.current = task;
+      worker.ref();
+
+      task.timer = setTimeout(() => {
+        console.error(`[TextExtractor] ⏱️ Extração excedeu ${this.timeoutMs}ms, reiniciando worker`);
+        this.stats.timeouts++;
+        this.replace(worker);
+        this.finish(task, new Error('Tempo limite excedido ao extrair texto do documento.'));
+      }, this.timeoutMs);
+
+      // Copia do buffer transferida para o worker (sem clonar novamente)
+      const payload = Uint8Array.prototype.slice.call(task.buffer).buffer;
+      worker.postMessage({ id: task.id, buffer: payload, ext: task.ext }, [payload]);
+    }
+  }
+
+  settle(worker, task, error, text) {
+    worker.current = null;
+    worker.unref();
+    this.idle.push(worker);
+    this.finish(task, error, text);
+    this.drain();
+  }
+
+  finish(task, error, text) {
+    clearTimeout(task.timer);
+    if (error) {
+      this.stats.failed++;
+      task.reject(error);
+    } else {
+      this.stats.completed++;
+      task.resolve(text);
+    }
+  }
+
+  getStats() {
+    return {
+      size: this.size,
+      workers: this.workers.length,
+      busy: this.workers.length - this.idle.length,
+      queued: this.queue.length,
+      ...this.stats
+    };
+  }
+
+  async close() {
+    const workers = this.workers;
+    this.workers = [];
+    this.idle = [];
+    await Promise.all(workers.map(worker => worker.terminate()));
+  }
+}
+
+module.exports = TextExtractionPool;
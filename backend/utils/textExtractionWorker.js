@@ -0,0 +1,35 @@
+const { parentPort, isMainThread } = require('worker_threads');
+const pdfParse = require('pdf-parse');
+const mammoth = require('mammoth');
+
+/**
+ * Extrai texto de um documento já carregado em memória
+ * Executado dentro do worker (ou inline quando o pool está desativado)
+ * @param {Buffer} buffer
+ * @param {string} ext - '.pdf' ou '.docx'
+ * @returns {Promise<string>}
+ */
+async function extractFromBuffer(buffer, ext) {
+  if (ext === '.pdf') {
+    const data = await pdfParse(buffer);
+    return data.text;
+  }
+  if (ext === '.docx') {
+    const result = await mammoth.extractRawText({ buffer });
+    return result.value;
+  }
+  throw new Error('Formato de arquivo não suportado.');
+}
+
+if (!isMainThread && parentPort) {
+  parentPort.on('message', async ({ id, buffer, ext }) => {
+    try {
+      const text = await extractFromBuffer(Buffer.from(buffer), ext);
+      parentPort.postMessage({ id, text });
+    } catch (error) {
+      parentPort.postMessage({ id, error: error.message || 'Erro na extração de texto' });
+    }
+  });
+}
+
+module.exports = { extractFromBuffer };
@@ -1,21 +1,112 @@
 const fs = require('fs');
-const pdfParse = require('pdf-parse');
-const mammoth = require('mammoth');
 const path = require('path');
+const crypto = require('crypto');
+const TextExtractionPool = require('./textExtractionPool');
+const { extractFromBuffer } = require('./textExtractionWorker');
 
-exports.extract = async (filePath) => {
-  const ext = path.extname(filePath).toLowerCase();
-  if (ext === '.pdf') {
-    const buffer = fs.readFileSync(filePath);
-    const data = await pdfParse(buffer);
-    return data.text;
+// Limites por documento (o upload já é limitado pelo multer, isto protege os workers)
+const MAX_FILE_BYTES = parseInt(process.env.TEXT_EXTRACTION_MAX_BYTES) || 10 * 1024 * 1024;
+const TIMEOUT_MS = parseInt(process.env.TEXT_EXTRACTION_TIMEOUT_MS) || 20000;
+
+// Cache de texto extraído por hash do conteúdo do arquivo
+const CACHE_MAX_ENTRIES = parseInt(process.env.TEXT_EXTRACTION_CACHE_ENTRIES) || 200;
+const CACHE_MAX_BYTES = parseInt(process.env.TEXT_EXTRACTION_CACHE_BYTES) || 20 * 1024 * 1024;
+
+// TEXT_EXTRACTION_WORKERS=0 extrai no próprio event loop (comportamento antigo)
+const pool = new TextExtractionPool({
+  size: process.env.TEXT_EXTRACTION_WORKERS !== undefined
+    ? parseInt(process.env.TEXT_EXTRACTION_WORKERS)
+    : 2,
+  maxQueue: parseInt(process.env.TEXT_EXTRACTION_MAX_QUEUE) || 20,
+  timeoutMs: TIMEOUT_MS
+});
+
+const cache = new Map();
+const inFlight = new Map();
+let cacheBytes = 0;
+const stats = { hits: 0, misses: 0, coalesced: 0 };
+
+function cacheGet(hash) {
+  const text = cache.get(hash);
+  if (text === undefined) return undefined;
+  // LRU: mover para o final
+  cache.delete(hash);
+  cache.set(hash, text);
+  return text;
+}
+
+function cacheSet(hash, text) {
+  const size = Buffer.byteLength(text);
+  if (size > CACHE_MAX_BYTES) return;
+
+  cache.set(hash, text);
+  cacheBytes += size;
+  while (cache.size > CACHE_MAX_ENTRIES || cacheBytes > CACHE_MAX_BYTES) {
+    const [oldest, oldestText] = cache.entries().next().value;
+    cache.delete(oldest);
+    cacheBytes -= Buffer.byteLength(oldestText);
   }
-  if (ext === '.docx') {
-    const result = await mammoth.extractRawText({ path: filePath });
-    return result.value;
+}
+
+function runExtraction(buffer, ext) {
+  if (pool.size > 0) {
+    return pool.run(buffer, ext);
   }
+  return extractFromBuffer(buffer, ext);
+}
+
+exports.extract = async (filePath) => {
+  const ext = path.extname(filePath).toLowerCase();
   if (ext === '.doc') {
     throw new Error('Formato DOC não suportado no momento. Converta para PDF ou DOCX.');
   }
-  throw new Error('Formato de arquivo não suportado.');
+  if (ext !== '.pdf' && ext !== '.docx') {
+    throw new Error('Formato de arquivo não suportado.');
+  }
+
+  const { size } = await fs.promises.stat(filePath);
+  if (size > MAX_FILE_BYTES) {
+    throw new Error(`Arquivo muito grande para extração (máximo ${Math.round(MAX_FILE_BYTES / 1024 / 1024)}MB).`);
+  }
+
+  const buffer = await fs.promises.readFile(filePath);
+  const hash = crypto.createHash('sha256').update(ext).update(buffer).digest('hex');
+
+  const cached = cacheGet(hash);
+  if (cached !== undefined) {
+    stats.hits++;
+    return cached;
+  }
+
+  // Mesma extração já em andamento (ex.: duas requisições com o mesmo arquivo)
+  if (inFlight.has(hash)) {
+    stats.coalesced++;
+    return inFlight.get(hash);
+  }
+
+  stats.misses++;
+  const promise = runExtraction(buffer, ext)
+    .then(text => {
+      cacheSet(hash, text);
+      return text;
+    })
+    .finally(() => inFlight.delete(hash));
+
+  inFlight.set(hash, promise);
+  return promise;
+};
+
+exports.getStats = () => ({
+  cache: { ...stats, entries: cache.size, bytes: cacheBytes },
+  pool: pool.getStats()
+});
+
+exports.clearCache = () => {
+  cache.clear();
+  cacheBytes = 0;
+  stats.hits = 0;
+  stats.misses = 0;
+  stats.coalesced = 0;
 };
+
+exports.pool = pool;
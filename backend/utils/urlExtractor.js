@@ -58,7 +58,8 @@ exports.extractMultiple = async (links, options = {}) => {
         total: result.total,
         successful: result.successful,
         failed: result.failed,
-        successRate: result.successRate
+        successRate: result.successRate,
+        partial: !!result.partial
       };
       finalText.detailedResults = result.results;
 